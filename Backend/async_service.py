@@ -0,0 +1,183 @@
+import asyncio
+import functools
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
+import logging
+
+from app.core.config import settings
+from app.models.chat import ChatResponse
+from app.services.session_store import get_session_store
+
+logger = logging.getLogger(__name__)
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the worker pool and its queue are both full"""
+
+class ExecutorTimeoutError(TimeoutError):
+    """Raised when a call does not finish within its deadline"""
+
+class BoundedExecutor:
+    """
+    Thread pool for blocking pandas work with a cap on queued calls and a per-call timeout.
+
+    A slot is held from submission until the worker actually finishes, so calls that
+    time out on the caller's side still count against the limit while they run.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chatbot-worker")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._in_flight = 0
+        self._counter_lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _release(self, _future):
+        with self._counter_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Run func in the pool without blocking the event loop"""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturatedError(
+                f"Worker pool is saturated ({self.max_workers} running, {self.max_queue} queued)"
+            )
+
+        with self._counter_lock:
+            self._in_flight += 1
+
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        deadline = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"{getattr(func, '__name__', func)} timed out after {deadline}s")
+            raise ExecutorTimeoutError(f"Operation timed out after {deadline}s")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Global executor instance
+_executor: Optional[BoundedExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> BoundedExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BoundedExecutor(
+                    max_workers=settings.EXECUTOR_MAX_WORKERS,
+                    max_queue=settings.EXECUTOR_MAX_QUEUE,
+                    timeout=settings.EXECUTOR_TIMEOUT_SECONDS
+                )
+    return _executor
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+class AsyncDataService:
+    """Awaitable facade over DataService; every query runs on the bounded executor"""
+
+    def __init__(self, data_service, executor: Optional[BoundedExecutor] = None):
+        self.data_service = data_service
+        self.executor = executor or get_executor()
+
+    async def get_top_products(self, limit: int = 5) -> List[Dict[str, Any]]:
+        return await self.executor.run(self.data_service.get_top_products, limit)
+
+    async def get_order_status(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return await self.executor.run(self.data_service.get_order_status, order_id)
+
+    async def get_inventory_status(self, product_name: str = None, category: str = None) -> List[Dict[str, Any]]:
+        return await self.executor.run(self.data_service.get_inventory_status, product_name=product_name, category=category)
+
+    async def get_user_orders(self, user_id: int, limit: Optional[int] = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        return await self.executor.run(self.data_service.get_user_orders, user_id, limit, offset)
+
+    async def search_products(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self.executor.run(self.data_service.search_products, query, limit)
+    
+    async def semantic_search_products(self, queries: List[str], limit: int = 10) -> List[List[Dict[str, Any]]]:
+        return await self.executor.run(self.data_service.semantic_search_products, queries, limit)
+
+    async def facet_counts(self, filters, product_ids=None, limit: int = 20) -> Dict[str, Any]:
+        return await self.executor.run(self.data_service.facet_counts, filters, product_ids, limit)
+
+class AsyncChatbotService:
+    """Awaitable facade over ChatbotService for use from async route handlers"""
+
+    def __init__(self, chatbot_service, executor: Optional[BoundedExecutor] = None):
+        self.chatbot_service = chatbot_service
+        self.executor = executor or get_executor()
+        self.data_service = AsyncDataService(chatbot_service.data_service, self.executor)
+
+    @property
+    def training_service(self):
+        return self.chatbot_service.training_service
+
+    async def process_message(self, message: str, session_id: str, context: Optional[Dict[str, Any]] = None,
+                              record: bool = True) -> ChatResponse:
+        """Answer a message, adding the turn to its session's history unless the caller records it itself"""
+        sent_at = datetime.utcnow()
+
+        def _process():
+            response = self.chatbot_service.process_message(message, session_id, context)
+            if record:
+                get_session_store().record_turn(session_id, message, response, sent_at)
+            return response
+
+        return await self.executor.run(_process)
+
+    async def process_batch(self, messages: List[str], session_ids: List[str], contexts: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[ChatResponse]:
+        """Answer many messages, adding each turn to its session's history when that session exists"""
+        sent_at = datetime.utcnow()
+
+        def _process():
+            responses = self.chatbot_service.process_batch(messages, session_ids, contexts)
+            store = get_session_store()
+            # Batches often use throwaway session IDs, so look each one up once rather than per message
+            known: Dict[str, bool] = {}
+            for message, session_id, response in zip(messages, session_ids, responses):
+                if session_id not in known:
+                    known[session_id] = store.get_session(session_id) is not None
+                if known[session_id]:
+                    store.record_turn(session_id, message, response, sent_at)
+            return responses
+
+        return await self.executor.run(_process)
+
+    async def get_enhanced_response(self, message: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return await self.executor.run(self.chatbot_service.training_service.get_enhanced_response, message, context)
+
+    async def get_training_summary(self) -> Dict[str, Any]:
+        return await self.executor.run(self.chatbot_service.get_training_summary)
+
+    async def retrain(self) -> Dict[str, Any]:
+        """Retrain and return the fresh summary in a single pool call"""
+        def _retrain():
+            self.chatbot_service._train_chatbot()
+            return self.chatbot_service.get_training_summary()
+
+        return await self.executor.run(_retrain, timeout=settings.TRAINING_TIMEOUT_SECONDS)
+
+    def get_welcome_message(self, session_id: str) -> ChatResponse:
+        return self.chatbot_service.get_welcome_message(session_id)
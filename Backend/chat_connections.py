@@ -0,0 +1,176 @@
+import asyncio
+import json
+from typing import Dict, Any, Optional
+from datetime import datetime
+import logging
+import uuid
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.models.chat import ChatSession
+from app.services.async_service import AsyncChatbotService, ExecutorSaturatedError, ExecutorTimeoutError
+from app.services.session_store import get_session_store
+
+logger = logging.getLogger(__name__)
+
+class ChatConnection:
+    """
+    One WebSocket bound to one ChatSession.
+
+    Incoming messages are queued and answered strictly in order by a single worker,
+    so clients can pipeline turns without waiting for each reply. The queue is
+    bounded; messages beyond the limit are rejected with a backpressure error frame.
+    """
+
+    def __init__(self, websocket: WebSocket, session: ChatSession, service: AsyncChatbotService):
+        self.websocket = websocket
+        self.session = session
+        self.service = service
+        self.pending: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_MAX_PENDING_MESSAGES)
+        self.busy = False
+        self._send_lock = asyncio.Lock()
+        self._closed = False
+
+    async def send(self, frame: Dict[str, Any]):
+        if self._closed:
+            return
+        async with self._send_lock:
+            await self.websocket.send_json(frame)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    async def run(self):
+        """Read frames until the client leaves or the connection goes idle"""
+        worker = asyncio.create_task(self._process_pending())
+        try:
+            while not self._closed:
+                try:
+                    text = await asyncio.wait_for(
+                        self.websocket.receive_text(),
+                        timeout=settings.WS_IDLE_TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if self.busy or not self.pending.empty():
+                        continue
+                    await self.close(code=1001, reason="idle timeout")
+                    break
+                try:
+                    frame = json.loads(text)
+                except ValueError:
+                    # A malformed frame is the client's mistake, not a reason to drop the socket
+                    await self.send({"type": "error", "code": "invalid_frame", "detail": "Frames must be JSON objects"})
+                    continue
+                await self._handle_frame(frame)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self._closed = True
+            worker.cancel()
+
+    async def _handle_frame(self, frame: Any):
+        if not isinstance(frame, dict):
+            await self.send({"type": "error", "code": "invalid_frame", "detail": "Frames must be JSON objects"})
+            return
+
+        frame_type = frame.get("type", "message")
+        if frame_type == "ping":
+            await self.send({"type": "pong", "timestamp": datetime.utcnow().isoformat()})
+            return
+        if frame_type != "message":
+            await self.send({"type": "error", "code": "invalid_frame", "detail": f"Unknown frame type: {frame_type}"})
+            return
+
+        message = frame.get("message")
+        frame_id = frame.get("id") or str(uuid.uuid4())
+        if not isinstance(message, str) or not message.strip() or len(message) > 1000:
+            await self.send({"type": "error", "id": frame_id, "code": "invalid_message", "detail": "Message must be 1-1000 characters"})
+            return
+
+        try:
+            self.pending.put_nowait((frame_id, message, frame.get("context")))
+        except asyncio.QueueFull:
+            await self.send({
+                "type": "error",
+                "id": frame_id,
+                "code": "backpressure",
+                "detail": f"Too many pending messages (max {settings.WS_MAX_PENDING_MESSAGES})"
+            })
+
+    async def _process_pending(self):
+        while True:
+            frame_id, message, context = await self.pending.get()
+            self.busy = True
+            try:
+                await self._answer(frame_id, message, context)
+            except Exception as e:
+                logger.error(f"Error answering WebSocket message in session {self.session.session_id}: {e}")
+                await self.send({"type": "error", "id": frame_id, "code": "internal_error", "detail": str(e)})
+            finally:
+                self.busy = False
+
+    async def _answer(self, frame_id: str, message: str, context: Optional[Dict[str, Any]]):
+        await self.send({"type": "typing", "id": frame_id})
+        sent_at = datetime.utcnow()
+
+        started = asyncio.get_running_loop().time()
+        task = asyncio.ensure_future(self.service.process_message(message, self.session.session_id, context, record=False))
+        try:
+            # Keep the client informed while a slow data lookup is running
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=settings.WS_PROGRESS_INTERVAL_SECONDS)
+                if done:
+                    break
+                elapsed_ms = int((asyncio.get_running_loop().time() - started) * 1000)
+                await self.send({"type": "progress", "id": frame_id, "elapsed_ms": elapsed_ms})
+            response = task.result()
+        except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+            code = "busy" if isinstance(e, ExecutorSaturatedError) else "timeout"
+            await self.send({"type": "error", "id": frame_id, "code": code, "detail": str(e)})
+            return
+        finally:
+            if not task.done():
+                task.cancel()
+
+        session = get_session_store().record_turn(self.session.session_id, message, response, sent_at)
+        if session is not None:
+            self.session = session
+        await self.send({"type": "response", "id": frame_id, "response": response.model_dump(mode="json")})
+
+class ChatConnectionManager:
+    """Tracks live WebSocket connections, one per chat session"""
+
+    def __init__(self):
+        self.connections: Dict[str, ChatConnection] = {}
+
+    async def connect(self, websocket: WebSocket, service: AsyncChatbotService, session_id: Optional[str] = None, user_id: Optional[str] = None) -> ChatConnection:
+        await websocket.accept()
+
+        session = get_session_store().get_or_create_session(session_id=session_id, user_id=user_id)
+
+        # A session lives on exactly one connection; a reconnect replaces the old socket
+        previous = self.connections.get(session.session_id)
+        if previous is not None:
+            await previous.close(code=4000, reason="superseded by a new connection")
+
+        connection = ChatConnection(websocket, session, service)
+        self.connections[session.session_id] = connection
+        return connection
+
+    def disconnect(self, connection: ChatConnection):
+        if self.connections.get(connection.session.session_id) is connection:
+            del self.connections[connection.session.session_id]
+
+    @property
+    def active_count(self) -> int:
+        return len(self.connections)
+
+# Global connection manager instance
+connection_manager = ChatConnectionManager()
@@ -1,390 +1,659 @@
-import re
-import random
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
-import uuid
-
-from app.models.chat import ChatMessage, MessageType, ChatResponse
-from app.core.config import settings
-from app.services.data_service import DataService
-from app.services.training_service import TrainingService
-
-class ChatbotService:
-    def __init__(self):
-        self.name = settings.CHATBOT_NAME
-        self.welcome_message = settings.CHATBOT_WELCOME_MESSAGE
-        self.data_service = DataService()
-        self.training_service = TrainingService(self.data_service)
-        
-        # Train the chatbot on startup
-        self._train_chatbot()
-        
-        # Define response patterns and templates
-        self.response_patterns = {
-            # Greetings
-            r'\b(hi|hello|hey|good morning|good afternoon|good evening)\b': self._handle_greeting,
-            
-            # Product analytics
-            r'\b(top\s+\d+\s+most\s+sold|best\s+sellers|popular\s+products|trending)\b': self._handle_top_products_inquiry,
-            r'\b(most\s+sold|best\s+selling|top\s+products)\b': self._handle_top_products_inquiry,
-            
-            # Product inquiries
-            r'\b(product|item|clothing|shirt|pants|dress|shoes|accessories)\b': self._handle_product_inquiry,
-            r'\b(price|cost|how much|expensive|cheap)\b': self._handle_price_inquiry,
-            r'\b(size|fit|measurement|small|medium|large)\b': self._handle_size_inquiry,
-            r'\b(color|colour|red|blue|green|black|white)\b': self._handle_color_inquiry,
-            
-            # Order inquiries
-            r'\b(order\s+id\s+\d+|order\s+#\d+|status\s+of\s+order)\b': self._handle_order_status_inquiry,
-            r'\b(order|purchase|buy|shopping cart|checkout)\b': self._handle_order_inquiry,
-            r'\b(track|tracking|where is|delivery|shipping)\b': self._handle_tracking_inquiry,
-            r'\b(return|refund|exchange|cancel)\b': self._handle_return_inquiry,
-            
-            # Inventory inquiries
-            r'\b(stock|inventory|available|left\s+in\s+stock|how\s+many)\b': self._handle_inventory_inquiry,
-            
-            # General support
-            r'\b(help|support|assist|problem|issue)\b': self._handle_help_request,
-            r'\b(contact|phone|email|customer service)\b': self._handle_contact_inquiry,
-            r'\b(policy|terms|conditions|warranty)\b': self._handle_policy_inquiry,
-            
-            # Payment
-            r'\b(payment|pay|credit card|debit|paypal)\b': self._handle_payment_inquiry,
-            
-            # Shipping
-            r'\b(shipping|delivery|free shipping|express|standard)\b': self._handle_shipping_inquiry,
-        }
-        
-        # Response templates
-        self.templates = {
-            'greeting': [
-                "Hello! I'm {name}, your fashion assistant. How can I help you today?",
-                "Hi there! I'm {name}, ready to help you with all your fashion needs!",
-                "Welcome! I'm {name}, your personal shopping assistant. What can I do for you?"
-            ],
-            'product_info': [
-                "I'd be happy to help you find the perfect {category}! What specific style or features are you looking for?",
-                "Great choice! We have a wide selection of {category}. Would you like me to show you our best sellers?",
-                "Our {category} collection is amazing! What size and color are you interested in?"
-            ],
-            'price_info': [
-                "Our prices range from ${min_price} to ${max_price} for {category}. Is there a specific budget you have in mind?",
-                "We offer competitive pricing on all our {category}. Plus, we have regular sales and discounts!",
-                "Prices vary by style and material. Would you like me to show you our most popular {category} options?"
-            ],
-            'size_help': [
-                "We offer sizes XS to XXL for most items. You can find our size guide on each product page, or I can help you find the right fit!",
-                "Not sure about your size? Our detailed size charts are available on every product page. Would you like me to explain how to measure?",
-                "We have a comprehensive size guide to help you find the perfect fit. What's your usual size in other brands?"
-            ],
-            'order_help': [
-                "I can help you with your order! Do you need help placing a new order or checking an existing one?",
-                "For orders, you can browse our catalog and add items to your cart. Would you like me to show you our featured products?",
-                "Placing an order is easy! Just add items to your cart and proceed to checkout. Need help finding something specific?"
-            ],
-            'tracking_help': [
-                "To track your order, you'll need your order number. You can find it in your order confirmation email or account dashboard.",
-                "Once your order ships, you'll receive a tracking number via email. You can also check your order status in your account.",
-                "Track your order by logging into your account or using the tracking number from your shipping confirmation email."
-            ],
-            'return_help': [
-                "We have a 30-day return policy for most items. Items must be unworn and in original packaging. Would you like me to explain the process?",
-                "Returns are easy! You can initiate a return through your account or contact our customer service team.",
-                "Our return policy allows returns within 30 days of delivery. Just make sure items are in original condition!"
-            ],
-            'contact_help': [
-                "You can reach our customer service team at support@fashionstore.com or call us at 1-800-FASHION. We're here to help!",
-                "Need to speak with someone? Our customer service team is available Monday-Friday, 9 AM to 6 PM EST.",
-                "For immediate assistance, you can email us at support@fashionstore.com or use our live chat feature."
-            ],
-            'payment_help': [
-                "We accept all major credit cards, PayPal, and Apple Pay. All payments are secure and encrypted.",
-                "Payment options include Visa, MasterCard, American Express, PayPal, and Apple Pay. Your payment information is always secure.",
-                "We offer multiple secure payment methods including credit cards, PayPal, and digital wallets."
-            ],
-            'shipping_help': [
-                "We offer free standard shipping on orders over $50! Express shipping is available for faster delivery.",
-                "Standard shipping takes 3-5 business days and is free on orders over $50. Express shipping (1-2 days) is available for an additional fee.",
-                "Free shipping on orders over $50! Standard delivery takes 3-5 days, or upgrade to express for 1-2 day delivery."
-            ],
-            'fallback': [
-                "I'm not sure I understood that. Could you rephrase your question? I'm here to help with products, orders, returns, and general support!",
-                "I didn't quite catch that. Are you asking about our products, orders, returns, or something else?",
-                "Let me help you better. Are you looking for product information, order help, or customer support?"
-            ]
-        }
-        
-        # Quick reply suggestions
-        self.quick_replies = {
-            'greeting': ["Show me products", "Track my order", "Return policy", "Contact support"],
-            'product': ["Men's clothing", "Women's clothing", "Accessories", "Sale items"],
-            'order': ["Place order", "Track order", "Order history", "Cancel order"],
-            'support': ["Returns", "Shipping", "Payment", "Contact us"]
-        }
-
-    def _train_chatbot(self):
-        """Train the chatbot with the dataset"""
-        try:
-            success = self.training_service.train_chatbot()
-            if success:
-                print("✅ Chatbot training completed successfully!")
-                summary = self.training_service.get_training_summary()
-                print(f"📊 Training Summary: {summary}")
-            else:
-                print("❌ Chatbot training failed!")
-        except Exception as e:
-            print(f"⚠️ Training error: {e}")
-
-    def process_message(self, message: str, session_id: str, context: Optional[Dict[str, Any]] = None) -> ChatResponse:
-        """Process user message and generate appropriate response"""
-        message_lower = message.lower().strip()
-        
-        # First, try to get enhanced response from training service
-        enhanced_response = self.training_service.get_enhanced_response(message_lower, context)
-        
-        if enhanced_response['confidence'] > 0.7:
-            # Use enhanced response from training
-            response_text = enhanced_response['template']
-            response_type = enhanced_response['response_type']
-        else:
-            # Fall back to pattern matching
-            response_text, response_type = self._match_patterns(message_lower, context)
-        
-        # Generate quick replies based on response type
-        quick_replies = self.quick_replies.get(response_type, [])
-        
-        # Generate suggestions based on context
-        suggestions = self._generate_suggestions(message_lower, context)
-        
-        return ChatResponse(
-            message=response_text,
-            session_id=session_id,
-            timestamp=datetime.utcnow(),
-            suggestions=suggestions,
-            quick_replies=quick_replies,
-            metadata={
-                "response_type": response_type,
-                "confidence": enhanced_response.get('confidence', 0.9),
-                "context": context,
-                "training_used": enhanced_response['confidence'] > 0.7
-            }
-        )
-
-    def _match_patterns(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Match message against patterns and return appropriate response"""
-        for pattern, handler in self.response_patterns.items():
-            if re.search(pattern, message, re.IGNORECASE):
-                return handler(message, context)
-        
-        # Fallback response
-        return self._handle_fallback(message, context)
-
-    def _handle_greeting(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle greeting messages"""
-        template = random.choice(self.templates['greeting'])
-        return template.format(name=self.name), 'greeting'
-
-    def _handle_product_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle product-related inquiries"""
-        # Extract category from message
-        categories = ['shirt', 'pants', 'dress', 'shoes', 'accessories', 'clothing']
-        category = 'clothing'
-        
-        for cat in categories:
-            if cat in message:
-                category = cat
-                break
-        
-        template = random.choice(self.templates['product_info'])
-        return template.format(category=category), 'product'
-
-    def _handle_price_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle price-related inquiries"""
-        template = random.choice(self.templates['price_info'])
-        return template.format(category='clothing', min_price=25, max_price=200), 'product'
-
-    def _handle_size_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle size-related inquiries"""
-        template = random.choice(self.templates['size_help'])
-        return template, 'product'
-
-    def _handle_color_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle color-related inquiries"""
-        return "We offer a wide range of colors including black, white, red, blue, green, and many more! What's your favorite color?", 'product'
-
-    def _handle_order_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle order-related inquiries"""
-        template = random.choice(self.templates['order_help'])
-        return template, 'order'
-
-    def _handle_tracking_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle tracking-related inquiries"""
-        template = random.choice(self.templates['tracking_help'])
-        return template, 'order'
-
-    def _handle_return_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle return-related inquiries"""
-        template = random.choice(self.templates['return_help'])
-        return template, 'support'
-
-    def _handle_help_request(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle general help requests"""
-        return "I'm here to help! I can assist with product information, orders, returns, shipping, and more. What do you need help with?", 'support'
-
-    def _handle_contact_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle contact-related inquiries"""
-        template = random.choice(self.templates['contact_help'])
-        return template, 'support'
-
-    def _handle_policy_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle policy-related inquiries"""
-        return "Our policies include a 30-day return policy, secure payment processing, and free shipping on orders over $50. Which policy would you like to know more about?", 'support'
-
-    def _handle_payment_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle payment-related inquiries"""
-        template = random.choice(self.templates['payment_help'])
-        return template, 'support'
-
-    def _handle_shipping_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle shipping-related inquiries"""
-        template = random.choice(self.templates['shipping_help'])
-        return template, 'support'
-
-    def _handle_top_products_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle top products inquiries"""
-        try:
-            # Extract number from message (default to 5)
-            import re
-            number_match = re.search(r'top\s+(\d+)', message.lower())
-            limit = int(number_match.group(1)) if number_match else 5
-            
-            top_products = self.data_service.get_top_products(limit)
-            
-            if not top_products:
-                return "I don't have sales data available right now. Would you like me to show you our featured products instead?", 'product'
-            
-            response = f"Based on our sales data, here are the top {limit} most sold products:\n\n"
-            
-            for i, product in enumerate(top_products, 1):
-                response += f"{i}. {product['name']} - {product['units_sold']} units sold (${product['unit_price']:.2f})\n"
-            
-            response += "\nWould you like me to show you similar products or help you find something specific?"
-            
-            return response, 'product'
-            
-        except Exception as e:
-            return "I'm having trouble accessing the sales data right now. Would you like me to show you our featured products instead?", 'product'
-
-    def _handle_order_status_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle order status inquiries"""
-        try:
-            # Extract order ID from message
-            import re
-            order_match = re.search(r'order\s+(?:id\s+)?#?(\d+)', message.lower())
-            if not order_match:
-                return "I need an order ID to check the status. Could you please provide your order number?", 'order'
-            
-            order_id = order_match.group(1)
-            order_status = self.data_service.get_order_status(order_id)
-            
-            if not order_status:
-                return f"I couldn't find order #{order_id}. Please check the order number and try again.", 'order'
-            
-            response = f"I found your order #{order_id}. Here's the current status:\n\n"
-            response += f"📦 Order Status: {order_status['status'].title()}\n"
-            response += f"📅 Order Date: {order_status['created_at']}\n"
-            response += f"👤 Customer: {order_status['user_name']}\n"
-            
-            if order_status['shipped_at']:
-                response += f"🚚 Shipped: {order_status['shipped_at']}\n"
-            if order_status['delivered_at']:
-                response += f"📦 Delivered: {order_status['delivered_at']}\n"
-            
-            response += f"\nOrder Details:\n"
-            for item in order_status['items']:
-                response += f"- {item['name']} - ${item['retail_price']:.2f} ({item['status']})\n"
-            
-            response += f"\nTotal: ${order_status['total_amount']:.2f}\n\n"
-            response += "Would you like me to help you track this package or answer any questions about your order?"
-            
-            return response, 'order'
-            
-        except Exception as e:
-            return "I'm having trouble accessing the order information right now. Please try again or contact our support team.", 'order'
-
-    def _handle_inventory_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle inventory inquiries"""
-        try:
-            # Extract product name from message
-            import re
-            
-            # Look for specific product mentions
-            product_keywords = ['t-shirt', 'shirt', 'jeans', 'dress', 'shoes', 'wallet']
-            found_product = None
-            
-            for keyword in product_keywords:
-                if keyword in message.lower():
-                    found_product = keyword
-                    break
-            
-            if not found_product:
-                return "I can help you check inventory for specific products. What item would you like to check?", 'product'
-            
-            inventory_status = self.data_service.get_inventory_status(product_name=found_product)
-            
-            if not inventory_status:
-                return f"I don't have inventory data for {found_product} right now. Would you like me to show you similar products?", 'product'
-            
-            response = f"I checked our inventory for {found_product.title()}. Here's what's available:\n\n"
-            
-            for item in inventory_status:
-                response += f"📦 {item['product_name']}:\n"
-                response += f"   - Available: {item['available_quantity']} units\n"
-                response += f"   - Price: ${item['product_retail_price']:.2f}\n"
-                if 'name' in item:  # distribution center name
-                    response += f"   - Location: {item['name']}\n"
-                response += "\n"
-            
-            response += "Would you like me to help you place an order or check other products?"
-            
-            return response, 'product'
-            
-        except Exception as e:
-            return "I'm having trouble accessing the inventory data right now. Would you like me to show you our product catalog instead?", 'product'
-
-    def _handle_fallback(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        """Handle unrecognized messages"""
-        template = random.choice(self.templates['fallback'])
-        return template, 'support'
-
-    def _generate_suggestions(self, message: str, context: Optional[Dict[str, Any]] = None) -> List[str]:
-        """Generate contextual suggestions based on message and context"""
-        suggestions = []
-        
-        if any(word in message for word in ['product', 'item', 'clothing']):
-            suggestions.extend(["Show me men's clothing", "Show me women's clothing", "What's on sale?"])
-        elif any(word in message for word in ['order', 'track', 'delivery']):
-            suggestions.extend(["Track my order", "Order history", "Shipping info"])
-        elif any(word in message for word in ['return', 'refund', 'exchange']):
-            suggestions.extend(["Return policy", "Start return", "Contact support"])
-        else:
-            suggestions.extend(["Browse products", "Track order", "Get help"])
-        
-        return suggestions[:3]  # Limit to 3 suggestions
-
-    def get_welcome_message(self, session_id: str) -> ChatResponse:
-        """Get welcome message for new chat session"""
-        return ChatResponse(
-            message=self.welcome_message,
-            session_id=session_id,
-            timestamp=datetime.utcnow(),
-            quick_replies=self.quick_replies['greeting'],
-            metadata={
-                "response_type": "welcome",
-                "confidence": 1.0
-            }
-        )
-
-    def get_training_summary(self) -> Dict[str, Any]:
-        """Get training summary for monitoring"""
+import re
+import random
+import string
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import uuid
+
+from app.models.chat import ChatMessage, MessageType, ChatResponse
+from app.core.config import settings
+from app.services.data_service import DataService
+from app.services.training_service import TrainingService
+from app.services.product_index import ProductFilters
+
+class ChatbotService:
+    def __init__(self, data_service: Optional[DataService] = None):
+        self.name = settings.CHATBOT_NAME
+        self.welcome_message = settings.CHATBOT_WELCOME_MESSAGE
+        self.data_service = data_service if data_service is not None else DataService()
+        self.training_service = TrainingService(self.data_service)
+        
+        # Train the chatbot on startup
+        self._train_chatbot()
+        
+        # Define response patterns and templates
+        self.response_patterns = {
+            # Greetings
+            r'\b(hi|hello|hey|good morning|good afternoon|good evening)\b': self._handle_greeting,
+            
+            # Product analytics
+            r'\b(top\s+\d+\s+most\s+sold|best\s+sellers|popular\s+products|trending)\b': self._handle_top_products_inquiry,
+            r'\b(most\s+sold|best\s+selling|top\s+products)\b': self._handle_top_products_inquiry,
+            
+            # Product inquiries
+            r'\b(product|item|clothing|shirt|pants|dress|shoes|accessories)\b': self._handle_product_inquiry,
+            r'\b(price|cost|how much|expensive|cheap)\b': self._handle_price_inquiry,
+            r'\b(size|fit|measurement|small|medium|large)\b': self._handle_size_inquiry,
+            r'\b(color|colour|red|blue|green|black|white)\b': self._handle_color_inquiry,
+            
+            # Order inquiries
+            r'\b(order\s+id\s+\d+|order\s+#\d+|status\s+of\s+order)\b': self._handle_order_status_inquiry,
+            r'\b(order|purchase|buy|shopping cart|checkout)\b': self._handle_order_inquiry,
+            r'\b(track|tracking|where is|delivery|shipping|arrive|arriving|eta)\b': self._handle_tracking_inquiry,
+            r'\b(return|refund|exchange|cancel)\b': self._handle_return_inquiry,
+            
+            # Inventory inquiries
+            r'\b(stock|inventory|available|left\s+in\s+stock|how\s+many)\b': self._handle_inventory_inquiry,
+            
+            # General support
+            r'\b(help|support|assist|problem|issue)\b': self._handle_help_request,
+            r'\b(contact|phone|email|customer service)\b': self._handle_contact_inquiry,
+            r'\b(policy|terms|conditions|warranty)\b': self._handle_policy_inquiry,
+            
+            # Payment
+            r'\b(payment|pay|credit card|debit|paypal)\b': self._handle_payment_inquiry,
+            
+            # Shipping
+            r'\b(shipping|delivery|free shipping|express|standard)\b': self._handle_shipping_inquiry,
+        }
+        
+        # Compile once; every message is matched against these in order
+        self._compiled_patterns = [
+            (re.compile(pattern, re.IGNORECASE), handler)
+            for pattern, handler in self.response_patterns.items()
+        ]
+        
+        # Intents a concrete product search can answer; any other matching intent keeps its own handler
+        self._product_search_handlers = {
+            self._handle_greeting,
+            self._handle_product_inquiry,
+            self._handle_price_inquiry,
+            self._handle_size_inquiry,
+            self._handle_color_inquiry,
+            self._handle_order_inquiry,
+        }
+        
+        # Response templates
+        self.templates = {
+            'greeting': [
+                "Hello! I'm {name}, your fashion assistant. How can I help you today?",
+                "Hi there! I'm {name}, ready to help you with all your fashion needs!",
+                "Welcome! I'm {name}, your personal shopping assistant. What can I do for you?"
+            ],
+            'product_info': [
+                "I'd be happy to help you find the perfect {category}! What specific style or features are you looking for?",
+                "Great choice! We have a wide selection of {category}. Would you like me to show you our best sellers?",
+                "Our {category} collection is amazing! What size and color are you interested in?"
+            ],
+            'price_info': [
+                "Our prices range from ${min_price} to ${max_price} for {category}. Is there a specific budget you have in mind?",
+                "We offer competitive pricing on all our {category}. Plus, we have regular sales and discounts!",
+                "Prices vary by style and material. Would you like me to show you our most popular {category} options?"
+            ],
+            'size_help': [
+                "We offer sizes XS to XXL for most items. You can find our size guide on each product page, or I can help you find the right fit!",
+                "Not sure about your size? Our detailed size charts are available on every product page. Would you like me to explain how to measure?",
+                "We have a comprehensive size guide to help you find the perfect fit. What's your usual size in other brands?"
+            ],
+            'order_help': [
+                "I can help you with your order! Do you need help placing a new order or checking an existing one?",
+                "For orders, you can browse our catalog and add items to your cart. Would you like me to show you our featured products?",
+                "Placing an order is easy! Just add items to your cart and proceed to checkout. Need help finding something specific?"
+            ],
+            'tracking_help': [
+                "To track your order, you'll need your order number. You can find it in your order confirmation email or account dashboard.",
+                "Once your order ships, you'll receive a tracking number via email. You can also check your order status in your account.",
+                "Track your order by logging into your account or using the tracking number from your shipping confirmation email."
+            ],
+            'return_help': [
+                "We have a 30-day return policy for most items. Items must be unworn and in original packaging. Would you like me to explain the process?",
+                "Returns are easy! You can initiate a return through your account or contact our customer service team.",
+                "Our return policy allows returns within 30 days of delivery. Just make sure items are in original condition!"
+            ],
+            'contact_help': [
+                "You can reach our customer service team at support@fashionstore.com or call us at 1-800-FASHION. We're here to help!",
+                "Need to speak with someone? Our customer service team is available Monday-Friday, 9 AM to 6 PM EST.",
+                "For immediate assistance, you can email us at support@fashionstore.com or use our live chat feature."
+            ],
+            'payment_help': [
+                "We accept all major credit cards, PayPal, and Apple Pay. All payments are secure and encrypted.",
+                "Payment options include Visa, MasterCard, American Express, PayPal, and Apple Pay. Your payment information is always secure.",
+                "We offer multiple secure payment methods including credit cards, PayPal, and digital wallets."
+            ],
+            'shipping_help': [
+                "We offer free standard shipping on orders over $50! Express shipping is available for faster delivery.",
+                "Standard shipping takes 3-5 business days and is free on orders over $50. Express shipping (1-2 days) is available for an additional fee.",
+                "Free shipping on orders over $50! Standard delivery takes 3-5 days, or upgrade to express for 1-2 day delivery."
+            ],
+            'fallback': [
+                "I'm not sure I understood that. Could you rephrase your question? I'm here to help with products, orders, returns, and general support!",
+                "I didn't quite catch that. Are you asking about our products, orders, returns, or something else?",
+                "Let me help you better. Are you looking for product information, order help, or customer support?"
+            ]
+        }
+        
+        # An explicit order reference ("order #N", "order id N" or "#N"); also groups lookups across a batch
+        self._order_id_pattern = re.compile(r'(?:\border\s+id\s+#?|#)(\d+)\b')
+        
+        # Requests for products related to a named one take precedence over plain product searches
+        self._recommendation_pattern = re.compile(
+            r'\b(similar\s+(?:products?\s+)?to|(?:something|more)\s+like|go(?:es)?\s+(?:well\s+)?with|'
+            r'bought\s+together|pairs?\s+(?:well\s+)?with|recommend(?:ations?)?\s+(?:for|with))\b',
+            re.IGNORECASE
+        )
+        
+        # Quick reply suggestions
+        self.quick_replies = {
+            'greeting': ["Show me products", "Track my order", "Return policy", "Contact support"],
+            'product': ["Men's clothing", "Women's clothing", "Accessories", "Sale items"],
+            'order': ["Place order", "Track order", "Order history", "Cancel order"],
+            'support': ["Returns", "Shipping", "Payment", "Contact us"]
+        }
+
+    def _train_chatbot(self):
+        """Train the chatbot with the dataset"""
+        try:
+            success = self.training_service.train_chatbot()
+            if success:
+                print("✅ Chatbot training completed successfully!")
+                summary = self.training_service.get_training_summary()
+                print(f"📊 Training Summary: {summary}")
+            else:
+                print("❌ Chatbot training failed!")
+        except Exception as e:
+            print(f"⚠️ Training error: {e}")
+
+    def process_message(self, message: str, session_id: str, context: Optional[Dict[str, Any]] = None) -> ChatResponse:
+        """Process user message and generate appropriate response"""
+        message_lower = message.lower().strip()
+        
+        # First, try to get enhanced response from training service
+        enhanced_response = self.training_service.get_enhanced_response(message_lower, context)
+        
+        return self._build_response(message_lower, session_id, context, enhanced_response)
+
+    def process_batch(self, messages: List[str], session_ids: List[str], contexts: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[ChatResponse]:
+        """Process many messages at once, grouping the data lookups they need"""
+        if contexts is None:
+            contexts = [None] * len(messages)
+        
+        normalized = [message.lower().strip() for message in messages]
+        enhanced_responses = [
+            self.training_service.get_enhanced_response(message_lower, context)
+            for message_lower, context in zip(normalized, contexts)
+        ]
+        
+        # Collect every order ID in the batch so they need one lookup instead of one per message
+        order_ids = set()
+        for message_lower in normalized:
+            for order_match in self._order_id_pattern.finditer(message_lower):
+                order_ids.add(order_match.group(1))
+        
+        with self.data_service.prefetched(order_ids=order_ids):
+            return [
+                self._build_response(message_lower, session_id, context, enhanced_response)
+                for message_lower, session_id, context, enhanced_response
+                in zip(normalized, session_ids, contexts, enhanced_responses)
+            ]
+
+    def _build_response(self, message_lower: str, session_id: str, context: Optional[Dict[str, Any]], enhanced_response: Dict[str, Any]) -> ChatResponse:
+        """Turn a normalized message and its training lookup into a ChatResponse"""
+        wants_recommendations = self._recommendation_pattern.search(message_lower) is not None
+        product_filters = None
+        if not wants_recommendations and self._is_product_search(message_lower, enhanced_response):
+            product_filters = self._specific_product_filters(message_lower)
+        if wants_recommendations:
+            response_text, response_type = self._handle_recommendation_inquiry(message_lower, context)
+        elif product_filters is not None:
+            # A concrete product search beats a canned category template
+            response_text, response_type = self._answer_product_query(product_filters)
+        elif enhanced_response.get('response_type') == 'order_status':
+            # The order's own status and delivery estimate beat the canned status template,
+            # and without an order reference asking which order does too
+            response_text, response_type = self._handle_order_status_inquiry(message_lower, context)
+        elif enhanced_response.get('response_type') == 'inventory_info' or self._asks_about_stock(message_lower):
+            # Live stock counts for the products asked about beat the canned availability template
+            response_text, response_type = self._handle_inventory_inquiry(message_lower, context)
+        elif enhanced_response['confidence'] > 0.7:
+            # Use enhanced response from training
+            response_text = enhanced_response['template']
+            response_type = enhanced_response['response_type']
+        else:
+            # Fall back to pattern matching
+            response_text, response_type = self._match_patterns(message_lower, context)
+        
+        # Generate quick replies based on response type
+        quick_replies = self.quick_replies.get(response_type, [])
+        
+        # Generate suggestions based on context
+        suggestions = self._generate_suggestions(message_lower, context)
+        
+        return ChatResponse(
+            message=response_text,
+            session_id=session_id,
+            timestamp=datetime.utcnow(),
+            suggestions=suggestions,
+            quick_replies=quick_replies,
+            metadata={
+                "response_type": response_type,
+                "confidence": enhanced_response.get('confidence', 0.9),
+                "context": context,
+                "training_used": enhanced_response['confidence'] > 0.7
+            }
+        )
+
+    def _match_patterns(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Match message against patterns and return appropriate response"""
+        handlers = self._matching_handlers(message)
+        if handlers:
+            # A product mentioned in a question about returns, stock or shipping doesn't make it a product search
+            handler = next((h for h in handlers if h not in self._product_search_handlers), handlers[0])
+            return handler(message, context)
+        
+        # Fallback response
+        return self._handle_fallback(message, context)
+
+    def _matching_handlers(self, message: str) -> List[Any]:
+        """Handlers of every pattern the message matches, in pattern order"""
+        return [handler for pattern, handler in self._compiled_patterns if pattern.search(message)]
+
+    def _handle_greeting(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle greeting messages"""
+        template = random.choice(self.templates['greeting'])
+        return template.format(name=self.name), 'greeting'
+
+    def _is_product_search(self, message: str, enhanced_response: Dict[str, Any]) -> bool:
+        """Whether the message asks only about products, not about an order, stock, returns, shipping or support"""
+        if enhanced_response.get('response_type') in ('order_status', 'inventory_info'):
+            return False
+        return all(handler in self._product_search_handlers for handler in self._matching_handlers(message))
+
+    def _asks_about_stock(self, message: str) -> bool:
+        """Whether the message asks about stock of products, whatever template the training matched"""
+        handlers = self._matching_handlers(message)
+        return self._handle_inventory_inquiry in handlers and all(
+            handler in self._product_search_handlers or handler == self._handle_inventory_inquiry for handler in handlers
+        )
+
+    def _specific_product_filters(self, message: str) -> Optional[ProductFilters]:
+        """Filters for messages that name a price bound, brand or color, or combine two attributes"""
+        filters = self.data_service.extract_product_filters(message)
+        if filters.is_empty:
+            return None
+        
+        attributes = [filters.category, filters.department, filters.brand, filters.color]
+        has_price = filters.min_price is not None or filters.max_price is not None
+        if has_price or filters.brand or filters.color or sum(value is not None for value in attributes) >= 2:
+            return filters
+        return None
+
+    def _describe_filters(self, filters: ProductFilters) -> str:
+        parts = []
+        if filters.color:
+            parts.append(filters.color)
+        if filters.department:
+            parts.append(f"{filters.department}'s")
+        parts.append(filters.category or 'products')
+        description = ' '.join(parts)
+        if filters.brand:
+            description += f" from {string.capwords(filters.brand)}"
+        if filters.min_price is not None and filters.max_price is not None:
+            description += f" between ${filters.min_price:.2f} and ${filters.max_price:.2f}"
+        elif filters.max_price is not None:
+            description += f" under ${filters.max_price:.2f}"
+        elif filters.min_price is not None:
+            description += f" over ${filters.min_price:.2f}"
+        return description
+
+    def _answer_product_query(self, filters: ProductFilters) -> Tuple[str, str]:
+        """Answer with real counts and the best matching products"""
+        result = self.data_service.query_products(filters, limit=5)
+        description = self._describe_filters(filters)
+        
+        if result['count'] == 0:
+            return f"I couldn't find any {description} right now. Would you like me to widen the search?", 'product'
+        
+        response = f"I found {result['count']} {description}, priced from ${result['min_price']:.2f} to ${result['max_price']:.2f}. Here are the best matches:\n\n"
+        for i, product in enumerate(result['products'], 1):
+            response += f"{i}. {product['name']} by {product['brand']} - ${product['retail_price']:.2f}\n"
+        response += "\nWould you like more details on any of these?"
+        
+        return response, 'product'
+
+    def _handle_product_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle product-related inquiries"""
+        filters = self.data_service.extract_product_filters(message)
+        if not filters.is_empty:
+            return self._answer_product_query(filters)
+        
+        # Extract category from message
+        categories = ['shirt', 'pants', 'dress', 'shoes', 'accessories', 'clothing']
+        category = 'clothing'
+        
+        for cat in categories:
+            if cat in message:
+                category = cat
+                break
+        
+        template = random.choice(self.templates['product_info'])
+        return template.format(category=category), 'product'
+
+    def _handle_price_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle price-related inquiries"""
+        filters = self.data_service.extract_product_filters(message)
+        if not filters.is_empty:
+            return self._answer_product_query(filters)
+        
+        # Quote the real catalog price range rather than a fixed one
+        overall = self.data_service.query_products(filters, limit=0)
+        min_price = f"{overall['min_price']:.2f}" if overall['min_price'] is not None else 25
+        max_price = f"{overall['max_price']:.2f}" if overall['max_price'] is not None else 200
+        
+        template = random.choice(self.templates['price_info'])
+        return template.format(category='clothing', min_price=min_price, max_price=max_price), 'product'
+
+    def _handle_size_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle size-related inquiries"""
+        template = random.choice(self.templates['size_help'])
+        return template, 'product'
+
+    def _handle_color_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle color-related inquiries"""
+        return "We offer a wide range of colors including black, white, red, blue, green, and many more! What's your favorite color?", 'product'
+
+    def _handle_order_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle order-related inquiries"""
+        template = random.choice(self.templates['order_help'])
+        return template, 'order'
+
+    def _handle_tracking_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle tracking-related inquiries"""
+        # With the customer's order number, answer when it should arrive
+        order_id = self._order_reference(message)
+        if order_id and self._lookup_order(order_id, context):
+            estimate = self.data_service.get_delivery_estimate(order_id)
+            if estimate:
+                if estimate['status'] == 'delivered':
+                    return f"Order #{order_id} was delivered on {estimate['delivered_at']:%Y-%m-%d}.", 'order'
+                return f"Order #{order_id}: {self._describe_delivery(estimate)}", 'order'
+        
+        template = random.choice(self.templates['tracking_help'])
+        return template, 'order'
+    
+    def _order_reference(self, message: str) -> Optional[str]:
+        """The order ID a message explicitly refers to, if any"""
+        order_match = self._order_id_pattern.search(message)
+        return order_match.group(1) if order_match else None
+    
+    def _lookup_order(self, order_id: str, context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """An order's status, or None when it doesn't exist or belongs to another customer than the one chatting"""
+        order_status = self.data_service.get_order_status(order_id)
+        user_id = (context or {}).get('user_id')
+        if order_status and user_id is not None and order_status['user_id'] != str(user_id):
+            # Answer as if the order doesn't exist so other customers' order IDs can't be probed
+            return None
+        return order_status
+    
+    def _describe_delivery(self, estimate: Dict[str, Any]) -> str:
+        """One line on when an undelivered order should arrive"""
+        state = "It's on its way" if estimate['status'] == 'in_transit' else "It's being prepared"
+        source = f" from {estimate['distribution_center']}"
+        if estimate['distance_km'] is not None:
+            source += f" ({estimate['distance_km']:,.0f} km away)"
+        if estimate['overdue']:
+            return f"🚚 {state}{source} and is running later than usual, sorry! It was due by {estimate['latest_delivery']:%Y-%m-%d}."
+        if estimate['estimated_delivery'].date() == estimate['latest_delivery'].date():
+            return f"🚚 {state}{source}. Expected delivery: {estimate['estimated_delivery']:%a %b %d}."
+        return (
+            f"🚚 {state}{source}. Expected delivery: {estimate['estimated_delivery']:%a %b %d}, "
+            f"{estimate['latest_delivery']:%a %b %d} at the latest."
+        )
+
+    def _handle_return_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle return-related inquiries"""
+        template = random.choice(self.templates['return_help'])
+        return template, 'support'
+
+    def _handle_help_request(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle general help requests"""
+        return "I'm here to help! I can assist with product information, orders, returns, shipping, and more. What do you need help with?", 'support'
+
+    def _handle_contact_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle contact-related inquiries"""
+        template = random.choice(self.templates['contact_help'])
+        return template, 'support'
+
+    def _handle_policy_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle policy-related inquiries"""
+        return "Our policies include a 30-day return policy, secure payment processing, and free shipping on orders over $50. Which policy would you like to know more about?", 'support'
+
+    def _handle_payment_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle payment-related inquiries"""
+        template = random.choice(self.templates['payment_help'])
+        return template, 'support'
+
+    def _handle_shipping_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle shipping-related inquiries"""
+        template = random.choice(self.templates['shipping_help'])
+        return template, 'support'
+
+    def _handle_top_products_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle top products inquiries"""
+        try:
+            # Extract number from message (default to 5)
+            number_match = re.search(r'top\s+(\d+)', message.lower())
+            limit = int(number_match.group(1)) if number_match else 5
+            
+            # Narrow the ranking by category, department, time window and metric when mentioned
+            ranking = self.data_service.product_ranking
+            category = None
+            department = None
+            if ranking is not None:
+                category = next((c for c in ranking.categories if re.search(rf'\b{re.escape(c)}\b', message)), None)
+                department = next((d for d in ranking.departments if re.search(rf'\b{re.escape(d)}\b', message)), None)
+            
+            window_days = None
+            if re.search(r'\b(this|last|past)\s+week\b', message):
+                window_days = 7
+            elif re.search(r'\b(this|last|past)\s+month\b', message):
+                window_days = 30
+            elif re.search(r'\b(this|last|past)\s+quarter\b|\b90\s+days\b', message):
+                window_days = 90
+            wants_trending = re.search(r'\btrending\b', message) is not None
+            if wants_trending and window_days is None:
+                # Trending with no window named compares the last week with the one before
+                window_days = 7
+            
+            by = 'revenue' if re.search(r'\b(revenue|earning|grossing)\b', message) else 'units'
+
+            # Trending means gaining on the window before, which the daily rollups answer directly
+            if wants_trending and not department:
+                trending = self.data_service.get_sales_trends(
+                    'product', days=window_days, metric='revenue' if by == 'revenue' else 'items',
+                    limit=limit, trending=True, category=category
+                )
+                if trending:
+                    scope = f" {category}" if category else ""
+                    response = f"Here are the {len(trending)} fastest-rising{scope} products over the last {window_days} days:\n\n"
+                    for i, product in enumerate(trending, 1):
+                        figure = f"${product['revenue']:.2f} revenue" if by == 'revenue' else f"{product['items']} sold"
+                        previous = f"${product['previous_revenue']:.2f}" if by == 'revenue' else f"{product['previous_items']:g}"
+                        change = (
+                            f"up {product['change_pct']:.0f}% from {previous} the {window_days} days before"
+                            if product['change_pct'] is not None else f"none the {window_days} days before"
+                        )
+                        response += f"{i}. {product['name']} - {figure} ({change})\n"
+                    response += "\nAsk me for products similar to any of these, or what goes well with them!"
+                    return response, 'product'
+
+            top_products = self.data_service.get_top_products(
+                limit, by=by, category=category, department=department, window_days=window_days
+            )
+            
+            if not top_products:
+                return "I don't have sales data available right now. Would you like me to show you our featured products instead?", 'product'
+            
+            scope = f" {category or department}" if (category or department) else ""
+            period = f" in the last {window_days} days" if window_days else ""
+            metric = "highest revenue" if by == 'revenue' else "most sold"
+            response = f"Based on our sales data, here are the top {len(top_products)} {metric}{scope} products{period}:\n\n"
+            
+            for i, product in enumerate(top_products, 1):
+                response += f"{i}. {product['name']} - {product['units_sold']} units sold (${product['unit_price']:.2f})\n"
+            
+            response += "\nAsk me for products similar to any of these, or what goes well with them!"
+            
+            return response, 'product'
+            
+        except Exception as e:
+            return "I'm having trouble accessing the sales data right now. Would you like me to show you our featured products instead?", 'product'
+
+    def _handle_recommendation_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle requests for products bought with, or similar to, a named product"""
+        try:
+            matches = self.data_service.resolve_products(self._recommendation_pattern.sub(' ', message), limit=1)
+            if not matches:
+                return "Which product would you like recommendations for? Tell me its name and I'll find what goes well with it.", 'product'
+            
+            recommendations = self.data_service.get_recommendations(matches[0]['product_id'], limit=3)
+            if not recommendations:
+                return f"I don't have recommendations for {matches[0]['name']} yet. Would you like to see our best sellers instead?", 'product'
+            
+            name = recommendations['product']['name']
+            response = ""
+            if recommendations['frequently_bought_together']:
+                response += f"Customers who bought {name} also bought:\n"
+                for i, product in enumerate(recommendations['frequently_bought_together'], 1):
+                    response += f"{i}. {product['name']} by {product['brand']} - ${product['retail_price']:.2f}\n"
+                response += "\n"
+            if recommendations['similar_products']:
+                response += f"Products similar to {name}:\n"
+                for i, product in enumerate(recommendations['similar_products'], 1):
+                    response += f"{i}. {product['name']} by {product['brand']} - ${product['retail_price']:.2f}\n"
+                response += "\n"
+            
+            if not response:
+                return f"I don't have recommendations for {name} yet. Would you like to see our best sellers instead?", 'product'
+            
+            response += "Would you like stock details for any of these?"
+            return response, 'product'
+            
+        except Exception as e:
+            return "I'm having trouble finding recommendations right now. Would you like to browse our best sellers instead?", 'product'
+
+    def _handle_order_status_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle order status inquiries"""
+        try:
+            order_id = self._order_reference(message.lower())
+            if not order_id:
+                number = re.search(r'\b\d{3,}\b', message)
+                example = f"#{number.group(0)}" if number else "#12345"
+                return f"Which order would you like me to check? Please give its order number with a #, like {example}.", 'order'
+            
+            order_status = self._lookup_order(order_id, context)
+            
+            if not order_status:
+                return f"I couldn't find order #{order_id}. Please check the order number and try again.", 'order'
+            
+            response = f"I found your order #{order_id}. Here's the current status:\n\n"
+            response += f"📦 Order Status: {order_status['status'].title()}\n"
+            response += f"📅 Order Date: {order_status['created_at']}\n"
+            response += f"👤 Customer: {order_status['user_name']}\n"
+            
+            timeline = self.data_service.get_order_timeline(order_id)
+            if timeline:
+                response += f"\nTracking:\n"
+                for event in timeline:
+                    items = len(event['item_ids'])
+                    count = f" ({items} items)" if items > 1 else ""
+                    response += f"- {event['timestamp']:%Y-%m-%d %H:%M} {event['status']}{count}\n"
+            else:
+                if order_status['shipped_at']:
+                    response += f"🚚 Shipped: {order_status['shipped_at']}\n"
+                if order_status['delivered_at']:
+                    response += f"📦 Delivered: {order_status['delivered_at']}\n"
+            
+            estimate = self.data_service.get_delivery_estimate(order_id, timeline)
+            if estimate and estimate['status'] != 'delivered':
+                response += f"\n{self._describe_delivery(estimate)}\n"
+            
+            response += f"\nOrder Details:\n"
+            for item in order_status['items']:
+                response += f"- {item['name']} - ${item['retail_price']:.2f} ({item['status']})\n"
+            
+            response += f"\nTotal: ${order_status['total_amount']:.2f}\n\n"
+            response += "Would you like me to help you track this package or answer any questions about your order?"
+            
+            return response, 'order'
+            
+        except Exception as e:
+            return "I'm having trouble accessing the order information right now. Please try again or contact our support team.", 'order'
+
+    def _handle_inventory_inquiry(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle inventory inquiries"""
+        try:
+            # Resolve the product mention (typos included) to product IDs
+            matches = self.data_service.resolve_products(message)
+            
+            if not matches:
+                return "I can help you check inventory for specific products. What item would you like to check?", 'product'
+            
+            found_product = matches[0]['name'] if len(matches) == 1 else f"{len(matches)} matching products"
+            inventory_status = self.data_service.get_inventory_status(product_ids=[match['product_id'] for match in matches])
+            
+            if not inventory_status:
+                return f"I don't have inventory data for {found_product} right now. Would you like me to show you similar products?", 'product'
+            
+            response = f"I checked our inventory for {found_product}. Here's what's available:\n\n"
+            
+            for item in inventory_status:
+                response += f"📦 {item['product_name']}:\n"
+                response += f"   - Available: {item['available_quantity']} units\n"
+                response += f"   - Price: ${item['product_retail_price']:.2f}\n"
+                if 'name' in item:  # distribution center name
+                    response += f"   - Location: {item['name']}\n"
+                response += "\n"
+            
+            response += "Would you like me to help you place an order or check other products?"
+            
+            return response, 'product'
+            
+        except Exception as e:
+            return "I'm having trouble accessing the inventory data right now. Would you like me to show you our product catalog instead?", 'product'
+
+    def _handle_fallback(self, message: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Handle unrecognized messages"""
+        template = random.choice(self.templates['fallback'])
+        return template, 'support'
+
+    def _generate_suggestions(self, message: str, context: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Generate contextual suggestions based on message and context"""
+        suggestions = []
+        
+        if any(word in message for word in ['product', 'item', 'clothing']):
+            suggestions.extend(["Show me men's clothing", "Show me women's clothing", "What's on sale?"])
+        elif any(word in message for word in ['order', 'track', 'delivery']):
+            suggestions.extend(["Track my order", "Order history", "Shipping info"])
+        elif any(word in message for word in ['return', 'refund', 'exchange']):
+            suggestions.extend(["Return policy", "Start return", "Contact support"])
+        else:
+            suggestions.extend(["Browse products", "Track order", "Get help"])
+        
+        return suggestions[:3]  # Limit to 3 suggestions
+
+    def get_welcome_message(self, session_id: str) -> ChatResponse:
+        """Get welcome message for new chat session"""
+        return ChatResponse(
+            message=self.welcome_message,
+            session_id=session_id,
+            timestamp=datetime.utcnow(),
+            quick_replies=self.quick_replies['greeting'],
+            metadata={
+                "response_type": "welcome",
+                "confidence": 1.0
+            }
+        )
+
+    def get_training_summary(self) -> Dict[str, Any]:
+        """Get training summary for monitoring"""
         return self.training_service.get_training_summary() 
\ No newline at end of file
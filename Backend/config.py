@@ -1,40 +1,103 @@
-from pydantic_settings import BaseSettings
-from typing import List
-import os
-
-class Settings(BaseSettings):
-    # API Configuration
-    API_V1_STR: str = "/api"
-    PROJECT_NAME: str = "E-commerce Customer Support Chatbot"
-    
-    # CORS Configuration
-    CORS_ORIGINS: List[str] = [
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:3001"
-    ]
-    
-    # Database Configuration
-    DATABASE_URL: str = "sqlite:///./chatbot.db"
-    
-    # Security
-    SECRET_KEY: str = "your-secret-key-change-in-production"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
-    
-    # Redis Configuration (for caching and sessions)
-    REDIS_URL: str = "redis://localhost:6379"
-    
-    # Chatbot Configuration
-    CHATBOT_NAME: str = "StyleBot"
-    CHATBOT_WELCOME_MESSAGE: str = "Hello! I'm StyleBot, your fashion assistant. How can I help you today?"
-    MAX_CONVERSATION_HISTORY: int = 50
-    
-    # Product Catalog
-    PRODUCTS_PER_PAGE: int = 20
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
+from pydantic_settings import BaseSettings
+from typing import List
+import os
+
+class Settings(BaseSettings):
+    # API Configuration
+    API_V1_STR: str = "/api"
+    PROJECT_NAME: str = "E-commerce Customer Support Chatbot"
+    
+    # CORS Configuration
+    CORS_ORIGINS: List[str] = [
+        "http://localhost:3000",
+        "http://localhost:3001",
+        "http://127.0.0.1:3000",
+        "http://127.0.0.1:3001"
+    ]
+    
+    # Database Configuration
+    DATABASE_URL: str = "sqlite:///./chatbot.db"
+    
+    # Security
+    SECRET_KEY: str = "your-secret-key-change-in-production"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    
+    # Redis Configuration (for caching and sessions)
+    REDIS_URL: str = "redis://localhost:6379"
+    
+    # Chatbot Configuration
+    CHATBOT_NAME: str = "StyleBot"
+    CHATBOT_WELCOME_MESSAGE: str = "Hello! I'm StyleBot, your fashion assistant. How can I help you today?"
+    MAX_CONVERSATION_HISTORY: int = 50
+    
+    # Session Store ("memory" or "redis"; REDIS_URL=local:// selects the in-process stand-in)
+    SESSION_BACKEND: str = "memory"
+    SESSION_IDLE_TTL_SECONDS: int = 60 * 30
+    SESSION_MAX_SESSIONS: int = 10000
+    SESSION_MEMORY_CAP_BYTES: int = 64 * 1024 * 1024
+    
+    # Order Events ("memory" for one process or "redis" to fan out across nodes through pub/sub)
+    EVENT_BUS_BACKEND: str = "memory"
+    EVENT_BUS_QUEUE_SIZE: int = 100
+    EVENT_BUS_HEARTBEAT_SECONDS: float = 15.0
+    
+    # Idempotency Keys ("memory" or "redis"; a retried POST replays the first result for the TTL)
+    IDEMPOTENCY_BACKEND: str = "memory"
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+    IDEMPOTENCY_LOCK_SECONDS: int = 30
+    
+    # Product Catalog
+    PRODUCTS_PER_PAGE: int = 20
+    PRODUCT_COUNT_EXACT_LIMIT: int = 10000
+    
+    # Orders
+    ORDER_EXPORT_CHUNK_SIZE: int = 1000
+    # Uploaded orders are validated and bulk inserted this many rows at a time
+    ORDER_IMPORT_CHUNK_ROWS: int = 5000
+    ORDER_IMPORT_MAX_JOBS: int = 100
+    # Order writes are group-committed: up to MAX_BATCH writes, waiting at most FLUSH_INTERVAL_MS for company
+    ORDER_WRITE_MAX_BATCH: int = 100
+    ORDER_WRITE_FLUSH_INTERVAL_MS: float = 2.0
+    ORDER_WRITE_MAX_PENDING: int = 5000
+    # Stock is reserved in memory when an order is placed and written to inventory_items this often
+    STOCK_FLUSH_INTERVAL_SECONDS: float = 5.0
+    
+    # Semantic Search (product embeddings are built locally and cached under <data_dir>/embeddings)
+    EMBEDDING_DIMENSIONS: int = 64
+    EMBEDDING_HASH_FEATURES: int = 2 ** 15
+    EMBEDDING_MIN_SCORE: float = 0.35
+    EMBEDDING_IVF_MIN_PRODUCTS: int = 50000
+    EMBEDDING_IVF_PROBES: int = 8
+    
+    # Delivery Estimates (from historical shipped/delivered times per distribution center and distance)
+    DELIVERY_NEAREST_CENTERS: int = 3
+    DELIVERY_MIN_SAMPLES: int = 30
+    
+    # Sales Trends ("live" moves the window end along as orders are placed; "history" keeps it on the newest loaded sale)
+    SALES_WINDOW_ANCHOR: str = "live"
+    
+    # Recommendations
+    RECOMMENDATION_NEIGHBORS: int = 20
+    RECOMMENDATION_HALF_LIFE_DAYS: float = 180.0
+    
+    # Worker Pool (blocking pandas work is offloaded from the event loop)
+    EXECUTOR_MAX_WORKERS: int = 4
+    EXECUTOR_MAX_QUEUE: int = 32
+    EXECUTOR_TIMEOUT_SECONDS: float = 10.0
+    TRAINING_TIMEOUT_SECONDS: float = 600.0
+    
+    # Batch Chat
+    CHAT_BATCH_MAX_MESSAGES: int = 10000
+    CHAT_BATCH_CHUNK_SIZE: int = 250
+    
+    # WebSocket Chat
+    WS_MAX_PENDING_MESSAGES: int = 16
+    WS_IDLE_TIMEOUT_SECONDS: float = 300.0
+    WS_PROGRESS_INTERVAL_SECONDS: float = 1.0
+    
+    class Config:
+        env_file = ".env"
+        case_sensitive = True
+
 settings = Settings() 
\ No newline at end of file
@@ -1,292 +1,797 @@
-import pandas as pd
-import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-import logging
-
-logger = logging.getLogger(__name__)
-
-class DataService:
-    def __init__(self, data_dir: str = "data"):
-        self.data_dir = data_dir
-        self.dfs = {}
-        self.load_data()
-    
-    def load_data(self):
-        """Load all CSV files into memory"""
-        try:
-            csv_files = [
-                'distribution_centers.csv',
-                'inventory_items.csv', 
-                'order_items.csv',
-                'orders.csv',
-                'products.csv',
-                'users.csv'
-            ]
-            
-            for file in csv_files:
-                file_path = os.path.join(self.data_dir, file)
-                if os.path.exists(file_path):
-                    df_name = file.replace('.csv', '')
-                    self.dfs[df_name] = pd.read_csv(file_path)
-                    logger.info(f"Loaded {file} with {len(self.dfs[df_name])} rows")
-                else:
-                    logger.warning(f"File not found: {file_path}")
-                    
-        except Exception as e:
-            logger.error(f"Error loading data: {e}")
-            # Create mock data if files don't exist
-            self.create_mock_data()
-    
-    def create_mock_data(self):
-        """Create mock data for development/testing"""
-        logger.info("Creating mock data for development")
-        
-        # Mock distribution centers
-        self.dfs['distribution_centers'] = pd.DataFrame({
-            'id': [1, 2, 3],
-            'name': ['New York DC', 'California DC', 'Texas DC'],
-            'latitude': [40.7128, 34.0522, 31.9686],
-            'longitude': [-74.0060, -118.2437, -99.9018]
-        })
-        
-        # Mock products
-        self.dfs['products'] = pd.DataFrame({
-            'id': [1, 2, 3, 4, 5],
-            'cost': [15.00, 45.00, 35.00, 80.00, 25.00],
-            'category': ['shirts', 'pants', 'dresses', 'shoes', 'accessories'],
-            'name': ['Classic White T-Shirt', 'Slim Fit Jeans', 'Summer Dress', 'Running Shoes', 'Leather Wallet'],
-            'brand': ['FashionBrand', 'FashionBrand', 'FashionBrand', 'FashionBrand', 'FashionBrand'],
-            'retail_price': [29.99, 79.99, 59.99, 129.99, 39.99],
-            'department': ['men', 'men', 'women', 'unisex', 'unisex'],
-            'sku': ['TSH001', 'JEA001', 'DRE001', 'SHO001', 'WAL001'],
-            'distribution_center_id': [1, 1, 2, 2, 3]
-        })
-        
-        # Mock inventory items
-        inventory_data = []
-        for product_id in range(1, 6):
-            for size in ['S', 'M', 'L', 'XL']:
-                for _ in range(50):  # 50 items per size
-                    inventory_data.append({
-                        'id': len(inventory_data) + 1,
-                        'product_id': product_id,
-                        'created_at': '2024-01-01 00:00:00',
-                        'sold_at': None if len(inventory_data) % 3 != 0 else '2024-03-01 00:00:00',
-                        'cost': self.dfs['products'].iloc[product_id-1]['cost'],
-                        'product_category': self.dfs['products'].iloc[product_id-1]['category'],
-                        'product_name': self.dfs['products'].iloc[product_id-1]['name'],
-                        'product_brand': self.dfs['products'].iloc[product_id-1]['brand'],
-                        'product_retail_price': self.dfs['products'].iloc[product_id-1]['retail_price'],
-                        'product_department': self.dfs['products'].iloc[product_id-1]['department'],
-                        'product_sku': self.dfs['products'].iloc[product_id-1]['sku'],
-                        'product_distribution_center_id': self.dfs['products'].iloc[product_id-1]['distribution_center_id']
-                    })
-        
-        self.dfs['inventory_items'] = pd.DataFrame(inventory_data)
-        
-        # Mock orders
-        self.dfs['orders'] = pd.DataFrame({
-            'order_id': [12345, 12346, 12347],
-            'user_id': [1, 2, 3],
-            'status': ['shipped', 'processing', 'delivered'],
-            'gender': ['M', 'F', 'M'],
-            'created_at': ['2024-03-15 10:00:00', '2024-03-16 14:30:00', '2024-03-10 09:15:00'],
-            'returned_at': [None, None, None],
-            'shipped_at': ['2024-03-16 08:00:00', None, '2024-03-12 10:00:00'],
-            'delivered_at': [None, None, '2024-03-14 15:30:00'],
-            'num_of_item': [2, 1, 3]
-        })
-        
-        # Mock order items
-        self.dfs['order_items'] = pd.DataFrame({
-            'id': [1, 2, 3, 4, 5],
-            'order_id': [12345, 12345, 12346, 12347, 12347],
-            'user_id': [1, 1, 2, 3, 3],
-            'product_id': [1, 2, 3, 1, 4],
-            'inventory_item_id': [1, 51, 101, 151, 201],
-            'status': ['shipped', 'shipped', 'processing', 'delivered', 'delivered'],
-            'created_at': ['2024-03-15 10:00:00', '2024-03-15 10:00:00', '2024-03-16 14:30:00', '2024-03-10 09:15:00', '2024-03-10 09:15:00'],
-            'shipped_at': ['2024-03-16 08:00:00', '2024-03-16 08:00:00', None, '2024-03-12 10:00:00', '2024-03-12 10:00:00'],
-            'delivered_at': [None, None, None, '2024-03-14 15:30:00', '2024-03-14 15:30:00'],
-            'returned_at': [None, None, None, None, None]
-        })
-        
-        # Mock users
-        self.dfs['users'] = pd.DataFrame({
-            'id': [1, 2, 3],
-            'first_name': ['John', 'Sarah', 'Mike'],
-            'last_name': ['Doe', 'Smith', 'Johnson'],
-            'email': ['john.doe@email.com', 'sarah.smith@email.com', 'mike.johnson@email.com'],
-            'age': [28, 32, 25],
-            'gender': ['M', 'F', 'M'],
-            'state': ['NY', 'CA', 'TX'],
-            'street_address': ['123 Main St', '456 Oak Ave', '789 Pine Rd'],
-            'postal_code': ['10001', '90210', '75001'],
-            'city': ['New York', 'Los Angeles', 'Dallas'],
-            'country': ['US', 'US', 'US'],
-            'latitude': [40.7128, 34.0522, 32.7767],
-            'longitude': [-74.0060, -118.2437, -96.7970],
-            'traffic_source': ['google', 'facebook', 'instagram'],
-            'created_at': ['2023-01-15 00:00:00', '2023-02-20 00:00:00', '2023-03-10 00:00:00']
-        })
-    
-    def get_top_products(self, limit: int = 5) -> List[Dict[str, Any]]:
-        """Get top selling products"""
-        try:
-            if 'order_items' not in self.dfs or 'products' not in self.dfs:
-                return []
-            
-            # Join order_items with products
-            merged = self.dfs['order_items'].merge(
-                self.dfs['products'], 
-                left_on='product_id', 
-                right_on='id', 
-                how='inner'
-            )
-            
-            # Filter out returned items
-            sold_items = merged[merged['returned_at'].isna()]
-            
-            # Group by product and count sales
-            top_products = sold_items.groupby(['product_id', 'name', 'brand', 'retail_price']).agg({
-                'id_x': 'count',  # Count of order items
-                'retail_price': 'sum'  # Total revenue
-            }).reset_index()
-            
-            top_products.columns = ['product_id', 'name', 'brand', 'unit_price', 'units_sold', 'total_revenue']
-            top_products = top_products.sort_values('units_sold', ascending=False).head(limit)
-            
-            return top_products.to_dict('records')
-            
-        except Exception as e:
-            logger.error(f"Error getting top products: {e}")
-            return []
-    
-    def get_order_status(self, order_id: str) -> Optional[Dict[str, Any]]:
-        """Get order status and details"""
-        try:
-            if 'orders' not in self.dfs or 'order_items' not in self.dfs or 'products' not in self.dfs:
-                return None
-            
-            # Get order details
-            order = self.dfs['orders'][self.dfs['orders']['order_id'] == int(order_id)]
-            if order.empty:
-                return None
-            
-            order = order.iloc[0]
-            
-            # Get order items
-            order_items = self.dfs['order_items'][self.dfs['order_items']['order_id'] == int(order_id)]
-            
-            # Join with products
-            items_with_products = order_items.merge(
-                self.dfs['products'], 
-                left_on='product_id', 
-                right_on='id', 
-                how='inner'
-            )
-            
-            # Get user details
-            user = self.dfs['users'][self.dfs['users']['id'] == order['user_id']]
-            user_name = f"{user.iloc[0]['first_name']} {user.iloc[0]['last_name']}" if not user.empty else "Unknown"
-            
-            return {
-                'order_id': order_id,
-                'status': order['status'],
-                'user_name': user_name,
-                'created_at': order['created_at'],
-                'shipped_at': order['shipped_at'],
-                'delivered_at': order['delivered_at'],
-                'returned_at': order['returned_at'],
-                'num_of_items': order['num_of_item'],
-                'items': items_with_products[['name', 'retail_price', 'status']].to_dict('records'),
-                'total_amount': items_with_products['retail_price'].sum()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting order status: {e}")
-            return None
-    
-    def get_inventory_status(self, product_name: str = None, category: str = None) -> List[Dict[str, Any]]:
-        """Get inventory status for products"""
-        try:
-            if 'inventory_items' not in self.dfs:
-                return []
-            
-            # Filter inventory items
-            inventory = self.dfs['inventory_items'].copy()
-            
-            # Filter by product name if provided
-            if product_name:
-                inventory = inventory[
-                    inventory['product_name'].str.contains(product_name, case=False, na=False)
-                ]
-            
-            # Filter by category if provided
-            if category:
-                inventory = inventory[
-                    inventory['product_category'].str.contains(category, case=False, na=False)
-                ]
-            
-            # Get available stock (items not sold)
-            available_stock = inventory[inventory['sold_at'].isna()]
-            
-            # Group by product and distribution center
-            stock_summary = available_stock.groupby([
-                'product_name', 
-                'product_category', 
-                'product_brand', 
-                'product_retail_price',
-                'product_distribution_center_id'
-            ]).size().reset_index(name='available_quantity')
-            
-            # Add distribution center name
-            if 'distribution_centers' in self.dfs:
-                stock_summary = stock_summary.merge(
-                    self.dfs['distribution_centers'],
-                    left_on='product_distribution_center_id',
-                    right_on='id',
-                    how='left'
-                )
-            
-            return stock_summary.to_dict('records')
-            
-        except Exception as e:
-            logger.error(f"Error getting inventory status: {e}")
-            return []
-    
-    def get_user_orders(self, user_id: int) -> List[Dict[str, Any]]:
-        """Get all orders for a user"""
-        try:
-            if 'orders' not in self.dfs:
-                return []
-            
-            user_orders = self.dfs['orders'][self.dfs['orders']['user_id'] == user_id]
-            return user_orders.to_dict('records')
-            
-        except Exception as e:
-            logger.error(f"Error getting user orders: {e}")
-            return []
-    
-    def search_products(self, query: str) -> List[Dict[str, Any]]:
-        """Search products by name, category, or brand"""
-        try:
-            if 'products' not in self.dfs:
-                return []
-            
-            products = self.dfs['products']
-            
-            # Search in name, category, and brand
-            mask = (
-                products['name'].str.contains(query, case=False, na=False) |
-                products['category'].str.contains(query, case=False, na=False) |
-                products['brand'].str.contains(query, case=False, na=False)
-            )
-            
-            matching_products = products[mask]
-            return matching_products.to_dict('records')
-            
-        except Exception as e:
-            logger.error(f"Error searching products: {e}")
+import numpy as np
+import pandas as pd
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from datetime import datetime
+import logging
+import time
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.services import order_service
+from app.services.embedding_index import ProductEmbeddingIndex
+from app.services.product_ranking import ProductRanking
+from app.services.sales_rollups import SalesRollups
+from app.services.recommender import CoPurchaseRecommender
+from app.services.product_index import ProductFilterIndex, ProductFilters
+from app.services.entity_extractor import ProductQueryExtractor
+from app.services.fuzzy_index import FuzzyNameIndex
+from app.services.suggest_index import SuggestIndex
+from app.services.tracking_service import OrderTimelines
+from app.services.geo_service import DeliveryEstimator
+from app.services.stock_ledger import get_stock_ledger
+
+logger = logging.getLogger(__name__)
+
+class DataService:
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = data_dir
+        self.dfs = {}
+        # Per-thread results fetched up front for a batch of chat messages
+        self._prefetch = threading.local()
+        # Precomputed lookup structures, rebuilt whenever the data is reloaded
+        self.product_ranking: Optional[ProductRanking] = None
+        self.sales_rollups: Optional[SalesRollups] = None
+        self.product_index: Optional[ProductFilterIndex] = None
+        self.query_extractor: Optional[ProductQueryExtractor] = None
+        self.fuzzy_index: Optional[FuzzyNameIndex] = None
+        self.embedding_index: Optional[ProductEmbeddingIndex] = None
+        self.recommender: Optional[CoPurchaseRecommender] = None
+        self.suggest_index: Optional[SuggestIndex] = None
+        self.stock_summary: Optional[pd.DataFrame] = None
+        # Order rows grouped by user, newest first: sorted user IDs and the matching row positions
+        self.user_order_index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.order_timelines: Optional[OrderTimelines] = None
+        self.delivery_estimator: Optional[DeliveryEstimator] = None
+        self.index_timings: Dict[str, float] = {}
+        self.load_data()
+        self.build_indexes()
+    
+    def load_data(self):
+        """Load all CSV files into memory"""
+        try:
+            csv_files = [
+                'distribution_centers.csv',
+                'inventory_items.csv', 
+                'order_items.csv',
+                'orders.csv',
+                'products.csv',
+                'users.csv'
+            ]
+            
+            for file in csv_files:
+                file_path = os.path.join(self.data_dir, file)
+                if os.path.exists(file_path):
+                    df_name = file.replace('.csv', '')
+                    self.dfs[df_name] = pd.read_csv(file_path)
+                    logger.info(f"Loaded {file} with {len(self.dfs[df_name])} rows")
+                else:
+                    logger.warning(f"File not found: {file_path}")
+                    
+        except Exception as e:
+            logger.error(f"Error loading data: {e}")
+            # Create mock data if files don't exist
+            self.create_mock_data()
+    
+    def create_mock_data(self):
+        """Create mock data for development/testing"""
+        logger.info("Creating mock data for development")
+        
+        # Mock distribution centers
+        self.dfs['distribution_centers'] = pd.DataFrame({
+            'id': [1, 2, 3],
+            'name': ['New York DC', 'California DC', 'Texas DC'],
+            'latitude': [40.7128, 34.0522, 31.9686],
+            'longitude': [-74.0060, -118.2437, -99.9018]
+        })
+        
+        # Mock products
+        self.dfs['products'] = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'cost': [15.00, 45.00, 35.00, 80.00, 25.00],
+            'category': ['shirts', 'pants', 'dresses', 'shoes', 'accessories'],
+            'name': ['Classic White T-Shirt', 'Slim Fit Jeans', 'Summer Dress', 'Running Shoes', 'Leather Wallet'],
+            'brand': ['FashionBrand', 'FashionBrand', 'FashionBrand', 'FashionBrand', 'FashionBrand'],
+            'retail_price': [29.99, 79.99, 59.99, 129.99, 39.99],
+            'department': ['men', 'men', 'women', 'unisex', 'unisex'],
+            'sku': ['TSH001', 'JEA001', 'DRE001', 'SHO001', 'WAL001'],
+            'distribution_center_id': [1, 1, 2, 2, 3]
+        })
+        
+        # Mock inventory items
+        inventory_data = []
+        for product_id in range(1, 6):
+            for size in ['S', 'M', 'L', 'XL']:
+                for _ in range(50):  # 50 items per size
+                    inventory_data.append({
+                        'id': len(inventory_data) + 1,
+                        'product_id': product_id,
+                        'created_at': '2024-01-01 00:00:00',
+                        'sold_at': None if len(inventory_data) % 3 != 0 else '2024-03-01 00:00:00',
+                        'cost': self.dfs['products'].iloc[product_id-1]['cost'],
+                        'product_category': self.dfs['products'].iloc[product_id-1]['category'],
+                        'product_name': self.dfs['products'].iloc[product_id-1]['name'],
+                        'product_brand': self.dfs['products'].iloc[product_id-1]['brand'],
+                        'product_retail_price': self.dfs['products'].iloc[product_id-1]['retail_price'],
+                        'product_department': self.dfs['products'].iloc[product_id-1]['department'],
+                        'product_sku': self.dfs['products'].iloc[product_id-1]['sku'],
+                        'product_distribution_center_id': self.dfs['products'].iloc[product_id-1]['distribution_center_id']
+                    })
+        
+        self.dfs['inventory_items'] = pd.DataFrame(inventory_data)
+        
+        # Mock orders
+        self.dfs['orders'] = pd.DataFrame({
+            'order_id': [12345, 12346, 12347],
+            'user_id': [1, 2, 3],
+            'status': ['shipped', 'processing', 'delivered'],
+            'gender': ['M', 'F', 'M'],
+            'created_at': ['2024-03-15 10:00:00', '2024-03-16 14:30:00', '2024-03-10 09:15:00'],
+            'returned_at': [None, None, None],
+            'shipped_at': ['2024-03-16 08:00:00', None, '2024-03-12 10:00:00'],
+            'delivered_at': [None, None, '2024-03-14 15:30:00'],
+            'num_of_item': [2, 1, 3]
+        })
+        
+        # Mock order items
+        self.dfs['order_items'] = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'order_id': [12345, 12345, 12346, 12347, 12347],
+            'user_id': [1, 1, 2, 3, 3],
+            'product_id': [1, 2, 3, 1, 4],
+            'inventory_item_id': [1, 51, 101, 151, 201],
+            'status': ['shipped', 'shipped', 'processing', 'delivered', 'delivered'],
+            'created_at': ['2024-03-15 10:00:00', '2024-03-15 10:00:00', '2024-03-16 14:30:00', '2024-03-10 09:15:00', '2024-03-10 09:15:00'],
+            'shipped_at': ['2024-03-16 08:00:00', '2024-03-16 08:00:00', None, '2024-03-12 10:00:00', '2024-03-12 10:00:00'],
+            'delivered_at': [None, None, None, '2024-03-14 15:30:00', '2024-03-14 15:30:00'],
+            'returned_at': [None, None, None, None, None]
+        })
+        
+        # Mock users
+        self.dfs['users'] = pd.DataFrame({
+            'id': [1, 2, 3],
+            'first_name': ['John', 'Sarah', 'Mike'],
+            'last_name': ['Doe', 'Smith', 'Johnson'],
+            'email': ['john.doe@email.com', 'sarah.smith@email.com', 'mike.johnson@email.com'],
+            'age': [28, 32, 25],
+            'gender': ['M', 'F', 'M'],
+            'state': ['NY', 'CA', 'TX'],
+            'street_address': ['123 Main St', '456 Oak Ave', '789 Pine Rd'],
+            'postal_code': ['10001', '90210', '75001'],
+            'city': ['New York', 'Los Angeles', 'Dallas'],
+            'country': ['US', 'US', 'US'],
+            'latitude': [40.7128, 34.0522, 32.7767],
+            'longitude': [-74.0060, -118.2437, -96.7970],
+            'traffic_source': ['google', 'facebook', 'instagram'],
+            'created_at': ['2023-01-15 00:00:00', '2023-02-20 00:00:00', '2023-03-10 00:00:00']
+        })
+    
+    def build_indexes(self):
+        """Precompute the structures that answer chat and API lookups without rescanning tables"""
+        self.index_timings = {}
+        
+        if 'order_items' in self.dfs and 'products' in self.dfs:
+            start = time.perf_counter()
+            try:
+                self.product_ranking = ProductRanking.build(self.dfs['order_items'], self.dfs['products'])
+            except Exception as e:
+                logger.error(f"Error building product ranking: {e}")
+                self.product_ranking = None
+            self.index_timings['product_ranking'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            try:
+                self.sales_rollups = SalesRollups.build(self.dfs['order_items'], self.dfs['products'], settings.SALES_WINDOW_ANCHOR)
+            except Exception as e:
+                logger.error(f"Error building sales rollups: {e}")
+                self.sales_rollups = None
+            self.index_timings['sales_rollups'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            try:
+                self.recommender = CoPurchaseRecommender.build(
+                    self.dfs['order_items'],
+                    self.dfs['products'],
+                    neighbors=settings.RECOMMENDATION_NEIGHBORS,
+                    half_life_days=settings.RECOMMENDATION_HALF_LIFE_DAYS
+                )
+            except Exception as e:
+                logger.error(f"Error building co-purchase recommendations: {e}")
+                self.recommender = None
+            self.index_timings['recommender'] = time.perf_counter() - start
+        
+        if 'products' in self.dfs:
+            start = time.perf_counter()
+            try:
+                popularity = self.product_ranking.units_sold() if self.product_ranking else {}
+                self.product_index = ProductFilterIndex(self.dfs['products'], popularity)
+                self.query_extractor = ProductQueryExtractor(self.product_index.vocabulary)
+            except Exception as e:
+                logger.error(f"Error building product filter index: {e}")
+                self.product_index = None
+                self.query_extractor = None
+            self.index_timings['product_index'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            try:
+                products = self.dfs['products']
+                self.fuzzy_index = FuzzyNameIndex(
+                    products['id'].tolist(),
+                    products['name'].fillna('').astype(str).tolist(),
+                    products['brand'].fillna('').astype(str).tolist(),
+                    self.product_ranking.units_sold() if self.product_ranking else {}
+                )
+            except Exception as e:
+                logger.error(f"Error building fuzzy name index: {e}")
+                self.fuzzy_index = None
+            self.index_timings['fuzzy_index'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            try:
+                self.suggest_index = SuggestIndex.build(
+                    self.dfs['products'],
+                    self.product_ranking.units_sold() if self.product_ranking else {}
+                )
+            except Exception as e:
+                logger.error(f"Error building suggestion index: {e}")
+                self.suggest_index = None
+            self.index_timings['suggest_index'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            try:
+                self.embedding_index = ProductEmbeddingIndex.load_or_build(
+                    self.dfs['products'],
+                    os.path.join(self.data_dir, 'embeddings'),
+                    dims=settings.EMBEDDING_DIMENSIONS,
+                    n_features=settings.EMBEDDING_HASH_FEATURES,
+                    ivf_min_products=settings.EMBEDDING_IVF_MIN_PRODUCTS,
+                    probes=settings.EMBEDDING_IVF_PROBES
+                )
+            except Exception as e:
+                logger.error(f"Error building product embeddings: {e}")
+                self.embedding_index = None
+            self.index_timings['embedding_index'] = time.perf_counter() - start
+        
+        if 'orders' in self.dfs:
+            start = time.perf_counter()
+            try:
+                self.user_order_index = self._build_user_order_index()
+            except Exception as e:
+                logger.error(f"Error building user order index: {e}")
+                self.user_order_index = None
+            self.index_timings['user_order_index'] = time.perf_counter() - start
+        
+        if 'orders' in self.dfs and 'order_items' in self.dfs:
+            start = time.perf_counter()
+            try:
+                self.order_timelines = OrderTimelines.build(self.dfs['orders'], self.dfs['order_items'])
+            except Exception as e:
+                logger.error(f"Error building order timelines: {e}")
+                self.order_timelines = None
+            self.index_timings['order_timelines'] = time.perf_counter() - start
+        
+        if all(name in self.dfs for name in ('distribution_centers', 'users', 'products', 'orders', 'order_items')):
+            start = time.perf_counter()
+            try:
+                self.delivery_estimator = DeliveryEstimator.build(
+                    self.dfs['distribution_centers'],
+                    self.dfs['users'],
+                    self.dfs['products'],
+                    self.dfs['orders'],
+                    self.dfs['order_items'],
+                    nearest_count=settings.DELIVERY_NEAREST_CENTERS,
+                    min_samples=settings.DELIVERY_MIN_SAMPLES
+                )
+            except Exception as e:
+                logger.error(f"Error building delivery estimator: {e}")
+                self.delivery_estimator = None
+            self.index_timings['delivery_estimator'] = time.perf_counter() - start
+        
+        if 'inventory_items' in self.dfs:
+            start = time.perf_counter()
+            try:
+                self.stock_summary = self._build_stock_summary()
+            except Exception as e:
+                logger.error(f"Error building stock summary: {e}")
+                self.stock_summary = None
+            self.index_timings['stock_summary'] = time.perf_counter() - start
+    
+    def record_order_items(self, items: List[Dict[str, Any]]):
+        """Fold newly placed order items into the precomputed structures"""
+        for item in items:
+            try:
+                product_id = int(item.get('product_id'))
+            except (TypeError, ValueError):
+                continue
+            quantity = int(item.get('quantity', 1))
+            if self.product_ranking is not None:
+                self.product_ranking.record_sale(product_id, quantity, item.get('unit_price'))
+        if self.sales_rollups is not None:
+            self.sales_rollups.record(items)
+    
+    def record_order_returns(self, items: List[Dict[str, Any]], timestamp: datetime):
+        """Count returned items in the sales rollups"""
+        if self.sales_rollups is not None:
+            self.sales_rollups.record(items, timestamp, returned=True)
+    
+    def record_order_placement(self, order_id, user_id, product_ids: Iterable[int]):
+        """Remember where a newly placed order ships from, for delivery estimates"""
+        if self.delivery_estimator is not None:
+            self.delivery_estimator.record_order(order_id, user_id, product_ids)
+    
+    def record_order_event(self, order_id, event: str, timestamp: datetime, item_ids: Iterable[int] = ()):
+        """Fold a status change into the tracking timelines"""
+        if self.order_timelines is not None:
+            self.order_timelines.record(order_id, event, timestamp, item_ids)
+    
+    def get_order_timeline(self, order_id) -> Optional[List[Dict[str, Any]]]:
+        """Tracking events for an order in time order, or None if it has none"""
+        try:
+            if self.order_timelines is None:
+                return None
+            return self.order_timelines.timeline(int(order_id))
+        except Exception as e:
+            logger.error(f"Error getting order timeline: {e}")
+            return None
+    
+    def get_delivery_estimate(self, order_id, events: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        When an order should arrive, from its tracking events (the precomputed timeline
+        unless given). None for unknown, cancelled and returned orders.
+        """
+        try:
+            if self.delivery_estimator is None:
+                return None
+            if events is None:
+                events = self.get_order_timeline(order_id) or []
+            # The order has arrived once every item has; None stands for order-level events
+            placed_at = None
+            items = set()
+            shipped: Dict[Any, datetime] = {}
+            delivered: Dict[Any, datetime] = {}
+            for event in events:
+                item_ids = event['item_ids'] or [None]
+                if event['event'] in ('cancelled', 'returned'):
+                    return None
+                if event['event'] == 'placed':
+                    placed_at = placed_at or event['timestamp']
+                    items.update(item_ids)
+                elif event['event'] in ('shipped', 'delivered'):
+                    reached = shipped if event['event'] == 'shipped' else delivered
+                    reached.update((item, event['timestamp']) for item in item_ids)
+            
+            def when(reached: Dict[Any, datetime], item) -> Optional[datetime]:
+                return reached.get(item, reached.get(None))
+            
+            outstanding = [item for item in (items or {None}) if when(delivered, item) is None]
+            if not outstanding:
+                return self.delivery_estimator.estimate(int(order_id), placed_at, delivered_at=max(delivered.values()))
+            shipped_at = [when(shipped, item) for item in outstanding]
+            return self.delivery_estimator.estimate(
+                int(order_id), placed_at, None if None in shipped_at else max(shipped_at)
+            )
+        except Exception as e:
+            logger.error(f"Error estimating delivery: {e}")
+            return None
+    
+    def get_nearest_distribution_centers(self, user_id, limit: int = 3) -> List[Dict[str, Any]]:
+        """Distribution centers closest to a customer, nearest first"""
+        if self.delivery_estimator is None:
+            return []
+        return self.delivery_estimator.nearest_centers(user_id=user_id, limit=limit)
+    
+    @contextmanager
+    def prefetched(self, order_ids: Iterable[str] = ()):
+        """Answer a batch's order lookups with one query for the duration of the block"""
+        self._prefetch.order_statuses = self.get_order_statuses(order_ids) if order_ids else {}
+        try:
+            yield
+        finally:
+            self._prefetch.order_statuses = None
+    
+    def get_top_products(self, limit: int = 5, by: str = 'units', category: Optional[str] = None,
+                         department: Optional[str] = None, window_days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get top selling products by slicing the precomputed ranking"""
+        try:
+            if self.product_ranking is None:
+                return []
+            
+            return self.product_ranking.top(
+                limit,
+                by=by,
+                category=category,
+                department=department,
+                window_days=window_days
+            )
+            
+        except Exception as e:
+            logger.error(f"Error getting top products: {e}")
+            return []
+    
+    def get_sales_trends(self, by: str = 'product', days: int = 7, metric: str = 'items', limit: int = 10,
+                         trending: bool = False, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Top keys of a dimension over the last days from the sales rollups, each with its
+        change over the window before. Raises ValueError for an unknown dimension or metric.
+        """
+        if self.sales_rollups is None:
+            return []
+        return self.sales_rollups.top(by, days=days, metric=metric, limit=limit, trending=trending, category=category)
+    
+    def get_sales_summary(self, windows: Iterable[int] = (7, 30, 90)) -> Dict[str, Any]:
+        """Store-wide totals for trailing windows with their change over the window before"""
+        try:
+            if self.sales_rollups is None:
+                return {}
+            return self.sales_rollups.summary(windows)
+        except Exception as e:
+            logger.error(f"Error getting sales summary: {e}")
+            return {}
+    
+    def extract_product_filters(self, message: str) -> ProductFilters:
+        """Pull category, brand, department, color and price range out of free text"""
+        if self.query_extractor is None:
+            return ProductFilters()
+        return self.query_extractor.extract(message)
+    
+    def query_products(self, filters: ProductFilters, limit: int = 5) -> Dict[str, Any]:
+        """Count and rank products matching structured filters using the columnar index"""
+        try:
+            if self.product_index is None:
+                return {'count': 0, 'min_price': None, 'max_price': None, 'products': []}
+            return self.product_index.query(filters, limit)
+        except Exception as e:
+            logger.error(f"Error querying products: {e}")
+            return {'count': 0, 'min_price': None, 'max_price': None, 'products': []}
+    
+    def facet_counts(self, filters: ProductFilters, product_ids: Optional[Iterable[int]] = None, limit: int = 20) -> Dict[str, Any]:
+        """Per-value counts of every product facet under the active filters, among product_ids when given"""
+        try:
+            if self.product_index is None:
+                return {'total': 0, 'facets': {}}
+            
+            base = None
+            if product_ids is not None:
+                base = np.isin(self.product_index.ids, np.fromiter(product_ids, dtype=np.int64))
+            return self.product_index.facet_counts(filters, base=base, limit=limit)
+            
+        except Exception as e:
+            logger.error(f"Error counting product facets: {e}")
+            return {'total': 0, 'facets': {}}
+    
+    def get_order_status(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Get order status and details, from the database the orders API writes, else the loaded data"""
+        prefetched = getattr(self._prefetch, 'order_statuses', None)
+        if prefetched and str(order_id) in prefetched:
+            return prefetched[str(order_id)]
+        
+        stored = self._stored_order_statuses([order_id])
+        if str(order_id) in stored:
+            return stored[str(order_id)]
+        
+        try:
+            if 'orders' not in self.dfs or 'order_items' not in self.dfs or 'products' not in self.dfs:
+                return None
+            
+            # Get order details
+            order = self.dfs['orders'][self.dfs['orders']['order_id'] == int(order_id)]
+            if order.empty:
+                return None
+            
+            order = order.iloc[0]
+            
+            # Get order items
+            order_items = self.dfs['order_items'][self.dfs['order_items']['order_id'] == int(order_id)]
+            
+            # Join with products
+            items_with_products = order_items.merge(
+                self.dfs['products'], 
+                left_on='product_id', 
+                right_on='id', 
+                how='inner'
+            )
+            
+            # Get user details
+            user = self.dfs['users'][self.dfs['users']['id'] == order['user_id']]
+            user_name = f"{user.iloc[0]['first_name']} {user.iloc[0]['last_name']}" if not user.empty else "Unknown"
+            
+            return {
+                'order_id': order_id,
+                'status': order['status'],
+                'user_id': str(order['user_id']),
+                'user_name': user_name,
+                'created_at': order['created_at'],
+                'shipped_at': order['shipped_at'],
+                'delivered_at': order['delivered_at'],
+                'returned_at': order['returned_at'],
+                'num_of_items': order['num_of_item'],
+                'items': items_with_products[['name', 'retail_price', 'status']].to_dict('records'),
+                'total_amount': items_with_products['retail_price'].sum()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting order status: {e}")
+            return None
+    
+    def get_order_statuses(self, order_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get status and details for many orders with a single filtered pass per table"""
+        order_ids = {str(order_id) for order_id in order_ids}
+        results: Dict[str, Optional[Dict[str, Any]]] = {order_id: None for order_id in order_ids}
+        stored = self._stored_order_statuses(order_ids)
+        results.update(stored)
+        order_ids -= stored.keys()
+        try:
+            if not order_ids or 'orders' not in self.dfs or 'order_items' not in self.dfs or 'products' not in self.dfs:
+                return results
+            
+            numeric_ids = [int(order_id) for order_id in order_ids if order_id.isdigit()]
+            orders = self.dfs['orders'][self.dfs['orders']['order_id'].isin(numeric_ids)]
+            if orders.empty:
+                return results
+            
+            # Join all requested order items with products at once
+            order_items = self.dfs['order_items'][self.dfs['order_items']['order_id'].isin(numeric_ids)]
+            items_with_products = order_items.merge(
+                self.dfs['products'],
+                left_on='product_id',
+                right_on='id',
+                how='inner'
+            )
+            items_by_order = {
+                order_id: group
+                for order_id, group in items_with_products.groupby('order_id')
+            }
+            
+            # Resolve user names in one lookup
+            users = self.dfs['users'][self.dfs['users']['id'].isin(orders['user_id'].unique())] if 'users' in self.dfs else pd.DataFrame()
+            user_names = {
+                row['id']: f"{row['first_name']} {row['last_name']}"
+                for row in users[['id', 'first_name', 'last_name']].to_dict('records')
+            } if not users.empty else {}
+            
+            empty_items = items_with_products.iloc[0:0]
+            for order in orders.drop_duplicates('order_id').to_dict('records'):
+                items = items_by_order.get(order['order_id'], empty_items)
+                results[str(order['order_id'])] = {
+                    'order_id': str(order['order_id']),
+                    'status': order['status'],
+                    'user_id': str(order['user_id']),
+                    'user_name': user_names.get(order['user_id'], "Unknown"),
+                    'created_at': order['created_at'],
+                    'shipped_at': order['shipped_at'],
+                    'delivered_at': order['delivered_at'],
+                    'returned_at': order['returned_at'],
+                    'num_of_items': order['num_of_item'],
+                    'items': items[['name', 'retail_price', 'status']].to_dict('records'),
+                    'total_amount': items['retail_price'].sum()
+                }
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error getting order statuses: {e}")
+            return results
+    
+    def _stored_order_statuses(self, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        The orders the database holds, which tracking reads too and which reflects orders
+        placed or updated through the API; empty when the database can't be reached.
+        """
+        numeric_ids = [int(order_id) for order_id in map(str, order_ids) if order_id.isdigit()]
+        if not numeric_ids:
+            return {}
+        try:
+            db = SessionLocal()
+            try:
+                return order_service.order_summaries(db, numeric_ids)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"Error getting stored order statuses: {e}")
+            return {}
+    
+    def _build_stock_summary(self) -> pd.DataFrame:
+        """Available units per product and distribution center, indexed by product_id"""
+        inventory = self.dfs['inventory_items']
+        
+        # Get available stock (items not sold)
+        available_stock = inventory[inventory['sold_at'].isna()]
+        
+        # Group by product and distribution center
+        stock_summary = available_stock.groupby([
+            'product_id',
+            'product_name', 
+            'product_category', 
+            'product_brand', 
+            'product_retail_price',
+            'product_distribution_center_id'
+        ]).size().reset_index(name='available_quantity')
+        
+        # Add distribution center name
+        if 'distribution_centers' in self.dfs:
+            stock_summary = stock_summary.merge(
+                self.dfs['distribution_centers'],
+                left_on='product_distribution_center_id',
+                right_on='id',
+                how='left'
+            )
+        
+        return stock_summary.set_index('product_id', drop=False).sort_index()
+    
+    def get_recommendations(self, product_id, limit: int = 5) -> Optional[Dict[str, Any]]:
+        """Frequently bought together and similar products; None for an unknown product"""
+        try:
+            if self.recommender is None:
+                return None
+            
+            product = self.recommender.describe(product_id)
+            if product is None:
+                return None
+            
+            # Nearest in the embedding space, or the category's best sellers when nothing is close
+            similar = []
+            if self.embedding_index is not None:
+                similar = [
+                    dict(self.recommender.describe(similar_id) or {}, product_id=similar_id, score=score)
+                    for similar_id, score in self.embedding_index.similar(product_id, limit, settings.EMBEDDING_MIN_SCORE)
+                ]
+            if not similar:
+                similar = [
+                    dict(self.recommender.describe(top['product_id']) or {}, product_id=top['product_id'], units_sold=top['units_sold'])
+                    for top in self.get_top_products(limit + 1, category=product['category'])
+                    if top['product_id'] != product_id
+                ][:limit]
+            
+            return {
+                'product': product,
+                'frequently_bought_together': self.recommender.bought_together(product_id, limit),
+                'similar_products': similar
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting recommendations: {e}")
+            return None
+    
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Typeahead suggestions for a partial product name, brand or category"""
+        if self.suggest_index is None:
+            return []
+        return self.suggest_index.suggest(prefix, limit)
+    
+    def resolve_products(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Resolve a free-text product mention, typos included, to matching products"""
+        try:
+            if self.fuzzy_index is None:
+                return []
+            return self.fuzzy_index.resolve(text, limit)
+        except Exception as e:
+            logger.error(f"Error resolving products: {e}")
+            return []
+    
+    def get_inventory_status(self, product_name: str = None, category: str = None, product_ids: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Get inventory status for products"""
+        try:
+            if self.stock_summary is None:
+                return []
+            
+            stock_summary = self.stock_summary
+            
+            # Indexed lookup when the products are already resolved
+            if product_ids is not None:
+                stock_summary = stock_summary[stock_summary.index.isin(product_ids)]
+            
+            # Filter by product name if provided
+            if product_name:
+                stock_summary = stock_summary[
+                    stock_summary['product_name'].str.contains(product_name, case=False, na=False, regex=False)
+                ]
+            
+            # Filter by category if provided
+            if category:
+                stock_summary = stock_summary[
+                    stock_summary['product_category'].str.contains(category, case=False, na=False, regex=False)
+                ]
+            
+            records = stock_summary.to_dict('records')
+            
+            # Live counts from the stock ledger once it is loaded; the summary is as of the last data load
+            ledger = get_stock_ledger()
+            if ledger is not None:
+                for record in records:
+                    available = ledger.available(record['product_id'], record['product_distribution_center_id'])
+                    if available is not None:
+                        record['available_quantity'] = available
+            return records
+            
+        except Exception as e:
+            logger.error(f"Error getting inventory status: {e}")
+            return []
+    
+    def _build_user_order_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        orders = self.dfs['orders']
+        frame = pd.DataFrame({
+            'user_id': pd.to_numeric(orders['user_id'], errors='coerce').to_numpy(),
+            'created_at': pd.to_datetime(orders['created_at'], errors='coerce').to_numpy(),
+            'position': np.arange(len(orders))
+        }).dropna(subset=['user_id'])
+        frame = frame.sort_values(['user_id', 'created_at'], ascending=[True, False], na_position='last', kind='stable')
+        return frame['user_id'].to_numpy(), frame['position'].to_numpy()
+    
+    def get_user_orders(self, user_id: int, limit: Optional[int] = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """A page of a user's orders, newest first, sliced from the precomputed per-user index"""
+        try:
+            if 'orders' not in self.dfs or self.user_order_index is None:
+                return []
+            
+            user_ids, positions = self.user_order_index
+            start = int(np.searchsorted(user_ids, user_id, side='left'))
+            end = int(np.searchsorted(user_ids, user_id, side='right'))
+            start = min(start + offset, end)
+            if limit is not None:
+                end = min(end, start + limit)
+            return self.dfs['orders'].iloc[positions[start:end]].to_dict('records')
+            
+        except Exception as e:
+            logger.error(f"Error getting user orders: {e}")
+            return []
+    
+    def semantic_search_products(self, queries: List[str], limit: int = 10,
+                                 min_score: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """Products closest in meaning to each query, scored by embedding similarity"""
+        try:
+            if self.embedding_index is None or 'products' not in self.dfs:
+                return [[] for _ in queries]
+            
+            if min_score is None:
+                min_score = settings.EMBEDDING_MIN_SCORE
+            hits = self.embedding_index.search(queries, limit=limit, min_score=min_score)
+            
+            products = self.dfs['products'].set_index('id', drop=False)
+            results = []
+            for query_hits in hits:
+                ids = [product_id for product_id, _ in query_hits if product_id in products.index]
+                records = products.loc[ids].to_dict('records')
+                scores = dict(query_hits)
+                for record in records:
+                    record['score'] = scores[record['id']]
+                results.append(records)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in semantic product search: {e}")
+            return [[] for _ in queries]
+    
+    def search_products(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search products by name, category, or brand, then by meaning for synonyms"""
+        try:
+            if 'products' not in self.dfs:
+                return []
+            
+            products = self.dfs['products']
+            
+            # Search in name, category, and brand
+            mask = (
+                products['name'].str.contains(query, case=False, na=False, regex=False) |
+                products['category'].str.contains(query, case=False, na=False, regex=False) |
+                products['brand'].str.contains(query, case=False, na=False, regex=False)
+            )
+            
+            matching_products = products[mask]
+            if limit is not None:
+                matching_products = matching_products.head(limit)
+            matching_products = matching_products.to_dict('records')
+            
+            # Keyword hits first, then products that only match semantically
+            semantic_limit = 10 if limit is None else limit - len(matching_products)
+            if semantic_limit > 0:
+                seen = {product['id'] for product in matching_products}
+                semantic = self.semantic_search_products([query], limit=semantic_limit + len(seen))[0]
+                matching_products.extend([product for product in semantic if product['id'] not in seen][:semantic_limit])
+            
+            return matching_products
+            
+        except Exception as e:
+            logger.error(f"Error searching products: {e}")
             return [] 
\ No newline at end of file
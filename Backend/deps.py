@@ -0,0 +1,45 @@
+from typing import Iterator
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.services.chatbot_service import ChatbotService
+from app.services.async_service import AsyncChatbotService, ExecutorSaturatedError
+from app.services.service_manager import get_chatbot_service, get_async_chatbot_service, ServiceNotReadyError
+
+def get_db() -> Iterator[Session]:
+    """
+    Dependency that opens a database session for one request
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def require_chatbot_service() -> ChatbotService:
+    """
+    Dependency that hands out the warmed-up chatbot service or answers 503
+    """
+    try:
+        return get_chatbot_service()
+    except ServiceNotReadyError as e:
+        raise HTTPException(status_code=503, detail=f"Service is warming up: {str(e)}")
+
+def require_async_chatbot_service() -> AsyncChatbotService:
+    """
+    Dependency for the executor-backed facade; answers 503 while warming up
+    """
+    try:
+        return get_async_chatbot_service()
+    except ServiceNotReadyError as e:
+        raise HTTPException(status_code=503, detail=f"Service is warming up: {str(e)}")
+
+def executor_http_exception(e: Exception) -> HTTPException:
+    """
+    Map worker pool back-pressure and deadlines onto HTTP status codes
+    """
+    if isinstance(e, ExecutorSaturatedError):
+        return HTTPException(status_code=503, detail=f"Server is busy: {str(e)}", headers={"Retry-After": "1"})
+    return HTTPException(status_code=504, detail=str(e))
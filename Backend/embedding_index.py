@@ -0,0 +1,362 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when the feature extraction or file layout changes so cached indexes are rebuilt
+EMBEDDING_FORMAT_VERSION = 2
+
+# Word pairs ("running shoes") refine a match but should not outweigh the words themselves
+BIGRAM_WEIGHT = 0.5
+
+PRODUCT_TEXT_COLUMNS = ['id', 'name', 'brand', 'category', 'department']
+
+def _json_id(product_id):
+    """A product ID as JSON can hold it: NumPy scalars as Python numbers, anything else unusual as text"""
+    if isinstance(product_id, np.generic):
+        return product_id.item()
+    return product_id if isinstance(product_id, (int, float, str)) or product_id is None else str(product_id)
+
+def _stem(word: str) -> str:
+    """Fold simple plurals so "sneaker" and "sneakers" share a feature"""
+    if len(word) > 4 and word.endswith(('ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us')):
+        return word[:-1]
+    return word
+
+def _features(text: str) -> List[Tuple[str, float]]:
+    """Stemmed words and adjacent word pairs of text, with their weights"""
+    words = [_stem(word) for word in re.findall(r"[a-z0-9]+", re.sub(r"['’`]", "", text.lower()))]
+    features = [(word, 1.0) for word in words]
+    features += [(f"{a} {b}", BIGRAM_WEIGHT) for a, b in zip(words, words[1:])]
+    return features
+
+@lru_cache(maxsize=200000)
+def _bucket(feature: str, n_features: int) -> int:
+    # crc32 rather than hash() so buckets are stable across processes and restarts
+    return zlib.crc32(feature.encode()) % n_features
+
+def _hashed_counts(texts: List[str], n_features: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Weighted feature counts as CSR arrays (indptr, indices, data)"""
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    for text in texts:
+        counts: Dict[int, float] = {}
+        for feature, weight in _features(text):
+            bucket = _bucket(feature, n_features)
+            counts[bucket] = counts.get(bucket, 0.0) + weight
+        indices.extend(counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    return (
+        np.array(indptr, dtype=np.int64),
+        np.array(indices, dtype=np.int32),
+        np.array(data, dtype=np.float32)
+    )
+
+def _tfidf(indptr: np.ndarray, indices: np.ndarray, counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """Sublinear term frequency times idf, L2-normalized per row"""
+    tf = np.where(counts > 1.0, 1.0 + np.log(np.maximum(counts, 1.0)), counts)
+    values = (tf * idf[indices]).astype(np.float32)
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weights=values.astype(np.float64) ** 2, minlength=len(indptr) - 1))
+    norms[norms == 0] = 1.0
+    return (values / norms[rows]).astype(np.float32)
+
+def _sparse_dot(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, dense: np.ndarray, chunk_rows: int = 4096) -> np.ndarray:
+    """CSR matrix times a dense matrix, a block of rows at a time to bound memory"""
+    n_rows = len(indptr) - 1
+    out = np.zeros((n_rows, dense.shape[1]), dtype=np.float32)
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        lo, hi = indptr[start], indptr[stop]
+        if lo == hi:
+            continue
+        contributions = data[lo:hi, None] * dense[indices[lo:hi]]
+        lengths = np.diff(indptr[start:stop + 1])
+        nonempty = lengths > 0
+        # Empty rows add nothing, so each reduceat segment runs to the next non-empty row
+        out[start:stop][nonempty] = np.add.reduceat(contributions, (indptr[start:stop] - lo)[nonempty], axis=0)
+    return out
+
+def _transpose(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_columns: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+    order = np.argsort(indices, kind='stable')
+    t_indptr = np.concatenate([[0], np.cumsum(np.bincount(indices, minlength=n_columns))]).astype(np.int64)
+    return t_indptr, rows[order], data[order]
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+def catalog_fingerprint(products: pd.DataFrame, dims: int, n_features: int) -> str:
+    """Identifies the catalog text and parameters an index was built from"""
+    digest = hashlib.sha1(f"{EMBEDDING_FORMAT_VERSION}:{dims}:{n_features}".encode())
+    columns = products[PRODUCT_TEXT_COLUMNS].astype(str)
+    digest.update(pd.util.hash_pandas_object(columns, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def product_texts(products: pd.DataFrame) -> List[str]:
+    columns = products[['name', 'brand', 'category', 'department']].fillna('').astype(str)
+    return (columns['name'] + ' ' + columns['brand'] + ' ' + columns['category'] + ' ' + columns['department']).tolist()
+
+class ProductEmbeddingIndex:
+    """
+    Dense product vectors for semantic search, computed locally without a model download.
+
+    Product name, brand, category and department are hashed into a fixed number of
+    TF-IDF buckets (words and word pairs), and a truncated SVD of
+    that matrix (latent semantic analysis) projects them to a few dozen float32
+    dimensions. Words that keep appearing in the same products' text end up close
+    together, so a query can match products it shares no word with when the catalog
+    itself links the terms; it is no general synonym model. Queries go through the
+    same projection and are scored against every product with one matrix product, or
+    against the nearest clusters only when an IVF index was built for a large catalog.
+
+    Arrays are saved as .npy files keyed by a fingerprint of the catalog and loaded
+    memory-mapped, so a restart with an unchanged catalog skips the build entirely.
+    """
+
+    def __init__(self, product_ids: np.ndarray, vectors: np.ndarray, components: np.ndarray, idf: np.ndarray,
+                 centroids: Optional[np.ndarray] = None, list_order: Optional[np.ndarray] = None,
+                 list_offsets: Optional[np.ndarray] = None, probes: int = 8):
+        self.product_ids = product_ids
+        self.vectors = vectors
+        self.components = components
+        self.idf = idf
+        self.n_features = len(idf)
+        self.dimensions = vectors.shape[1]
+        self.centroids = centroids
+        self.list_order = list_order
+        self.list_offsets = list_offsets
+        self.probes = probes
+        self._rows: Optional[Dict[Any, int]] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.product_ids)
+
+    @classmethod
+    def build(cls, products: pd.DataFrame, dims: int = 64, n_features: int = 2 ** 15,
+              ivf_min_products: int = 50000, probes: int = 8, power_iterations: int = 2,
+              seed: int = 42) -> "ProductEmbeddingIndex":
+        indptr, indices, counts = _hashed_counts(product_texts(products), n_features)
+        n_docs = len(indptr) - 1
+
+        document_frequency = np.bincount(indices, minlength=n_features)
+        idf = (np.log((1.0 + n_docs) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        data = _tfidf(indptr, indices, counts, idf)
+        t_indptr, t_indices, t_data = _transpose(indptr, indices, data, n_features)
+
+        # Randomized SVD: find the range of X with a few power iterations, then take the
+        # exact SVD of the small projected matrix
+        rank = max(1, min(dims + 10, n_docs))
+        rng = np.random.default_rng(seed)
+        sketch = _sparse_dot(indptr, indices, data, rng.standard_normal((n_features, rank)).astype(np.float32))
+        for _ in range(power_iterations):
+            basis, _ = np.linalg.qr(sketch)
+            projected, _ = np.linalg.qr(_sparse_dot(t_indptr, t_indices, t_data, basis))
+            sketch = _sparse_dot(indptr, indices, data, projected)
+        basis, _ = np.linalg.qr(sketch)
+        small = _sparse_dot(t_indptr, t_indices, t_data, basis).T
+        _, _, vt = np.linalg.svd(small, full_matrices=False)
+
+        dims = min(dims, vt.shape[0])
+        # Stored bucket-major so a query only touches the rows of its own buckets
+        components = np.ascontiguousarray(vt[:dims].T, dtype=np.float32)
+        vectors = _normalize(_sparse_dot(indptr, indices, data, components))
+
+        index = cls(products['id'].to_numpy(), vectors, components, idf, probes=probes)
+        if n_docs >= ivf_min_products:
+            index._build_ivf(rng)
+        return index
+
+    def _build_ivf(self, rng: np.random.Generator, iterations: int = 10, sample_size: int = 20000):
+        """Spherical k-means over the product vectors, with each product filed under its nearest centroid"""
+        n_lists = max(1, int(np.sqrt(self.size)))
+        sample = self.vectors[rng.choice(self.size, size=min(sample_size, self.size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = np.bincount(assignment, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        assignment = np.concatenate([
+            np.argmax(self.vectors[start:start + 8192] @ centroids.T, axis=1)
+            for start in range(0, self.size, 8192)
+        ])
+        self.centroids = centroids
+        self.list_order = np.argsort(assignment, kind='stable').astype(np.int32)
+        self.list_offsets = np.searchsorted(assignment[self.list_order], np.arange(n_lists + 1)).astype(np.int64)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Project free text into the product vector space"""
+        indptr, indices, counts = _hashed_counts(texts, self.n_features)
+        data = _tfidf(indptr, indices, counts, np.asarray(self.idf))
+        return _normalize(_sparse_dot(indptr, indices, data, self.components))
+
+    def similarities(self, query: str, texts: List[str]) -> np.ndarray:
+        """Cosine similarity between a query and arbitrary texts, in the catalog's vector space"""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        encoded = self.encode([query] + list(texts))
+        return encoded[1:] @ encoded[0]
+
+    def _top(self, scores: np.ndarray, rows: np.ndarray, limit: int, min_score: float) -> List[Tuple[Any, float]]:
+        if len(scores) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        best = best[scores[best] >= min_score]
+        # tolist gives plain Python IDs from numeric and object arrays alike
+        return list(zip(self.product_ids[rows[best]].tolist(), np.round(scores[best].astype(np.float64), 4).tolist()))
+
+    def search(self, queries: List[str], limit: int = 10, min_score: float = 0.0,
+               batch_size: int = 256) -> List[List[Tuple[Any, float]]]:
+        """Top products for each query as (product_id, score), best first"""
+        if not queries or self.size == 0:
+            return [[] for _ in queries]
+
+        results: List[List[Tuple[Any, float]]] = []
+        for start in range(0, len(queries), batch_size):
+            results.extend(self.search_vectors(self.encode(queries[start:start + batch_size]), limit, min_score))
+        return results
+
+    def search_vectors(self, encoded: np.ndarray, limit: int = 10, min_score: float = 0.0) -> List[List[Tuple[Any, float]]]:
+        """Top products for each already encoded query vector"""
+        if self.centroids is None:
+            scores = encoded @ np.asarray(self.vectors).T
+            all_rows = np.arange(self.size)
+            return [self._top(row_scores, all_rows, limit, min_score) for row_scores in scores]
+
+        results = []
+        probes = min(self.probes, len(self.centroids))
+        nearest_lists = np.argpartition(-(encoded @ self.centroids.T), probes - 1, axis=1)[:, :probes]
+        for query_vector, lists in zip(encoded, nearest_lists):
+            rows = np.concatenate([self.list_order[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists])
+            results.append(self._top(self.vectors[rows] @ query_vector, rows, limit, min_score))
+        return results
+
+    def similar(self, product_id, limit: int = 10, min_score: float = 0.0) -> List[Tuple[Any, float]]:
+        """Products nearest to product_id in the vector space, excluding the product itself"""
+        if self._rows is None:
+            self._rows = {key: row for row, key in enumerate(self.product_ids.tolist())}
+        row = self._rows.get(product_id)
+        if row is None:
+            return []
+        hits = self.search_vectors(np.asarray(self.vectors[row:row + 1]), limit + 1, min_score)[0]
+        return [(key, score) for key, score in hits if key != product_id][:limit]
+
+    def save(self, path: str):
+        if self.product_ids.dtype == object:
+            # Mixed or string IDs go to JSON, which keeps ints and strings apart where astype(str) would not
+            with open(os.path.join(path, 'product_ids.json'), 'w') as f:
+                json.dump([_json_id(product_id) for product_id in self.product_ids.tolist()], f)
+        arrays = {
+            'vectors': self.vectors,
+            'components': self.components,
+            'idf': self.idf
+        }
+        if self.product_ids.dtype != object:
+            arrays['product_ids'] = self.product_ids
+        if self.centroids is not None:
+            arrays.update(centroids=self.centroids, list_order=self.list_order, list_offsets=self.list_offsets)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(array))
+
+    @classmethod
+    def load(cls, path: str, probes: int = 8) -> "ProductEmbeddingIndex":
+        def load_array(name: str, mmap: bool = True) -> Optional[np.ndarray]:
+            file_path = os.path.join(path, f"{name}.npy")
+            if not os.path.exists(file_path):
+                return None
+            return np.load(file_path, mmap_mode='r' if mmap else None)
+
+        product_ids = load_array('product_ids', mmap=False)
+        if product_ids is None:
+            with open(os.path.join(path, 'product_ids.json')) as f:
+                values = json.load(f)
+            product_ids = np.empty(len(values), dtype=object)
+            product_ids[:] = values
+
+        return cls(
+            product_ids,
+            load_array('vectors'),
+            load_array('components'),
+            load_array('idf', mmap=False),
+            centroids=load_array('centroids', mmap=False),
+            list_order=load_array('list_order'),
+            list_offsets=load_array('list_offsets', mmap=False),
+            probes=probes
+        )
+
+    @classmethod
+    def load_or_build(cls, products: pd.DataFrame, directory: str, dims: int = 64, n_features: int = 2 ** 15,
+                      ivf_min_products: int = 50000, probes: int = 8) -> "ProductEmbeddingIndex":
+        """Memory-map the cached index for this catalog, building and caching it on a miss"""
+        fingerprint = catalog_fingerprint(products, dims, n_features)
+        path = os.path.join(directory, fingerprint)
+        meta_path = os.path.join(path, 'meta.json')
+
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                if meta.get('version') == EMBEDDING_FORMAT_VERSION:
+                    index = cls.load(path, probes=probes)
+                    logger.info(f"Loaded product embeddings {fingerprint} ({index.size} products)")
+                    return index
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable product embeddings at {path}: {e}")
+
+        index = cls.build(products, dims=dims, n_features=n_features, ivf_min_products=ivf_min_products, probes=probes)
+        scratch = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Write to a scratch directory and rename it into place so readers never see a partial index
+            scratch = tempfile.mkdtemp(prefix='.building-', dir=directory)
+            index.save(scratch)
+            with open(os.path.join(scratch, 'meta.json'), 'w') as f:
+                json.dump({
+                    'version': EMBEDDING_FORMAT_VERSION,
+                    'fingerprint': fingerprint,
+                    'products': index.size,
+                    'dimensions': index.dimensions,
+                    'hash_features': n_features,
+                    'ivf_lists': 0 if index.centroids is None else len(index.centroids),
+                    'built_at': datetime.utcnow().isoformat()
+                }, f)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.rename(scratch, path)
+
+            for entry in os.listdir(directory):
+                if entry != fingerprint and not entry.startswith('.'):
+                    shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+            logger.info(f"Built product embeddings {fingerprint} ({index.size} products, {index.dimensions} dims)")
+        except OSError as e:
+            logger.warning(f"Could not cache product embeddings in {directory}: {e}")
+        finally:
+            # Only left behind when the save failed part way
+            if scratch is not None and os.path.isdir(scratch):
+                shutil.rmtree(scratch, ignore_errors=True)
+        return index
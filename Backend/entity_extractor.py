@@ -0,0 +1,130 @@
+import re
+from typing import List, Dict, Tuple
+import logging
+
+from app.services.product_index import ProductFilters, COLOR_ALIASES
+
+logger = logging.getLogger(__name__)
+
+_NUMBER = r'\$?\s*(\d+(?:\.\d{1,2})?)'
+PRICE_BETWEEN = re.compile(rf'\b(?:between|from)\s+{_NUMBER}\s+(?:and|to)\s+{_NUMBER}')
+PRICE_RANGE = re.compile(rf'\$\s*(\d+(?:\.\d{{1,2}})?)\s*(?:-|to)\s*{_NUMBER}')
+PRICE_MAX = re.compile(rf'\b(?:under|below|less\s+than|cheaper\s+than|up\s+to|at\s+most|no\s+more\s+than|max(?:imum)?)\s+{_NUMBER}')
+PRICE_MIN = re.compile(rf'\b(?:over|above|more\s+than|at\s+least|starting\s+at|min(?:imum)?)\s+{_NUMBER}')
+
+DEPARTMENT_ALIASES = {
+    'women': ['women', 'womens', 'woman', 'ladies', 'female'],
+    'men': ['men', 'mens', 'man', 'male', 'guys']
+}
+
+# Brand names that are also everyday words would match far too often
+BRAND_STOPWORDS = {'a', 'an', 'and', 'the', 'for', 'from', 'by', 'me', 'show', 'under', 'over', 'with', 'in', 'on', 'of', 'to', 'any', 'all', 'new'}
+
+MAX_PHRASE_WORDS = 4
+
+def _normalize(text: str) -> str:
+    return re.sub(r"['’`]", "", text.lower())
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9&+\-]+", _normalize(text))
+
+def _singular(word: str) -> str:
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith('es') and word[:-2].endswith(('ss', 'sh', 'ch', 'x')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith('ss') and len(word) > 3:
+        return word[:-1]
+    return word
+
+class ProductQueryExtractor:
+    """
+    Turns a chat message into ProductFilters using the catalog's own vocabulary.
+
+    Phrases of up to four words are looked up longest first, so "tops & tees" wins
+    over "tops" and a multi-word brand is not split into a category and a stray word.
+    """
+
+    def __init__(self, vocabulary: Dict[str, List[str]]):
+        self.categories: Dict[str, str] = {}
+        for category in vocabulary.get('category', []):
+            for alias in self._category_aliases(category):
+                self.categories.setdefault(alias, category)
+
+        self.brands: Dict[str, str] = {}
+        for brand in vocabulary.get('brand', []):
+            key = ' '.join(_tokens(brand))
+            if key and key not in BRAND_STOPWORDS and len(key) > 1:
+                self.brands.setdefault(key, brand)
+
+        known_departments = set(vocabulary.get('department', []))
+        self.departments: Dict[str, str] = {
+            alias: department
+            for department, aliases in DEPARTMENT_ALIASES.items() if department in known_departments
+            for alias in aliases
+        }
+
+        self.colors: Dict[str, str] = {color: color for color in vocabulary.get('color', [])}
+        for alias, color in COLOR_ALIASES.items():
+            if color in self.colors:
+                self.colors[alias] = color
+
+    @staticmethod
+    def _category_aliases(category: str) -> List[str]:
+        full = ' '.join(_tokens(category))
+        aliases = [full, ' '.join(_singular(word) for word in full.split())]
+        for part in re.split(r'\s*(?:&|,|\band\b)\s*', full):
+            part = part.strip()
+            if part:
+                aliases.extend([part, ' '.join(_singular(word) for word in part.split())])
+        return [alias for alias in aliases if alias]
+
+    def _match_phrases(self, tokens: List[str]) -> List[Tuple[str, str]]:
+        """Greedy longest-first scan returning (kind, value) matches"""
+        matches = []
+        position = 0
+        while position < len(tokens):
+            for length in range(min(MAX_PHRASE_WORDS, len(tokens) - position), 0, -1):
+                phrase = ' '.join(tokens[position:position + length])
+                singular = ' '.join(_singular(word) for word in tokens[position:position + length])
+                found = None
+                if phrase in self.colors:
+                    found = ('color', self.colors[phrase])
+                elif phrase in self.departments:
+                    found = ('department', self.departments[phrase])
+                elif phrase in self.categories or singular in self.categories:
+                    found = ('category', self.categories.get(phrase) or self.categories[singular])
+                elif phrase in self.brands:
+                    found = ('brand', self.brands[phrase])
+                if found:
+                    matches.append(found)
+                    position += length
+                    break
+            else:
+                position += 1
+        return matches
+
+    def extract(self, message: str) -> ProductFilters:
+        filters = ProductFilters()
+        text = message.lower()
+
+        between = PRICE_BETWEEN.search(text) or PRICE_RANGE.search(text)
+        if between:
+            low, high = sorted((float(between.group(1)), float(between.group(2))))
+            filters.min_price, filters.max_price = low, high
+            text = text[:between.start()] + ' ' + text[between.end():]
+        else:
+            maximum = PRICE_MAX.search(text)
+            if maximum:
+                filters.max_price = float(maximum.group(1))
+                text = text[:maximum.start()] + ' ' + text[maximum.end():]
+            minimum = PRICE_MIN.search(text)
+            if minimum:
+                filters.min_price = float(minimum.group(1))
+                text = text[:minimum.start()] + ' ' + text[minimum.end():]
+
+        for kind, value in self._match_phrases(_tokens(text)):
+            if getattr(filters, kind) is None:
+                setattr(filters, kind, value)
+
+        return filters
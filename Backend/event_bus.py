@@ -0,0 +1,199 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Every event goes to Redis once, on this channel, with the topics it was published on
+CHANNEL = "events"
+
+def order_topics(order_id, user_id=None) -> List[str]:
+    """Topics an order change is published on: the order itself and its owner"""
+    topics = [f"order:{order_id}"]
+    if user_id is not None:
+        topics.append(f"user:{user_id}")
+    return topics
+
+class Subscription:
+    """
+    One subscriber's bounded queue of events, read from the event loop it was created on.
+
+    Publishers never wait on a slow reader: when the queue is full the oldest event
+    is dropped to make room, and the drop is counted.
+    """
+
+    def __init__(self, topics: Iterable[str], max_size: int):
+        self.topics = set(topics)
+        self.dropped = 0
+        self._events: deque = deque(maxlen=max_size)
+        self._ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+
+    def _push(self, event: Dict[str, Any]):
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self._ready.set()
+
+    def deliver(self, event: Dict[str, Any]):
+        """Queue an event from any thread"""
+        try:
+            self._loop.call_soon_threadsafe(self._push, event)
+        except RuntimeError:
+            # The subscriber's loop has shut down
+            pass
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None if none arrives within timeout"""
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._events.popleft()
+
+class EventBus:
+    """In-process pub/sub: events reach the subscribers of this process only"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._published = 0
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """Must be called from a running event loop"""
+        subscription = Subscription(topics, self.queue_size)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic, [])
+                if subscription in subscribers:
+                    subscribers.remove(subscription)
+                if not subscribers:
+                    self._subscribers.pop(topic, None)
+
+    def publish(self, topics: Iterable[str], event: Dict[str, Any]):
+        """Publish an event on several topics; safe to call from any thread"""
+        self._published += 1
+        self._deliver(topics, event)
+
+    def _deliver(self, topics: Iterable[str], event: Dict[str, Any]):
+        """Hand an event to the local subscribers of any of its topics"""
+        delivered = set()
+        for topic in topics:
+            with self._lock:
+                subscribers = [s for s in self._subscribers.get(topic, ()) if id(s) not in delivered]
+            for subscription in subscribers:
+                # A subscriber to both the order and its user still gets the event once
+                delivered.add(id(subscription))
+                subscription.deliver(event)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscriptions = {id(s): s for subscribers in self._subscribers.values() for s in subscribers}
+        return {
+            "backend": "memory",
+            "published": self._published,
+            "subscriptions": len(subscriptions),
+            "dropped": sum(s.dropped for s in subscriptions.values())
+        }
+
+class RedisEventBus(EventBus):
+    """
+    Pub/sub through a Redis-compatible server so every node's subscribers see every event.
+
+    Events are published to Redis only, once each with their topics in the message;
+    a listener thread per process, started with the first subscription, subscribes
+    to the event channel and hands each message to the local subscribers of its
+    topics, so a subscriber to several of them still gets the event once.
+    """
+
+    def __init__(self, client, queue_size: int):
+        super().__init__(queue_size)
+        self.client = client
+        self._listener: Optional[threading.Thread] = None
+        self._listener_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            self._listener = threading.Thread(target=self._listen, args=(pubsub,), name="event-bus-listener", daemon=True)
+            self._listener.start()
+
+    def _listen(self, pubsub):
+        while True:
+            try:
+                message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message or message.get("type") != "message":
+                    continue
+                data = json.loads(message["data"])
+                self._deliver(data["topics"], data["event"])
+            except Exception as e:
+                logger.error(f"Event bus listener error: {e}")
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        self._ensure_listener()
+        return super().subscribe(topics)
+
+    def publish(self, topics: Iterable[str], event: Dict[str, Any]):
+        self._published += 1
+        data = json.dumps({"topics": list(topics), "event": event}, default=str, separators=(",", ":"))
+        self.client.publish(CHANNEL, data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "backend": "redis"}
+
+def order_event(order_id, user_id, status: Optional[str], event: str, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+    """The payload published for an order status change"""
+    return {
+        "type": "order_status",
+        "order_id": order_id,
+        "user_id": user_id,
+        "status": status,
+        "event": event,
+        "timestamp": (timestamp or datetime.utcnow()).isoformat()
+    }
+
+def publish_order_event(order_id, user_id, status: Optional[str], event: str, timestamp: Optional[datetime] = None):
+    """Publish an order status change to its order and user topics, logging rather than raising"""
+    try:
+        get_event_bus().publish(order_topics(order_id, user_id), order_event(order_id, user_id, status, event, timestamp))
+    except Exception as e:
+        logger.error(f"Error publishing order event for {order_id}: {e}")
+
+def create_event_bus(backend_name: str) -> EventBus:
+    if backend_name == "redis":
+        from app.core.redis_client import get_redis_client
+
+        return RedisEventBus(get_redis_client(), settings.EVENT_BUS_QUEUE_SIZE)
+    if backend_name == "memory":
+        return EventBus(settings.EVENT_BUS_QUEUE_SIZE)
+    raise ValueError(f"Unknown event bus backend: {backend_name}")
+
+# Global event bus instance
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+def get_event_bus() -> EventBus:
+    global _event_bus
+    if _event_bus is None:
+        with _event_bus_lock:
+            if _event_bus is None:
+                _event_bus = create_event_bus(settings.EVENT_BUS_BACKEND)
+    return _event_bus
@@ -0,0 +1,156 @@
+import math
+import re
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words that carry the question rather than the product
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'any', 'available', 'can', 'check', 'do', 'does', 'for', 'have', 'how',
+    'i', 'in', 'is', 'it', 'left', 'many', 'me', 'much', 'my', 'of', 'on', 'or', 'please', 'show',
+    'stock', 'still', 'the', 'there', 'to', 'what', 'you', 'your', 'with', 'inventory', 'units',
+    'we', 'us', 'want', 'need', 'looking', 'about', 'get', 'tell', 'whether', 'if', 'by'
+}
+
+def _tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", re.sub(r"['’`]", "", text.lower()))
+
+def _trigrams(token: str) -> List[str]:
+    padded = f"  {token} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance, giving up (returning max_distance + 1) once it cannot stay within the bound"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+def max_edits(token: str) -> int:
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 6 else 2
+
+class FuzzyNameIndex:
+    """
+    Resolves free-text product mentions, typos included, to product IDs.
+
+    Every word of every product name and brand goes into a vocabulary with a posting
+    array of the products that contain it. Query words are matched exactly when
+    possible; otherwise candidates come from a trigram index over the vocabulary,
+    pruned by word length and confirmed with a bounded edit distance. Products are
+    scored by the IDF weight of the query words they contain.
+    """
+
+    def __init__(self, product_ids: List[Any], names: List[str], brands: List[str], popularity: Optional[Dict[Any, float]] = None):
+        self.product_ids = np.asarray(product_ids)
+        self.names = list(names)
+        popularity = popularity or {}
+        self.popularity = np.array([popularity.get(product_id, 0.0) for product_id in product_ids], dtype=np.float64)
+
+        postings = defaultdict(set)
+        for row, (name, brand) in enumerate(zip(names, brands)):
+            for token in _tokenize(f"{name} {brand}"):
+                postings[token].add(row)
+
+        self.vocabulary: Dict[str, int] = {}
+        self.postings: List[np.ndarray] = []
+        self.weights: List[float] = []
+        total = max(len(self.names), 1)
+        for token, rows in postings.items():
+            self.vocabulary[token] = len(self.postings)
+            self.postings.append(np.fromiter(sorted(rows), dtype=np.int32, count=len(rows)))
+            self.weights.append(math.log(1 + total / len(rows)))
+
+        self.tokens = list(self.vocabulary)
+        self.token_lengths = np.array([len(token) for token in self.tokens], dtype=np.int16)
+
+        grams = defaultdict(list)
+        for token_id, token in enumerate(self.tokens):
+            for gram in set(_trigrams(token)):
+                grams[gram].append(token_id)
+        self.trigram_postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+
+    def correct(self, token: str) -> List[Tuple[int, int]]:
+        """Vocabulary words within edit distance of token, as (token_id, distance)"""
+        if token in self.vocabulary:
+            return [(self.vocabulary[token], 0)]
+
+        limit = max_edits(token)
+        if limit == 0:
+            return []
+
+        lists = [self.trigram_postings[gram] for gram in _trigrams(token) if gram in self.trigram_postings]
+        if not lists:
+            return []
+
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.tokens))
+        # Each edit destroys at most three trigrams, and lengths can only differ by the edit budget
+        needed = max(1, len(_trigrams(token)) - 3 * limit)
+        candidates = np.flatnonzero(
+            (counts >= needed) & (np.abs(self.token_lengths - len(token)) <= limit)
+        )
+
+        matches = []
+        for token_id in candidates:
+            distance = bounded_levenshtein(token, self.tokens[token_id], limit)
+            if distance <= limit:
+                matches.append((int(token_id), distance))
+        return matches
+
+    def resolve(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Products best matching the mention in text, best first"""
+        query = [token for token in _tokenize(text) if token not in STOPWORDS]
+        if not query or not self.tokens:
+            return []
+
+        scores = np.zeros(len(self.names), dtype=np.float64)
+        possible = 0.0
+        for token in query:
+            matches = self.correct(token)
+            if not matches:
+                continue
+            best_weight = 0.0
+            token_scores = np.zeros(len(self.names), dtype=np.float64)
+            for token_id, distance in matches:
+                # Typos count for a little less than exact hits
+                weight = self.weights[token_id] * (1.0 - 0.25 * distance)
+                rows = self.postings[token_id]
+                token_scores[rows] = np.maximum(token_scores[rows], weight)
+                best_weight = max(best_weight, weight)
+            scores += token_scores
+            possible += best_weight
+
+        if possible == 0.0:
+            return []
+
+        # Keep products that explain most of what was recognised in the query
+        candidates = np.flatnonzero(scores >= 0.6 * possible)
+        if len(candidates) == 0:
+            return []
+
+        top_score = scores[candidates].max()
+        candidates = candidates[scores[candidates] >= 0.9 * top_score]
+        order = np.lexsort((-self.popularity[candidates], -scores[candidates]))[:limit]
+
+        return [
+            {
+                'product_id': self.product_ids[row].item(),
+                'name': self.names[row],
+                'score': round(float(scores[row] / possible), 3)
+            }
+            for row in candidates[order]
+        ]
@@ -0,0 +1,282 @@
+import bisect
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+# Delivery times are kept per distribution center and per customer distance band
+DISTANCE_BANDS_KM = (250.0, 1000.0, 2500.0)
+# Band index for customers without a known location: the center's figures at any distance
+_ANY_DISTANCE = len(DISTANCE_BANDS_KM) + 1
+# Typical and late delivery, as quantiles of the historical times
+QUANTILES = (0.5, 0.9)
+# Customers' distances are computed against all centers this many at a time
+_USER_CHUNK = 65536
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km between points in degrees; arrays broadcast"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Scalar haversine for single lookups, where numpy call overhead would dominate"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(a, 0.0), 1.0)))
+
+def _timestamps(values: pd.Series) -> pd.Series:
+    """Naive timestamps of a column; only differences are taken, so a shared zone suffix is dropped"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.tz_convert(None) if values.dt.tz is not None else values
+    # Parsing just "YYYY-MM-DD HH:MM:SS" is an order of magnitude faster than handling the offsets
+    return pd.to_datetime(values.astype(str).str.slice(0, 19), format='%Y-%m-%d %H:%M:%S', errors='coerce')
+
+def _rows(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Rows of values in a sorted key array, -1 where absent"""
+    if not len(keys):
+        return np.full(len(values), -1, dtype=np.int64)
+    rows = np.searchsorted(keys, values).clip(0, len(keys) - 1)
+    return np.where(keys[rows] == values, rows, -1)
+
+def _lookup(keys: np.ndarray, key) -> int:
+    """Row of key in a sorted key array, or -1"""
+    row = int(np.searchsorted(keys, key))
+    return row if row < len(keys) and keys[row] == key else -1
+
+class DeliveryEstimator:
+    """
+    Nearest distribution centers per customer and delivery-time distributions per
+    distribution center, for answering when an order will arrive.
+
+    Every customer's distances to all centers are computed once, vectorized, and the
+    nearest few are kept in arrays aligned with the sorted user IDs. Historical
+    created→shipped and shipped→delivered times become quantile tables per center and
+    distance band, falling back to the center as a whole and then to all centers where
+    a band has too few deliveries. Each order's shipping centers are kept in a flat
+    array with an offset table, so an estimate is a few binary searches and table reads.
+    """
+
+    def __init__(self, centers: pd.DataFrame, user_ids: np.ndarray, user_coordinates: np.ndarray,
+                 nearest: np.ndarray, nearest_km: np.ndarray, product_ids: np.ndarray, product_centers: np.ndarray,
+                 order_ids: np.ndarray, order_users: np.ndarray, offsets: np.ndarray, order_centers: np.ndarray,
+                 processing_hours: np.ndarray, transit_hours: np.ndarray):
+        self.center_ids = centers['id'].to_numpy(dtype=np.int64)
+        self.center_names = centers['name'].astype(str).tolist()
+        self.center_coordinates = centers[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+        self.user_ids = user_ids
+        self.user_coordinates = user_coordinates
+        self.nearest = nearest
+        self.nearest_km = nearest_km
+        self.product_ids = product_ids
+        self.product_centers = product_centers
+        self.order_ids = order_ids
+        self.order_users = order_users
+        self.offsets = offsets
+        self.order_centers = order_centers
+        # [center (last row: all centers), distance band (last column: any distance), quantile]
+        self.processing_hours = processing_hours
+        self.transit_hours = transit_hours
+        # Orders placed after the build: order ID -> (user row, center rows)
+        self._recent: Dict[int, Tuple[int, List[int]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, distribution_centers: pd.DataFrame, users: pd.DataFrame, products: pd.DataFrame,
+              orders: pd.DataFrame, order_items: pd.DataFrame, nearest_count: int = 3,
+              min_samples: int = 30) -> "DeliveryEstimator":
+        centers = distribution_centers.dropna(subset=['latitude', 'longitude']).sort_values('id').reset_index(drop=True)
+        center_ids = centers['id'].to_numpy(dtype=np.int64)
+        center_coordinates = centers[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+        if not len(centers):
+            raise ValueError("No distribution centers with coordinates")
+
+        located = users.dropna(subset=['latitude', 'longitude']).drop_duplicates('id').sort_values('id')
+        user_ids = located['id'].to_numpy(dtype=np.int64)
+        user_coordinates = located[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+
+        # Nearest centers per customer from the full customer x center distance matrix, in chunks
+        nearest_count = min(nearest_count, len(centers))
+        nearest = np.empty((len(user_ids), nearest_count), dtype=np.int16)
+        nearest_km = np.empty((len(user_ids), nearest_count), dtype=np.float32)
+        for start in range(0, len(user_ids), _USER_CHUNK):
+            chunk = user_coordinates[start:start + _USER_CHUNK]
+            distances = haversine_km(chunk[:, :1], chunk[:, 1:], center_coordinates[:, 0], center_coordinates[:, 1])
+            closest = np.argsort(distances, axis=1)[:, :nearest_count]
+            nearest[start:start + len(chunk)] = closest
+            nearest_km[start:start + len(chunk)] = np.take_along_axis(distances, closest, axis=1)
+
+        # Each product ships from its own distribution center
+        catalog = products[['id', 'distribution_center_id']].dropna().drop_duplicates('id').sort_values('id')
+        center_rows = {center_id: row for row, center_id in enumerate(center_ids.tolist())}
+        product_ids = catalog['id'].to_numpy(dtype=np.int64)
+        product_centers = catalog['distribution_center_id'].astype(np.int64).map(center_rows).fillna(-1).to_numpy(dtype=np.int16)
+
+        items = order_items[['order_id', 'user_id', 'product_id', 'created_at', 'shipped_at', 'delivered_at']].dropna(subset=['order_id', 'product_id'])
+        item_products = _rows(product_ids, items['product_id'].to_numpy(dtype=np.int64))
+        item_centers = np.where(item_products >= 0, product_centers[item_products], -1).astype(np.int64)
+
+        # Shipping centers per order, as a flat array with offsets over the sorted order IDs
+        routes = pd.DataFrame({'order_id': items['order_id'].to_numpy(dtype=np.int64), 'center': item_centers})
+        routes = routes[routes['center'] >= 0].drop_duplicates().sort_values(['order_id', 'center'])
+        order_ids, starts = np.unique(routes['order_id'].to_numpy(), return_index=True)
+        offsets = np.append(starts, len(routes)).astype(np.int64)
+        order_centers = routes['center'].to_numpy(dtype=np.int16)
+
+        owners = orders[['order_id', 'user_id']].dropna().drop_duplicates('order_id').set_index('order_id')['user_id']
+        owners = owners.reindex(order_ids).fillna(-1).to_numpy(dtype=np.int64)
+        order_users = _rows(user_ids, owners)
+
+        # Historical times per center and distance band
+        created, shipped, delivered = (_timestamps(items[column]) for column in ('created_at', 'shipped_at', 'delivered_at'))
+        history = pd.DataFrame({
+            'center': item_centers,
+            'processing': (shipped - created).dt.total_seconds().to_numpy() / 3600,
+            'transit': (delivered - shipped).dt.total_seconds().to_numpy() / 3600,
+        })
+        buyer_rows = _rows(user_ids, items['user_id'].fillna(-1).to_numpy(dtype=np.int64))
+        known = (item_centers >= 0) & (buyer_rows >= 0)
+        distance = np.full(len(history), np.nan)
+        distance[known] = haversine_km(
+            user_coordinates[buyer_rows[known], 0], user_coordinates[buyer_rows[known], 1],
+            center_coordinates[item_centers[known], 0], center_coordinates[item_centers[known], 1]
+        )
+        history['band'] = np.where(np.isnan(distance), _ANY_DISTANCE, np.searchsorted(DISTANCE_BANDS_KM, distance))
+
+        processing_hours = cls._quantile_table(history, 'processing', len(centers), min_samples)
+        transit_hours = cls._quantile_table(history, 'transit', len(centers), min_samples)
+
+        index = cls(
+            centers, user_ids, user_coordinates, nearest, nearest_km, product_ids, product_centers,
+            order_ids, order_users, offsets, order_centers, processing_hours, transit_hours
+        )
+        logger.info(
+            f"Built delivery estimator for {len(user_ids)} customers, {len(centers)} distribution centers "
+            f"and {len(order_ids)} orders"
+        )
+        return index
+
+    @staticmethod
+    def _quantile_table(history: pd.DataFrame, column: str, n_centers: int, min_samples: int) -> np.ndarray:
+        """
+        Quantiles of a duration per center and distance band. Cells with fewer than
+        min_samples times take their center's figures, and those take all centers'.
+        """
+        table = np.full((n_centers + 1, _ANY_DISTANCE + 1, len(QUANTILES)), np.nan)
+        times = history[(history[column] >= 0) & (history['center'] >= 0)]
+        if len(times) == 0:
+            return table
+
+        table[:, :] = times[column].quantile(list(QUANTILES)).to_numpy()
+        by_center = times.groupby('center')[column]
+        counts = by_center.size()
+        quantiles = by_center.quantile(list(QUANTILES)).unstack()
+        for center in counts.index[counts >= min_samples]:
+            table[int(center), :] = quantiles.loc[center].to_numpy()
+
+        by_band = times[times['band'] < _ANY_DISTANCE].groupby(['center', 'band'])[column]
+        counts = by_band.size()
+        quantiles = by_band.quantile(list(QUANTILES)).unstack()
+        for center, band in counts.index[counts >= min_samples]:
+            table[int(center), int(band)] = quantiles.loc[(center, band)].to_numpy()
+        return table
+
+    def _user_row(self, user_id) -> int:
+        if user_id is None:
+            return -1
+        return _lookup(self.user_ids, int(user_id))
+
+    def nearest_centers(self, user_id=None, latitude: Optional[float] = None, longitude: Optional[float] = None,
+                        limit: int = 3) -> List[Dict[str, Any]]:
+        """Closest distribution centers to a customer or a point, nearest first"""
+        if user_id is not None:
+            row = self._user_row(user_id)
+            if row < 0:
+                return []
+            rows, distances = self.nearest[row, :limit].tolist(), self.nearest_km[row, :limit].tolist()
+        elif latitude is not None and longitude is not None:
+            all_distances = haversine_km(latitude, longitude, self.center_coordinates[:, 0], self.center_coordinates[:, 1])
+            rows = np.argsort(all_distances)[:limit].tolist()
+            distances = all_distances[rows].tolist()
+        else:
+            return []
+        return [
+            {"id": int(self.center_ids[row]), "name": self.center_names[row], "distance_km": round(float(distance), 1)}
+            for row, distance in zip(rows, distances)
+        ]
+
+    def record_order(self, order_id: int, user_id, product_ids: Iterable[int]):
+        """Remember where an order placed after the build ships from"""
+        centers = set()
+        for product_id in product_ids:
+            row = _lookup(self.product_ids, int(product_id))
+            if row >= 0 and self.product_centers[row] >= 0:
+                centers.add(int(self.product_centers[row]))
+        with self._lock:
+            self._recent[int(order_id)] = (self._user_row(user_id), sorted(centers))
+
+    def _route(self, order_id: int) -> Optional[Tuple[int, List[int]]]:
+        with self._lock:
+            recent = self._recent.get(order_id)
+        if recent is not None:
+            return recent
+        row = _lookup(self.order_ids, order_id)
+        if row < 0:
+            return None
+        return int(self.order_users[row]), self.order_centers[self.offsets[row]:self.offsets[row + 1]].tolist()
+
+    def estimate(self, order_id: int, placed_at: Optional[datetime], shipped_at: Optional[datetime] = None,
+                 delivered_at: Optional[datetime] = None, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Typical and late arrival for an order from where it ships and how far it goes.
+        Unshipped orders add the usual processing time. None if the order is unknown.
+        """
+        if delivered_at is not None:
+            return {"status": "delivered", "delivered_at": delivered_at}
+        route = self._route(int(order_id))
+        if route is None:
+            return None
+        user_row, centers = route
+        if not centers and user_row >= 0:
+            # Products without a known center ship from the one nearest the customer
+            centers = [int(self.nearest[user_row, 0])]
+        anchor = shipped_at or placed_at
+        if anchor is None or not centers:
+            return None
+
+        slowest = None
+        for center in centers:
+            distance = None
+            band = _ANY_DISTANCE
+            if user_row >= 0:
+                latitude, longitude = self.user_coordinates[user_row]
+                distance = _distance_km(latitude, longitude, *self.center_coordinates[center])
+                band = bisect.bisect_left(DISTANCE_BANDS_KM, distance)
+            hours = self.transit_hours[center, band].tolist()
+            if shipped_at is None:
+                hours = [transit + processing for transit, processing in zip(hours, self.processing_hours[center, band].tolist())]
+            if math.isnan(hours[-1]):
+                continue
+            if slowest is None or hours[-1] > slowest[0][-1]:
+                slowest = (hours, center, distance)
+        if slowest is None:
+            return None
+
+        hours, center, distance = slowest
+        expected = anchor + timedelta(hours=float(hours[0]))
+        latest = anchor + timedelta(hours=float(hours[-1]))
+        return {
+            "status": "in_transit" if shipped_at is not None else "processing",
+            "estimated_delivery": expected,
+            "latest_delivery": latest,
+            "overdue": latest < (now or datetime.utcnow()),
+            "distribution_center": self.center_names[center],
+            "distance_km": round(distance, 1) if distance is not None else None
+        }
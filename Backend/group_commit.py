@@ -0,0 +1,184 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Callable, NamedTuple
+import logging
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.services.async_service import ExecutorSaturatedError, ExecutorTimeoutError
+
+logger = logging.getLogger(__name__)
+
+class WriteQueueFullError(ExecutorSaturatedError):
+    """Raised when more writes are waiting than the queue allows"""
+
+class _Write(NamedTuple):
+    write: Callable[[Session], Any]
+    finish: Optional[Callable[[Any], Any]]
+    future: Future
+
+class GroupCommitQueue:
+    """
+    Write-behind queue that commits concurrent writes together.
+
+    A single writer thread takes the first waiting write, gathers more until
+    max_batch are waiting or flush_interval has passed since the first, runs them all
+    in one session and commits once, so one fsync covers the whole batch. Each
+    caller's future resolves only after that commit (durable ack). If any write in a
+    batch fails, the batch is rolled back and its writes are replayed one transaction
+    each, so one bad write cannot fail its neighbours.
+
+    A longer flush_interval or larger max_batch trades commit latency for throughput;
+    flush_interval=0 commits whatever has queued up by the time the writer is free.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int, flush_interval: float, max_pending: int):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+        self._batches = 0
+        self._writes = 0
+        self._replays = 0
+
+    def submit(self, write: Callable[[Session], Any], finish: Optional[Callable[[Any], Any]] = None) -> Future:
+        """
+        Queue write(session) for the next group commit.
+
+        The returned future resolves to finish(write's return value), computed after the
+        commit while the session is still open, or to the write's exception.
+        """
+        future: Future = Future()
+        try:
+            self._queue.put_nowait(_Write(write, finish, future))
+        except queue.Full:
+            raise WriteQueueFullError(f"Write queue is full ({self._queue.maxsize} pending)")
+        return future
+
+    async def commit(self, write: Callable[[Session], Any], finish: Optional[Callable[[Any], Any]] = None,
+                     timeout: Optional[float] = None, on_done: Optional[Callable[[Future], Any]] = None) -> Any:
+        """
+        Await submit()'s result. A write still queued at the deadline is dropped; one
+        already running may yet commit, as with the worker pool. on_done(future) runs
+        once the write has committed, failed or been dropped, even after a timeout.
+        """
+        deadline = settings.EXECUTOR_TIMEOUT_SECONDS if timeout is None else timeout
+        future = self.submit(write, finish)
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"Group commit write timed out after {deadline}s")
+            raise ExecutorTimeoutError(f"Operation timed out after {deadline}s")
+
+    def _collect(self, first: _Write) -> List[Optional[_Write]]:
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                write = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(write)
+            if write is None:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            stopping = batch[-1] is None
+            # Writes whose callers gave up before they started are skipped, never half-applied
+            writes = [write for write in batch if write is not None and write.future.set_running_or_notify_cancel()]
+            try:
+                if writes:
+                    self._commit(writes)
+            except Exception as e:
+                logger.error(f"Group commit writer error: {e}")
+                for write in writes:
+                    if not write.future.done():
+                        write.future.set_exception(e)
+            if stopping:
+                return
+
+    def _resolve(self, write: _Write, value: Any):
+        try:
+            write.future.set_result(write.finish(value) if write.finish else value)
+        except Exception as e:
+            write.future.set_exception(e)
+
+    def _commit(self, writes: List[_Write]):
+        self._batches += 1
+        self._writes += len(writes)
+        session = self.session_factory()
+        try:
+            values = [write.write(session) for write in writes]
+            session.commit()
+            for write, value in zip(writes, values):
+                self._resolve(write, value)
+            return
+        except Exception as e:
+            session.rollback()
+            if len(writes) == 1:
+                writes[0].future.set_exception(e)
+                return
+            logger.warning(f"Group commit of {len(writes)} writes failed ({e}); replaying them one by one")
+        finally:
+            session.close()
+
+        self._replays += 1
+        for write in writes:
+            self._commit([write])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self._batches,
+            "writes": self._writes,
+            "average_batch": round(self._writes / self._batches, 2) if self._batches else 0.0,
+            "replayed_batches": self._replays
+        }
+
+    def shutdown(self, timeout: float = 5.0):
+        """Commit what is already queued, then stop the writer"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+# Global order write queue
+_write_queue: Optional[GroupCommitQueue] = None
+_write_queue_lock = threading.Lock()
+
+def get_order_write_queue() -> GroupCommitQueue:
+    global _write_queue
+    if _write_queue is None:
+        with _write_queue_lock:
+            if _write_queue is None:
+                from app.core.db import engine
+
+                # Committed objects stay readable, so responses are built without reloading them
+                factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+                _write_queue = GroupCommitQueue(
+                    factory,
+                    max_batch=settings.ORDER_WRITE_MAX_BATCH,
+                    flush_interval=settings.ORDER_WRITE_FLUSH_INTERVAL_MS / 1000,
+                    max_pending=settings.ORDER_WRITE_MAX_PENDING
+                )
+    return _write_queue
+
+def shutdown_order_write_queue():
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None:
+            _write_queue.shutdown()
+            _write_queue = None
@@ -1,37 +1,65 @@
-from fastapi import APIRouter
-from datetime import datetime
-
-router = APIRouter()
-
-@router.get("/health")
-async def health_check():
-    """
-    Health check endpoint
-    """
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow(),
-        "service": "E-commerce Customer Support Chatbot API",
-        "version": "1.0.0"
-    }
-
-@router.get("/health/detailed")
-async def detailed_health_check():
-    """
-    Detailed health check with component status
-    """
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow(),
-        "service": "E-commerce Customer Support Chatbot API",
-        "version": "1.0.0",
-        "components": {
-            "api": "healthy",
-            "chatbot": "healthy",
-            "database": "healthy",
-            "cache": "healthy"
-        },
-        "uptime": "00:00:00",  # In real implementation, calculate actual uptime
-        "memory_usage": "45MB",  # In real implementation, get actual memory usage
-        "cpu_usage": "2.5%"  # In real implementation, get actual CPU usage
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from datetime import datetime
+
+from app.services.service_manager import service_manager
+
+router = APIRouter()
+
+@router.get("/health")
+@router.get("/health/live")
+async def health_check():
+    """
+    Liveness check - the process is up and serving requests, even while warming up
+    """
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow(),
+        "service": "E-commerce Customer Support Chatbot API",
+        "version": "1.0.0"
+    }
+
+@router.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness check - fails with 503 until data and trained knowledge are loaded
+    """
+    readiness = service_manager.readiness()
+    body = {
+        "status": "ready" if readiness["ready"] else "not_ready",
+        "timestamp": datetime.utcnow(),
+        **readiness
+    }
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content=jsonable_encoder(body)
+    )
+
+@router.get("/health/detailed")
+async def detailed_health_check():
+    """
+    Detailed health check with component status
+    """
+    readiness = service_manager.readiness()
+    
+    return {
+        "status": "healthy" if readiness["ready"] else "starting",
+        "timestamp": datetime.utcnow(),
+        "service": "E-commerce Customer Support Chatbot API",
+        "version": "1.0.0",
+        "components": {
+            "api": "healthy",
+            "chatbot": "healthy" if readiness["ready"] else readiness["state"],
+            "database": "healthy",
+            "cache": "healthy"
+        },
+        "uptime": "00:00:00",  # In real implementation, calculate actual uptime
+        "memory_usage": "45MB",  # In real implementation, get actual memory usage
+        "cpu_usage": "2.5%",  # In real implementation, get actual CPU usage
+        "startup": {
+            "started_at": readiness["started_at"],
+            "ready_at": readiness["ready_at"],
+            "phase_timings": readiness["phase_timings"]
+        }
     } 
\ No newline at end of file
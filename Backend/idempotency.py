@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often a request waits to re-check a key another node is still working on
+POLL_INTERVAL_SECONDS = 0.05
+
+class IdempotencyConflictError(ValueError):
+    """Raised when a key is reused with a different request body"""
+
+class IdempotencyInProgressError(RuntimeError):
+    """Raised when the first request with a key is still running after the wait deadline"""
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request body, so a key cannot be replayed for a different request"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+class IdempotencyStore(ABC):
+    """Where completed results and cross-request claims on a key are kept"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """{"state": "pending" | "done", "fingerprint": ..., "result": ...} or None"""
+
+    @abstractmethod
+    def claim(self, key: str, fingerprint: str) -> bool:
+        """Mark the key pending if nobody holds it; True if this caller now owns it"""
+
+    @abstractmethod
+    def complete(self, key: str, fingerprint: str, result: Any): ...
+
+    @abstractmethod
+    def release(self, key: str):
+        """Drop a pending claim after a failure so a retry can run again"""
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Bounded LRU of keys with a TTL; pending claims expire after lock_seconds"""
+
+    def __init__(self, ttl_seconds: float, max_keys: int, lock_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self.lock_seconds = lock_seconds
+        self._records: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._records.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._records[key]
+            return None
+        return entry[1]
+
+    def _put(self, key: str, record: Dict[str, Any], ttl: float):
+        self._records[key] = (time.monotonic() + ttl, record)
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_keys:
+            self._records.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._live(key)
+
+    def claim(self, key: str, fingerprint: str) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._put(key, {"state": "pending", "fingerprint": fingerprint}, self.lock_seconds)
+            return True
+
+    def complete(self, key: str, fingerprint: str, result: Any):
+        with self._lock:
+            self._put(key, {"state": "done", "fingerprint": fingerprint, "result": result}, self.ttl_seconds)
+
+    def release(self, key: str):
+        with self._lock:
+            self._records.pop(key, None)
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """
+    Keys in a Redis-compatible server, shared by every node. A claim is SET NX with
+    a short expiry, so a node that dies mid-request does not hold the key forever;
+    the finished result replaces it with the full TTL.
+    """
+
+    def __init__(self, client, ttl_seconds: float, lock_seconds: float, key_prefix: str = "idempotency"):
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.lock_seconds = int(lock_seconds)
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def claim(self, key: str, fingerprint: str) -> bool:
+        record = json.dumps({"state": "pending", "fingerprint": fingerprint})
+        return bool(self.client.set(self._key(key), record, ex=self.lock_seconds, nx=True))
+
+    def complete(self, key: str, fingerprint: str, result: Any):
+        record = json.dumps({"state": "done", "fingerprint": fingerprint, "result": result}, default=str)
+        self.client.set(self._key(key), record, ex=self.ttl_seconds)
+
+    def release(self, key: str):
+        self.client.delete(self._key(key))
+
+class IdempotencyCache:
+    """
+    Runs a request at most once per idempotency key.
+
+    Retries that arrive while the first request is still running in this process
+    await its future instead of running again; retries on another node poll the
+    store's pending claim until the result lands. A finished result is replayed
+    for the key's TTL. Failures are not cached.
+    """
+
+    def __init__(self, store: IdempotencyStore, wait_seconds: float):
+        self.store = store
+        self.wait_seconds = wait_seconds
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    async def run(self, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]],
+                  release_on: Tuple[type, ...] = (Exception,)) -> Tuple[Any, bool]:
+        """
+        The result for key and whether it was replayed rather than computed by this call.
+
+        A failure in release_on frees the key for an immediate retry. Any other failure
+        (say a timeout while the work may still finish) keeps the claim until it expires.
+        """
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            if in_flight[0] != fingerprint:
+                raise IdempotencyConflictError("Idempotency-Key was already used with a different request")
+            return await asyncio.shield(in_flight[1]), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Waiters see the first request's error; nobody may be waiting, so mark it retrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = (fingerprint, future)
+        try:
+            result, replayed = await self._resolve(key, fingerprint, compute, release_on)
+            future.set_result(result)
+            return result, replayed
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _resolve(self, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]],
+                       release_on: Tuple[type, ...]) -> Tuple[Any, bool]:
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            record = self.store.get(key)
+            if record is not None:
+                if record.get("fingerprint") != fingerprint:
+                    raise IdempotencyConflictError("Idempotency-Key was already used with a different request")
+                if record.get("state") == "done":
+                    return record.get("result"), True
+                if time.monotonic() >= deadline:
+                    raise IdempotencyInProgressError("A request with this Idempotency-Key is still in progress")
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                continue
+            if self.store.claim(key, fingerprint):
+                break
+
+        try:
+            result = await compute()
+        except release_on:
+            self.store.release(key)
+            raise
+        self.store.complete(key, fingerprint, result)
+        return result, False
+
+def create_idempotency_store(backend_name: str) -> IdempotencyStore:
+    if backend_name == "redis":
+        from app.core.redis_client import get_redis_client
+
+        return RedisIdempotencyStore(
+            get_redis_client(),
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS
+        )
+    if backend_name == "memory":
+        return InMemoryIdempotencyStore(
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            max_keys=settings.IDEMPOTENCY_MAX_KEYS,
+            lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS
+        )
+    raise ValueError(f"Unknown idempotency backend: {backend_name}")
+
+# Global idempotency cache instance
+_idempotency_cache: Optional[IdempotencyCache] = None
+_idempotency_cache_lock = threading.Lock()
+
+def get_idempotency_cache() -> IdempotencyCache:
+    global _idempotency_cache
+    if _idempotency_cache is None:
+        with _idempotency_cache_lock:
+            if _idempotency_cache is None:
+                _idempotency_cache = IdempotencyCache(
+                    create_idempotency_store(settings.IDEMPOTENCY_BACKEND),
+                    wait_seconds=settings.EXECUTOR_TIMEOUT_SECONDS
+                )
+    return _idempotency_cache
@@ -1,17 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
-from app.models.base import Base
-
-class InventoryItem(Base):
-    __tablename__ = 'inventory_items'
-    id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, nullable=False)
-    created_at = Column(DateTime)
-    sold_at = Column(DateTime)
-    cost = Column(Float)
-    product_category = Column(String)
-    product_name = Column(String)
-    product_brand = Column(String)
-    product_retail_price = Column(Float)
-    product_department = Column(String)
-    product_sku = Column(String)
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from app.models.base import Base
+
+class InventoryItem(Base):
+    __tablename__ = 'inventory_items'
+    # Answers "does this product have unsold stock" without touching the table
+    __table_args__ = (
+        Index('ix_inventory_items_product_id_sold_at', 'product_id', 'sold_at'),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime)
+    sold_at = Column(DateTime)
+    cost = Column(Float)
+    product_category = Column(String)
+    product_name = Column(String)
+    product_brand = Column(String)
+    product_retail_price = Column(Float)
+    product_department = Column(String)
+    product_sku = Column(String)
     product_distribution_center_id = Column(Integer, ForeignKey('distribution_centers.id')) 
\ No newline at end of file
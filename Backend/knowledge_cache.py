@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, date
+from typing import List, Dict, Any, Optional, Callable, NamedTuple, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Joins the parts of tuple keys such as (product_id, name, category)
+KEY_SEPARATOR = " | "
+
+def sanitize(value: Any) -> Any:
+    """
+    Plain JSON types for a knowledge structure: string keys (tuples joined), numpy
+    scalars unboxed, NaN and infinities as null, timestamps as ISO strings.
+    """
+    if isinstance(value, dict):
+        return {_key(key): sanitize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray, pd.Index)):
+        return [sanitize(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    return str(value)
+
+def _key(key: Any) -> str:
+    if isinstance(key, tuple):
+        return KEY_SEPARATOR.join(str(_key(part)) for part in key)
+    if isinstance(key, np.generic):
+        key = key.item()
+    return key if isinstance(key, str) else str(key)
+
+def project(payload: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Only the given dotted paths of a payload, e.g. "order_analytics.status_distribution".
+    Raises ValueError for a path that does not exist.
+    """
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        source, target = payload, projected
+        parts = field.split(".")
+        for depth, part in enumerate(parts):
+            if not isinstance(source, dict) or part not in source:
+                raise ValueError(f"Unknown field: {'.'.join(parts[:depth + 1])}")
+            source = source[part]
+            if depth < len(parts) - 1:
+                target = target.setdefault(part, {})
+        target[parts[-1]] = source
+    return projected
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+class EncodedPayload(NamedTuple):
+    body: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+    etag: str
+
+    def for_encoding(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """The smallest stored body the client accepts, with its Content-Encoding"""
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        if self.brotli is not None and "br" in accepted:
+            return self.brotli, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.body, None
+
+def encode(value: Any) -> EncodedPayload:
+    body = dumps(value)
+    return EncodedPayload(
+        body=body,
+        gzip=gzip.compress(body, compresslevel=6, mtime=0),
+        brotli=brotli.compress(body) if brotli is not None else None,
+        # Weak, since the compressed forms share it
+        etag=f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+    )
+
+class KnowledgeCache:
+    """
+    Serialized, pre-compressed training knowledge responses.
+
+    An entry is a payload name, the knowledge version it was built from and the
+    projected fields. Retraining bumps the version, so stale entries are never served
+    again and age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, EncodedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._builds = 0
+
+    def get(self, key: tuple) -> Optional[EncodedPayload]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def build(self, key: tuple, builder: Callable[[], Dict[str, Any]], fields: Optional[List[str]] = None) -> EncodedPayload:
+        """Build, project, sanitize and encode a payload, then keep it; ValueError for unknown fields"""
+        value = builder()
+        if fields:
+            value = project(value, fields)
+        payload = encode(sanitize(value))
+        with self._lock:
+            self._builds += 1
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "builds": self._builds}
+
+# Global knowledge cache instance
+_knowledge_cache: Optional[KnowledgeCache] = None
+_knowledge_cache_lock = threading.Lock()
+
+def get_knowledge_cache() -> KnowledgeCache:
+    global _knowledge_cache
+    if _knowledge_cache is None:
+        with _knowledge_cache_lock:
+            if _knowledge_cache is None:
+                _knowledge_cache = KnowledgeCache()
+    return _knowledge_cache
@@ -1,47 +1,94 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import uvicorn
-
-from app.api.routes import chat, products, orders, health, training
-from app.core.config import settings
-
-app = FastAPI(
-    title="E-commerce Customer Support Chatbot API",
-    description="A comprehensive API for customer support chatbot functionality",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include API routes
-app.include_router(health.router, prefix="/api", tags=["health"])
-app.include_router(chat.router, prefix="/api", tags=["chat"])
-app.include_router(products.router, prefix="/api", tags=["products"])
-app.include_router(orders.router, prefix="/api", tags=["orders"])
-app.include_router(training.router, prefix="/api", tags=["training"])
-
-@app.get("/")
-async def root():
-    return {
-        "message": "E-commerce Customer Support Chatbot API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
-
-if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import uvicorn
+
+from app.api.routes import chat, products, orders, health, training, streaming, sessions
+from app.core.config import settings
+from app.core.db import engine, SessionLocal
+from app.services.product_catalog import ensure_catalog_indexes
+from app.services.order_service import ensure_order_indexes
+from app.services.service_manager import service_manager
+from app.services.async_service import shutdown_executor
+from app.services.group_commit import shutdown_order_write_queue
+from app.services.stock_ledger import load_stock_ledger, shutdown_stock_ledger
+
+logger = logging.getLogger(__name__)
+
+async def warm_up_services():
+    """Build the chatbot service off the event loop so liveness checks keep answering"""
+    try:
+        await asyncio.to_thread(ensure_catalog_indexes, engine)
+    except Exception as e:
+        logger.error(f"Preparing product catalog indexes failed: {e}")
+    
+    try:
+        await asyncio.to_thread(ensure_order_indexes, engine)
+    except Exception as e:
+        logger.error(f"Preparing order indexes failed: {e}")
+    
+    try:
+        await asyncio.to_thread(load_stock_ledger, SessionLocal, settings.STOCK_FLUSH_INTERVAL_SECONDS)
+    except Exception as e:
+        logger.error(f"Loading stock ledger failed: {e}")
+    
+    try:
+        await asyncio.to_thread(service_manager.initialize)
+    except Exception as e:
+        logger.error(f"Service warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = asyncio.create_task(warm_up_services())
+    yield
+    if not warmup_task.done():
+        warmup_task.cancel()
+    shutdown_order_write_queue()
+    shutdown_stock_ledger(SessionLocal)
+    shutdown_executor()
+
+app = FastAPI(
+    title="E-commerce Customer Support Chatbot API",
+    description="A comprehensive API for customer support chatbot functionality",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Include API routes
+app.include_router(health.router, prefix="/api", tags=["health"])
+app.include_router(chat.router, prefix="/api", tags=["chat"])
+app.include_router(streaming.router, prefix="/api", tags=["chat"])
+app.include_router(sessions.router, prefix="/api", tags=["chat"])
+app.include_router(products.router, prefix="/api", tags=["products"])
+app.include_router(orders.router, prefix="/api", tags=["orders"])
+app.include_router(training.router, prefix="/api", tags=["training"])
+
+@app.get("/")
+async def root():
+    return {
+        "message": "E-commerce Customer Support Chatbot API",
+        "version": "1.0.0",
+        "docs": "/docs"
+    }
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True
     ) 
\ No newline at end of file
@@ -1,80 +1,148 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from enum import Enum
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from app.models.base import Base
-
-class OrderStatus(str, Enum):
-    PENDING = "pending"
-    CONFIRMED = "confirmed"
-    PROCESSING = "processing"
-    SHIPPED = "shipped"
-    DELIVERED = "delivered"
-    CANCELLED = "cancelled"
-    RETURNED = "returned"
-
-class PaymentStatus(str, Enum):
-    PENDING = "pending"
-    PAID = "paid"
-    FAILED = "failed"
-    REFUNDED = "refunded"
-
-class ShippingMethod(str, Enum):
-    STANDARD = "standard"
-    EXPRESS = "express"
-    NEXT_DAY = "next_day"
-
-class OrderItem(Base):
-    __tablename__ = 'order_items'
-    id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey('orders.order_id'))
-    user_id = Column(Integer, ForeignKey('users.id'))
-    product_id = Column(Integer, ForeignKey('products.id'))
-    inventory_item_id = Column(Integer, ForeignKey('inventory_items.id'))
-    status = Column(String)
-    created_at = Column(DateTime)
-    shipped_at = Column(DateTime)
-    delivered_at = Column(DateTime)
-    returned_at = Column(DateTime)
-    order = relationship('Order', back_populates='items')
-
-class ShippingAddress(BaseModel):
-    first_name: str
-    last_name: str
-    address_line1: str
-    address_line2: Optional[str] = None
-    city: str
-    state: str
-    postal_code: str
-    country: str = "US"
-    phone: Optional[str] = None
-
-class Order(Base):
-    __tablename__ = 'orders'
-    order_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('users.id'))
-    status = Column(String)
-    gender = Column(String)
-    created_at = Column(DateTime)
-    returned_at = Column(DateTime)
-    shipped_at = Column(DateTime)
-    delivered_at = Column(DateTime)
-    num_of_item = Column(Integer)
-    user = relationship('User')
-    items = relationship('OrderItem', back_populates='order')
-
-class OrderCreateRequest(BaseModel):
-    items: List[OrderItem]
-    shipping_address: ShippingAddress
-    shipping_method: ShippingMethod
-    user_id: Optional[str] = None
-    notes: Optional[str] = None
-
-class OrderUpdateRequest(BaseModel):
-    status: Optional[OrderStatus] = None
-    payment_status: Optional[PaymentStatus] = None
-    tracking_number: Optional[str] = None
-    estimated_delivery: Optional[datetime] = None
-    notes: Optional[str] = None 
\ No newline at end of file
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.models.base import Base
+
+class OrderStatus(str, Enum):
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    PROCESSING = "processing"
+    SHIPPED = "shipped"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+    RETURNED = "returned"
+
+class PaymentStatus(str, Enum):
+    PENDING = "pending"
+    PAID = "paid"
+    FAILED = "failed"
+    REFUNDED = "refunded"
+
+class ShippingMethod(str, Enum):
+    STANDARD = "standard"
+    EXPRESS = "express"
+    NEXT_DAY = "next_day"
+
+class OrderItem(Base):
+    __tablename__ = 'order_items'
+    # Eager-loading an order page's items is one range scan per order
+    __table_args__ = (
+        Index('ix_order_items_order_id', 'order_id'),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey('orders.order_id'))
+    user_id = Column(Integer, ForeignKey('users.id'))
+    product_id = Column(Integer, ForeignKey('products.id'))
+    inventory_item_id = Column(Integer, ForeignKey('inventory_items.id'))
+    status = Column(String)
+    created_at = Column(DateTime)
+    shipped_at = Column(DateTime)
+    delivered_at = Column(DateTime)
+    returned_at = Column(DateTime)
+    order = relationship('Order', back_populates='items')
+
+class ShippingAddress(BaseModel):
+    first_name: str
+    last_name: str
+    address_line1: str
+    address_line2: Optional[str] = None
+    city: str
+    state: str
+    postal_code: str
+    country: str = "US"
+    phone: Optional[str] = None
+
+class Order(Base):
+    __tablename__ = 'orders'
+    # Listings filter by user or status and page newest first by (created_at, order_id)
+    __table_args__ = (
+        Index('ix_orders_user_id_created_at_order_id', 'user_id', 'created_at', 'order_id'),
+        Index('ix_orders_status_created_at_order_id', 'status', 'created_at', 'order_id'),
+        Index('ix_orders_created_at_order_id', 'created_at', 'order_id'),
+    )
+    order_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    status = Column(String)
+    gender = Column(String)
+    created_at = Column(DateTime)
+    returned_at = Column(DateTime)
+    shipped_at = Column(DateTime)
+    delivered_at = Column(DateTime)
+    num_of_item = Column(Integer)
+    user = relationship('User')
+    items = relationship('OrderItem', back_populates='order')
+
+class OrderItemOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    product_id: Optional[int] = None
+    inventory_item_id: Optional[int] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    shipped_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+    returned_at: Optional[datetime] = None
+
+class OrderOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    order_id: int
+    user_id: Optional[int] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    shipped_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+    returned_at: Optional[datetime] = None
+    num_of_item: Optional[int] = None
+    items: List[OrderItemOut] = []
+
+class OrderPage(BaseModel):
+    orders: List[OrderOut]
+    limit: int
+    next_cursor: Optional[str] = None
+
+class OrderExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class OrderItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(1, ge=1, le=100)
+
+class OrderCreateRequest(BaseModel):
+    user_id: int
+    items: List[OrderItemCreate] = Field(..., min_length=1)
+
+class OrderUpdateRequest(BaseModel):
+    status: Optional[OrderStatus] = None
+
+class OrderBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class OrderBatchResponse(BaseModel):
+    orders: List[OrderOut]
+    missing: List[int]
+
+class OrderImportTable(str, Enum):
+    ORDERS = "orders"
+    ORDER_ITEMS = "order_items"
+
+class OrderImportJobOut(BaseModel):
+    job_id: str
+    table: OrderImportTable
+    format: OrderExportFormat
+    # receiving -> writing -> completed | failed
+    state: str
+    bytes_received: int
+    rows_received: int
+    rows_written: int
+    # Rows whose ID is already in the table
+    rows_skipped: int
+    rows_rejected: int
+    errors: List[str] = []
+    started_at: datetime
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,363 @@
+import asyncio
+import codecs
+import io
+import json
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.order import Order, OrderItem, OrderImportTable, OrderExportFormat
+from app.services.async_service import get_executor
+from app.services.group_commit import get_order_write_queue
+
+logger = logging.getLogger(__name__)
+
+# Columns read from an upload per table: name -> (type, required); anything else is ignored
+IMPORT_COLUMNS = {
+    OrderImportTable.ORDERS: {
+        "order_id": ("int", True),
+        "user_id": ("int", True),
+        "status": ("str", False),
+        "gender": ("str", False),
+        "created_at": ("datetime", False),
+        "returned_at": ("datetime", False),
+        "shipped_at": ("datetime", False),
+        "delivered_at": ("datetime", False),
+        "num_of_item": ("int", False),
+    },
+    OrderImportTable.ORDER_ITEMS: {
+        "id": ("int", True),
+        "order_id": ("int", True),
+        "user_id": ("int", False),
+        "product_id": ("int", True),
+        "inventory_item_id": ("int", False),
+        "status": ("str", False),
+        "created_at": ("datetime", False),
+        "shipped_at": ("datetime", False),
+        "delivered_at": ("datetime", False),
+        "returned_at": ("datetime", False),
+    },
+}
+_MODELS = {OrderImportTable.ORDERS: Order, OrderImportTable.ORDER_ITEMS: OrderItem}
+_KEYS = {OrderImportTable.ORDERS: "order_id", OrderImportTable.ORDER_ITEMS: "id"}
+
+# Row errors kept per job; the rest are only counted
+MAX_JOB_ERRORS = 20
+# Validated chunks waiting on the writer before the upload stops reading
+MAX_CHUNKS_IN_FLIGHT = 2
+
+class ImportJob:
+    """Progress of one upload, updated from the request and the writer thread"""
+
+    def __init__(self, table: OrderImportTable, export_format: OrderExportFormat):
+        self.job_id = uuid.uuid4().hex
+        self.table = table
+        self.format = export_format
+        self.state = "receiving"
+        self.bytes_received = 0
+        self.rows_received = 0
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.rows_rejected = 0
+        self.errors: List[str] = []
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("completed", "failed")
+
+    def add_errors(self, errors: List[str]):
+        with self._lock:
+            self.errors.extend(errors[:MAX_JOB_ERRORS - len(self.errors)])
+
+    def _finish(self, state: str):
+        self.state = state
+        self.finished_at = datetime.utcnow()
+
+    def chunk_started(self, rows: int, rejected: int, skipped: int = 0):
+        with self._lock:
+            self._pending += 1
+            self.rows_received += rows
+            self.rows_rejected += rejected
+            self.rows_skipped += skipped
+
+    def chunk_done(self, future: Future):
+        try:
+            written, skipped = future.result()
+            error = None
+        except Exception as e:
+            written, skipped, error = 0, 0, e
+        with self._lock:
+            self._pending -= 1
+            self.rows_written += written
+            self.rows_skipped += skipped
+            if error is not None:
+                logger.error(f"Import {self.job_id}: writing a chunk failed: {error}")
+                if len(self.errors) < MAX_JOB_ERRORS:
+                    self.errors.append(f"Writing a chunk failed: {error}")
+            if self.state == "writing" and self._pending == 0:
+                self._finish("completed")
+
+    def upload_done(self):
+        with self._lock:
+            if self._pending == 0:
+                self._finish("completed")
+            else:
+                self.state = "writing"
+
+    def fail(self, error: str):
+        with self._lock:
+            if len(self.errors) < MAX_JOB_ERRORS:
+                self.errors.append(error)
+            self._finish("failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "table": self.table,
+                "format": self.format,
+                "state": self.state,
+                "bytes_received": self.bytes_received,
+                "rows_received": self.rows_received,
+                "rows_written": self.rows_written,
+                "rows_skipped": self.rows_skipped,
+                "rows_rejected": self.rows_rejected,
+                "errors": list(self.errors),
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+class ImportJobRegistry:
+    """The most recent jobs by ID; the oldest finished ones are forgotten first"""
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, table: OrderImportTable, export_format: OrderExportFormat) -> ImportJob:
+        job = ImportJob(table, export_format)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            for job_id in [job_id for job_id, old in self._jobs.items() if old.finished][:max(0, len(self._jobs) - self.max_jobs)]:
+                del self._jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+class RowSplitter:
+    """
+    Cuts a byte stream into chunks of whole rows as it arrives.
+
+    Only the current partial line and the rows of the chunk being filled are held.
+    CSV chunks each repeat the header, and a quoted field may span lines.
+    """
+
+    def __init__(self, export_format: OrderExportFormat, chunk_rows: int):
+        self.format = export_format
+        self.chunk_rows = chunk_rows
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._tail = ""
+        self._record: List[str] = []
+        self._quoted = False
+        self._header: Optional[str] = None
+        self._rows: List[str] = []
+
+    def _add_line(self, line: str) -> Optional[str]:
+        line = line.rstrip("\r")
+        if self.format == OrderExportFormat.CSV:
+            self._record.append(line)
+            # An odd number of quotes leaves a field open onto the next line
+            self._quoted ^= line.count('"') % 2 == 1
+            if self._quoted:
+                return None
+            line = "\n".join(self._record)
+            self._record = []
+            if self._header is None:
+                self._header = line
+                return None
+        if not line.strip():
+            return None
+        self._rows.append(line)
+        return self._take() if len(self._rows) >= self.chunk_rows else None
+
+    def _take(self) -> Optional[str]:
+        if not self._rows:
+            return None
+        rows, self._rows = self._rows, []
+        if self.format == OrderExportFormat.CSV:
+            rows.insert(0, self._header)
+        return "\n".join(rows)
+
+    def feed(self, data: bytes) -> List[str]:
+        """Chunks completed by this piece of the body"""
+        lines = (self._tail + self._decoder.decode(data)).split("\n")
+        self._tail = lines.pop()
+        return [chunk for chunk in map(self._add_line, lines) if chunk is not None]
+
+    def close(self) -> List[str]:
+        """Whatever is left once the body has ended"""
+        chunks = [self._add_line(self._tail + self._decoder.decode(b"", final=True))]
+        self._tail = ""
+        if self._record:
+            # An unterminated quote: hand the rest to the parser to reject
+            self._rows.append("\n".join(self._record))
+            self._record = []
+        chunks.append(self._take())
+        return [chunk for chunk in chunks if chunk is not None]
+
+def _parse_chunk(text: str, export_format: OrderExportFormat) -> Tuple[pd.DataFrame, Dict[int, str]]:
+    """The chunk's rows, and why each unparseable one failed by its position in the chunk"""
+    if export_format == OrderExportFormat.CSV:
+        return pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=True, skipinitialspace=True), {}
+
+    records, errors = [], {}
+    for offset, line in enumerate(text.split("\n")):
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("not a JSON object")
+            records.append(record)
+        except ValueError as e:
+            # Kept as an empty row so it is counted and rejected with the rest
+            records.append({})
+            errors[offset] = str(e)
+    return pd.DataFrame.from_records(records), errors
+
+def prepare_chunk(text: str, table: OrderImportTable, export_format: OrderExportFormat,
+                  first_row: int) -> Tuple[List[Dict[str, Any]], int, int, int, List[str]]:
+    """
+    Parse a chunk and coerce its columns to the table's types a column at a time.
+
+    Returns the valid rows as insert parameters, the number of rows read, the number
+    rejected, the number skipped as repeats of a later row's ID, and the first few
+    row errors. Rows are numbered from 1 across the upload.
+    """
+    frame, parse_errors = _parse_chunk(text, export_format)
+    frame = frame.reset_index(drop=True)
+    rows = len(frame)
+    invalid = np.zeros(rows, dtype=bool)
+    problems: Dict[str, np.ndarray] = {}
+    columns: Dict[str, pd.Series] = {}
+
+    for column, (kind, required) in IMPORT_COLUMNS[table].items():
+        raw = frame[column] if column in frame.columns else pd.Series([None] * rows, dtype=object)
+        present = raw.notna() & (raw.astype(str).str.strip() != "")
+        raw = raw.where(present)
+        if kind == "int":
+            value = pd.to_numeric(raw, errors="coerce")
+            bad = present & (value.isna() | (value.round() != value))
+            value = value.where(~bad).astype("Int64")
+        elif kind == "datetime":
+            # Stored as naive UTC, like the timestamps the service writes
+            value = pd.to_datetime(raw, errors="coerce", utc=True, format="mixed").dt.tz_localize(None)
+            bad = present & value.isna()
+        else:
+            value = raw.astype(str).str.strip().where(present)
+            bad = pd.Series(False, index=raw.index)
+        if required:
+            bad = bad | ~present
+        columns[column] = value
+        if bad.any():
+            problems[column] = bad.to_numpy()
+            invalid |= problems[column]
+
+    # An unparseable row is reported once, with its parse error rather than its empty columns
+    messages = {row: f"Row {first_row + row}: {error}" for row, error in parse_errors.items()}
+    for row in np.flatnonzero(invalid)[:MAX_JOB_ERRORS]:
+        row = int(row)
+        if row not in messages:
+            failed = [column for column, bad in problems.items() if bad[row]]
+            messages[row] = f"Row {first_row + row}: missing or invalid {', '.join(failed)}"
+    errors = [messages[row] for row in sorted(messages)[:MAX_JOB_ERRORS]]
+
+    valid = pd.DataFrame(columns)[~invalid]
+    # The last copy of an ID within the chunk wins; earlier copies count as skipped
+    unique = valid.drop_duplicates(subset=[_KEYS[table]], keep="last")
+    duplicates = len(valid) - len(unique)
+    values = [unique[column].astype(object).where(unique[column].notna(), None).tolist() for column in unique.columns]
+    records = [dict(zip(unique.columns, row)) for row in zip(*values)]
+    return records, rows, int(invalid.sum()), duplicates, errors
+
+def insert_rows(db: Session, table: OrderImportTable, records: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Bulk insert the rows whose IDs are not in the table yet; returns (written, skipped)"""
+    if not records:
+        return 0, 0
+    model = _MODELS[table]
+    key = getattr(model, _KEYS[table])
+    existing = set(db.scalars(select(key).where(key.in_([record[_KEYS[table]] for record in records]))))
+    new = [record for record in records if record[_KEYS[table]] not in existing]
+    if new:
+        db.execute(insert(model), new)
+    return len(new), len(records) - len(new)
+
+class OrderImporter:
+    """
+    Feeds one upload through validation and the order write queue.
+
+    Each chunk of rows is coerced on the worker pool and handed to the group-commit
+    writer as one bulk insert. At most MAX_CHUNKS_IN_FLIGHT chunks wait on the writer;
+    beyond that the upload is not read further, so memory stays bounded by the chunk
+    size however large the body is.
+    """
+
+    def __init__(self, job: ImportJob, chunk_rows: int):
+        self.job = job
+        self._splitter = RowSplitter(job.format, chunk_rows)
+        self._in_flight: deque = deque()
+        self._next_row = 1
+
+    async def _submit(self, text: str):
+        records, rows, rejected, duplicates, errors = await get_executor().run(
+            prepare_chunk, text, self.job.table, self.job.format, self._next_row
+        )
+        self._next_row += rows
+        self.job.add_errors(errors)
+
+        while len(self._in_flight) >= MAX_CHUNKS_IN_FLIGHT:
+            await asyncio.wait([asyncio.wrap_future(self._in_flight.popleft())])
+
+        table = self.job.table
+        future = get_order_write_queue().submit(lambda session: insert_rows(session, table, records))
+        self.job.chunk_started(rows, rejected, duplicates)
+        future.add_done_callback(self.job.chunk_done)
+        self._in_flight.append(future)
+
+    async def feed(self, data: bytes):
+        self.job.bytes_received += len(data)
+        for chunk in self._splitter.feed(data):
+            await self._submit(chunk)
+
+    async def finish(self):
+        """The body has ended; the job completes once the writer has the last chunk committed"""
+        for chunk in self._splitter.close():
+            await self._submit(chunk)
+        self.job.upload_done()
+
+# Global import job registry
+_import_jobs: Optional[ImportJobRegistry] = None
+_import_jobs_lock = threading.Lock()
+
+def get_import_jobs() -> ImportJobRegistry:
+    global _import_jobs
+    if _import_jobs is None:
+        with _import_jobs_lock:
+            if _import_jobs is None:
+                _import_jobs = ImportJobRegistry(settings.ORDER_IMPORT_MAX_JOBS)
+    return _import_jobs
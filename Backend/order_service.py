@@ -0,0 +1,235 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+import logging
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.models.base import Base
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.models.user import User
+from app.services import product_catalog  # noqa: F401 (registers the catalog tables order items reference)
+
+logger = logging.getLogger(__name__)
+
+# Statuses that set the matching timestamp on the order and its items
+_STATUS_TIMESTAMPS = {
+    OrderStatus.SHIPPED: "shipped_at",
+    OrderStatus.DELIVERED: "delivered_at",
+    OrderStatus.RETURNED: "returned_at",
+}
+
+# Orders that can no longer be cancelled (the loaded data uses capitalized statuses)
+_FINAL_STATUSES = {"shipped", "delivered", "complete", "returned", "cancelled"}
+# Orders only move forward through these; cancelled is terminal
+_STATUS_ORDER = {"pending": 0, "confirmed": 1, "processing": 2, "shipped": 3, "delivered": 4, "complete": 4, "returned": 5}
+
+def ensure_order_indexes(engine):
+    """Create the order tables and their listing indexes if missing"""
+    Base.metadata.create_all(bind=engine, tables=[User.__table__, Order.__table__, OrderItem.__table__])
+    for index in list(Order.__table__.indexes) + list(OrderItem.__table__.indexes):
+        index.create(bind=engine, checkfirst=True)
+    logger.info("Order indexes ready")
+
+# Stored spellings of each status, so filters stay case-insensitive without defeating the index
+_status_cache: Optional[Tuple[float, Dict[str, List[str]]]] = None
+_status_lock = threading.Lock()
+_STATUS_TTL_SECONDS = 300
+
+def stored_statuses(db: Session, status: str) -> List[str]:
+    """Every stored spelling of a status (e.g. ["Shipped", "shipped"]), or [status] if unseen"""
+    global _status_cache
+    with _status_lock:
+        cached = _status_cache
+    if cached is None or time.monotonic() - cached[0] >= _STATUS_TTL_SECONDS:
+        values: Dict[str, List[str]] = {}
+        # Sorted so capitalized spellings, as in the loaded data, come first
+        for value in sorted(v for v in db.scalars(select(Order.status).distinct()) if v):
+            values.setdefault(value.lower(), []).append(value)
+        cached = (time.monotonic(), values)
+        with _status_lock:
+            _status_cache = cached
+    return cached[1].get(status.lower(), [status])
+
+def stored_status(db: Session, status: str) -> str:
+    """The spelling writes use: the stored one (e.g. "Shipped" for "shipped"), or status itself if unseen"""
+    return stored_statuses(db, status)[0]
+
+def _with_items(stmt):
+    # One extra IN query for every order's items, however many orders the page holds
+    return stmt.options(selectinload(Order.items))
+
+def encode_order_cursor(order: Order) -> str:
+    """Opaque cursor holding the (created_at, order_id) of the last order served"""
+    payload = json.dumps({"c": order.created_at.isoformat(), "i": order.order_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_order_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Cursor position; raises ValueError if it is malformed"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+def _listing(db: Session, user_id: Optional[int], status: Optional[str]):
+    # Orders without a creation time have no place in a newest-first ordering
+    stmt = select(Order).where(Order.created_at.isnot(None))
+    if user_id is not None:
+        stmt = stmt.where(Order.user_id == user_id)
+    if status:
+        stmt = stmt.where(Order.status.in_(stored_statuses(db, status)))
+    return stmt
+
+def _page(db: Session, stmt, limit: int, position: Optional[Tuple[datetime, int]]) -> List[Order]:
+    if position is not None:
+        stmt = stmt.where(tuple_(Order.created_at, Order.order_id) < position)
+    stmt = stmt.order_by(Order.created_at.desc(), Order.order_id.desc()).limit(limit)
+    return list(db.scalars(_with_items(stmt)))
+
+def list_orders(db: Session, user_id: Optional[int] = None, status: Optional[str] = None,
+                limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    One page of orders, newest first, optionally for one user and/or status.
+
+    The cursor is the last order's (created_at, order_id), so every page is an index
+    seek however deep into a long history it is.
+    """
+    position = decode_order_cursor(cursor) if cursor else None
+    orders = _page(db, _listing(db, user_id, status), limit + 1, position)
+    next_cursor = encode_order_cursor(orders[limit - 1]) if len(orders) > limit else None
+    return {"orders": orders[:limit], "limit": limit, "next_cursor": next_cursor}
+
+def iter_orders(db: Session, user_id: Optional[int] = None, status: Optional[str] = None,
+                chunk_size: Optional[int] = None) -> Iterator[List[Order]]:
+    """Every matching order, newest first, in chunks; only one chunk is held in memory at a time"""
+    chunk_size = chunk_size or settings.ORDER_EXPORT_CHUNK_SIZE
+    stmt = _listing(db, user_id, status)
+    position = None
+    while True:
+        orders = _page(db, stmt, chunk_size, position)
+        if not orders:
+            return
+        yield orders
+        if len(orders) < chunk_size:
+            return
+        position = (orders[-1].created_at, orders[-1].order_id)
+        # Let the served chunk be garbage collected instead of accumulating in the identity map
+        db.expunge_all()
+
+def get_order(db: Session, order_id: int) -> Optional[Order]:
+    return db.scalars(_with_items(select(Order).where(Order.order_id == order_id))).first()
+
+def get_orders_by_ids(db: Session, ids: List[int]) -> Dict[str, Any]:
+    """Orders for ids in request order, fetched with one primary-key IN query"""
+    wanted = list(dict.fromkeys(ids))
+    found = {order.order_id: order for order in db.scalars(_with_items(select(Order).where(Order.order_id.in_(wanted))))}
+    return {
+        "orders": [found[order_id] for order_id in wanted if order_id in found],
+        "missing": [order_id for order_id in wanted if order_id not in found]
+    }
+
+def order_summaries(db: Session, order_ids: List[int]) -> Dict[str, Dict[str, Any]]:
+    """
+    Status, owner and items of the orders found, keyed by order ID string as the chat
+    reports them, with one query for the orders and their customers and one for the items
+    """
+    stmt = select(Order).where(Order.order_id.in_(set(order_ids))).options(selectinload(Order.user))
+    orders = list(db.scalars(stmt))
+    items: Dict[int, List[Dict[str, Any]]] = {order.order_id: [] for order in orders}
+    if items:
+        rows = db.execute(
+            select(OrderItem.order_id, Product.name, Product.retail_price, OrderItem.status)
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(OrderItem.order_id.in_(items.keys()))
+        )
+        for order_id, name, retail_price, status in rows:
+            items[order_id].append({"name": name, "retail_price": retail_price or 0.0, "status": status})
+    return {
+        str(order.order_id): {
+            "order_id": str(order.order_id),
+            "status": order.status,
+            "user_id": str(order.user_id),
+            "user_name": f"{order.user.first_name} {order.user.last_name}" if order.user is not None else "Unknown",
+            "created_at": order.created_at,
+            "shipped_at": order.shipped_at,
+            "delivered_at": order.delivered_at,
+            "returned_at": order.returned_at,
+            "num_of_items": order.num_of_item,
+            "items": items[order.order_id],
+            "total_amount": sum(item["retail_price"] for item in items[order.order_id])
+        }
+        for order in orders
+    }
+
+def price_items(db: Session, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    The items to be placed with their unit prices, for callers that keep sales
+    figures current. Raises ValueError for unknown products.
+    """
+    product_ids = {int(item["product_id"]) for item in items}
+    prices = dict(db.execute(select(Product.id, Product.retail_price).where(Product.id.in_(product_ids))).all())
+    unknown = sorted(product_ids - prices.keys())
+    if unknown:
+        raise ValueError(f"Unknown product IDs: {unknown}")
+    return [
+        {"product_id": int(item["product_id"]), "quantity": int(item["quantity"]), "unit_price": prices[int(item["product_id"])]}
+        for item in items
+    ]
+
+# The writes below leave committing to the caller, so several can share one commit
+
+def insert_order(db: Session, user_id: int, items: List[Dict[str, Any]]) -> Order:
+    """Add an order with one order_items row per unit, as in the loaded data"""
+    now = datetime.utcnow()
+    status = stored_status(db, OrderStatus.PENDING.value)
+    order = Order(user_id=user_id, status=status, created_at=now, num_of_item=sum(int(item["quantity"]) for item in items))
+    for item in items:
+        for _ in range(int(item["quantity"])):
+            order.items.append(OrderItem(user_id=user_id, product_id=int(item["product_id"]), status=status, created_at=now))
+    db.add(order)
+    db.flush()
+    return order
+
+def _set_status(db: Session, order: Order, status: OrderStatus) -> Order:
+    timestamp_column = _STATUS_TIMESTAMPS.get(status)
+    now = datetime.utcnow()
+    # Written in the spelling already stored, so status filters see one value per status
+    value = stored_status(db, status.value)
+    for row in [order] + list(order.items):
+        row.status = value
+        if timestamp_column:
+            setattr(row, timestamp_column, now)
+    return order
+
+def update_order_status(db: Session, order_id: int, status: OrderStatus) -> Optional[Order]:
+    """
+    Set an order's status on it and its items, stamping shipped/delivered/returned
+    times. Raises ValueError unless the status moves the order forward, so every
+    successful call is a real transition.
+    """
+    if status == OrderStatus.CANCELLED:
+        return cancel_order(db, order_id)
+    order = get_order(db, order_id)
+    if order is None:
+        return None
+    current = (order.status or "").lower()
+    if current == OrderStatus.CANCELLED.value or _STATUS_ORDER[status.value] <= _STATUS_ORDER.get(current, -1):
+        raise ValueError(f"Cannot mark an order that is {current} as {status.value}")
+    return _set_status(db, order, status)
+
+def cancel_order(db: Session, order_id: int) -> Optional[Order]:
+    """Cancel an order; raises ValueError once it has shipped or otherwise finished"""
+    order = get_order(db, order_id)
+    if order is None:
+        return None
+    if (order.status or "").lower() in _FINAL_STATUSES:
+        raise ValueError(f"Cannot cancel an order that is {order.status.lower()}")
+    return _set_status(db, order, OrderStatus.CANCELLED)
@@ -1,268 +1,424 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
-from datetime import datetime, timedelta
-import uuid
-
-from app.models.order import Order, OrderCreateRequest, OrderUpdateRequest, OrderStatus, PaymentStatus, ShippingMethod
-
-router = APIRouter()
-
-# Mock order data - in real implementation, this would come from database
-MOCK_ORDERS = [
-    Order(
-        id="ORD-001",
-        user_id="user123",
-        items=[
-            {
-                "product_id": "1",
-                "product_name": "Classic White T-Shirt",
-                "quantity": 2,
-                "unit_price": 29.99,
-                "total_price": 59.98,
-                "size": "M",
-                "color": "white"
-            }
-        ],
-        total_amount=59.98,
-        shipping_address={
-            "first_name": "John",
-            "last_name": "Doe",
-            "address_line1": "123 Main St",
-            "city": "New York",
-            "state": "NY",
-            "postal_code": "10001",
-            "country": "US"
-        },
-        shipping_method=ShippingMethod.STANDARD,
-        shipping_cost=0.0,
-        tax_amount=5.99,
-        discount_amount=0.0,
-        final_amount=65.97,
-        status=OrderStatus.SHIPPED,
-        payment_status=PaymentStatus.PAID,
-        tracking_number="1Z999AA1234567890",
-        estimated_delivery=datetime.utcnow() + timedelta(days=3),
-        created_at=datetime.utcnow() - timedelta(days=5),
-        updated_at=datetime.utcnow() - timedelta(days=2)
-    ),
-    Order(
-        id="ORD-002",
-        user_id="user123",
-        items=[
-            {
-                "product_id": "2",
-                "product_name": "Slim Fit Jeans",
-                "quantity": 1,
-                "unit_price": 79.99,
-                "total_price": 79.99,
-                "size": "L",
-                "color": "blue"
-            }
-        ],
-        total_amount=79.99,
-        shipping_address={
-            "first_name": "John",
-            "last_name": "Doe",
-            "address_line1": "123 Main St",
-            "city": "New York",
-            "state": "NY",
-            "postal_code": "10001",
-            "country": "US"
-        },
-        shipping_method=ShippingMethod.EXPRESS,
-        shipping_cost=15.99,
-        tax_amount=7.99,
-        discount_amount=10.0,
-        final_amount=93.97,
-        status=OrderStatus.PROCESSING,
-        payment_status=PaymentStatus.PAID,
-        tracking_number=None,
-        estimated_delivery=datetime.utcnow() + timedelta(days=1),
-        created_at=datetime.utcnow() - timedelta(days=1),
-        updated_at=datetime.utcnow()
-    )
-]
-
-@router.get("/orders", response_model=List[Order])
-async def get_orders(user_id: Optional[str] = None, status: Optional[OrderStatus] = None):
-    """
-    Get orders with optional filtering by user ID and status
-    """
-    try:
-        filtered_orders = MOCK_ORDERS.copy()
-        
-        if user_id:
-            filtered_orders = [o for o in filtered_orders if o.user_id == user_id]
-        
-        if status:
-            filtered_orders = [o for o in filtered_orders if o.status == status]
-        
-        return filtered_orders
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching orders: {str(e)}")
-
-@router.get("/orders/{order_id}", response_model=Order)
-async def get_order(order_id: str):
-    """
-    Get a specific order by ID
-    """
-    try:
-        order = next((o for o in MOCK_ORDERS if o.id == order_id), None)
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
-        return order
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching order: {str(e)}")
-
-@router.post("/orders", response_model=Order)
-async def create_order(request: OrderCreateRequest):
-    """
-    Create a new order
-    """
-    try:
-        # Calculate totals
-        total_amount = sum(item["total_price"] for item in request.items)
-        
-        # Calculate shipping cost based on method
-        shipping_costs = {
-            ShippingMethod.STANDARD: 0.0 if total_amount >= 50 else 5.99,
-            ShippingMethod.EXPRESS: 15.99,
-            ShippingMethod.NEXT_DAY: 25.99
-        }
-        shipping_cost = shipping_costs.get(request.shipping_method, 0.0)
-        
-        # Calculate tax (simplified)
-        tax_amount = total_amount * 0.08  # 8% tax
-        
-        # Calculate final amount
-        final_amount = total_amount + shipping_cost + tax_amount - request.discount_amount if hasattr(request, 'discount_amount') else 0.0
-        
-        # Create order
-        order = Order(
-            id=f"ORD-{uuid.uuid4().hex[:8].upper()}",
-            user_id=request.user_id,
-            items=request.items,
-            total_amount=total_amount,
-            shipping_address=request.shipping_address,
-            shipping_method=request.shipping_method,
-            shipping_cost=shipping_cost,
-            tax_amount=tax_amount,
-            discount_amount=getattr(request, 'discount_amount', 0.0),
-            final_amount=final_amount,
-            status=OrderStatus.PENDING,
-            payment_status=PaymentStatus.PENDING,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-            notes=request.notes
-        )
-        
-        # In real implementation, save to database
-        MOCK_ORDERS.append(order)
-        
-        return order
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating order: {str(e)}")
-
-@router.put("/orders/{order_id}", response_model=Order)
-async def update_order(order_id: str, request: OrderUpdateRequest):
-    """
-    Update an existing order
-    """
-    try:
-        order = next((o for o in MOCK_ORDERS if o.id == order_id), None)
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
-        
-        # Update fields if provided
-        if request.status is not None:
-            order.status = request.status
-        if request.payment_status is not None:
-            order.payment_status = request.payment_status
-        if request.tracking_number is not None:
-            order.tracking_number = request.tracking_number
-        if request.estimated_delivery is not None:
-            order.estimated_delivery = request.estimated_delivery
-        if request.notes is not None:
-            order.notes = request.notes
-        
-        order.updated_at = datetime.utcnow()
-        
-        return order
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating order: {str(e)}")
-
-@router.delete("/orders/{order_id}")
-async def cancel_order(order_id: str):
-    """
-    Cancel an order
-    """
-    try:
-        order = next((o for o in MOCK_ORDERS if o.id == order_id), None)
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
-        
-        if order.status in [OrderStatus.SHIPPED, OrderStatus.DELIVERED]:
-            raise HTTPException(status_code=400, detail="Cannot cancel shipped or delivered orders")
-        
-        order.status = OrderStatus.CANCELLED
-        order.updated_at = datetime.utcnow()
-        
-        return {"message": "Order cancelled successfully", "order_id": order_id}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error cancelling order: {str(e)}")
-
-@router.get("/orders/{order_id}/tracking")
-async def get_order_tracking(order_id: str):
-    """
-    Get tracking information for an order
-    """
-    try:
-        order = next((o for o in MOCK_ORDERS if o.id == order_id), None)
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
-        
-        if not order.tracking_number:
-            return {
-                "order_id": order_id,
-                "status": order.status,
-                "tracking_number": None,
-                "message": "Tracking information not available yet"
-            }
-        
-        # Mock tracking information
-        tracking_info = {
-            "order_id": order_id,
-            "tracking_number": order.tracking_number,
-            "status": order.status,
-            "estimated_delivery": order.estimated_delivery,
-            "shipping_method": order.shipping_method,
-            "tracking_events": [
-                {
-                    "timestamp": order.created_at,
-                    "status": "Order placed",
-                    "location": "Online"
-                },
-                {
-                    "timestamp": order.created_at + timedelta(hours=2),
-                    "status": "Order confirmed",
-                    "location": "Warehouse"
-                },
-                {
-                    "timestamp": order.updated_at,
-                    "status": "Shipped",
-                    "location": "Distribution Center"
-                }
-            ]
-        }
-        
-        return tracking_info
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching tracking info: {str(e)}") 
\ No newline at end of file
+from fastapi import APIRouter, HTTPException, Query, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Dict, Any, Iterator, AsyncIterator
+from datetime import datetime
+import csv
+import io
+import json
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.order import (
+    OrderOut, OrderPage, OrderExportFormat, OrderCreateRequest, OrderUpdateRequest, OrderBatchRequest, OrderBatchResponse,
+    OrderStatus, OrderImportTable, OrderImportJobOut
+)
+from app.services import order_service
+from app.services.tracking_service import EVENT_LABELS
+from app.services.event_bus import get_event_bus, order_topics, publish_order_event
+from app.services.idempotency import (
+    get_idempotency_cache, request_fingerprint, IdempotencyConflictError, IdempotencyInProgressError
+)
+from app.services.group_commit import get_order_write_queue, WriteQueueFullError
+from app.services.order_import import OrderImporter, get_import_jobs
+from app.services.stock_ledger import get_stock_ledger, InsufficientStockError
+from app.services.async_service import get_executor, ExecutorSaturatedError, ExecutorTimeoutError
+from app.services.service_manager import service_manager
+from app.api.deps import get_db, executor_http_exception
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Order columns written by the CSV export; item details are only in the NDJSON form
+EXPORT_CSV_COLUMNS = ["order_id", "user_id", "status", "created_at", "shipped_at", "delivered_at", "returned_at", "num_of_item"]
+
+# Each helper runs on the executor and serializes there, so no lazy load ever touches the event loop
+
+def _list_orders(db: Session, user_id: Optional[int], status: Optional[str], limit: int, cursor: Optional[str]) -> OrderPage:
+    return OrderPage.model_validate(order_service.list_orders(db, user_id, status, limit, cursor))
+
+def _get_order(db: Session, order_id: int) -> Optional[OrderOut]:
+    order = order_service.get_order(db, order_id)
+    return OrderOut.model_validate(order) if order is not None else None
+
+def _get_orders_by_ids(db: Session, ids: List[int]) -> OrderBatchResponse:
+    return OrderBatchResponse.model_validate(order_service.get_orders_by_ids(db, ids))
+
+def _record_status_change(order, event: str, timestamp: datetime):
+    """Fold a status change into the tracking timelines and push it to subscribers"""
+    if event in EVENT_LABELS and service_manager.is_ready:
+        service_manager.get_chatbot_service().data_service.record_order_event(
+            order.order_id, event, timestamp, [item.id for item in order.items]
+        )
+    publish_order_event(order.order_id, order.user_id, order.status, event, timestamp)
+
+def _price_items(db: Session, request: OrderCreateRequest) -> List[Dict[str, Any]]:
+    try:
+        return order_service.price_items(db, [item.model_dump() for item in request.items])
+    finally:
+        # Hand the connection back before waiting on the writer, which draws from the same pool
+        db.rollback()
+
+# Writes go through the group-commit queue and return once their batch is committed
+
+def _restock(order: OrderOut):
+    ledger = get_stock_ledger()
+    if ledger is not None:
+        ledger.cancel(order.order_id, [{"product_id": item.product_id} for item in order.items])
+
+def _settle_reservation(ledger, allocations):
+    """
+    Done callback for an order's write: hold its units under the new order ID, or put
+    them back if the write failed or was dropped. It also fires for writes that
+    finish after the request timed out, so no reservation is left unaccounted for.
+    """
+    def settle(future):
+        if not future.cancelled() and future.exception() is None:
+            ledger.hold(future.result().order_id, allocations)
+        else:
+            ledger.release(allocations)
+    return settle
+
+async def _create_order(db: Session, request: OrderCreateRequest) -> OrderOut:
+    placed = await get_executor().run(_price_items, db, request)
+    ledger = get_stock_ledger()
+    allocations = ledger.reserve(placed) if ledger is not None else []
+    try:
+        order = await get_order_write_queue().commit(
+            lambda session: order_service.insert_order(session, request.user_id, placed),
+            OrderOut.model_validate,
+            on_done=_settle_reservation(ledger, allocations) if ledger is not None else None
+        )
+    except WriteQueueFullError:
+        # Never queued, so the done callback will not run
+        if ledger is not None:
+            ledger.release(allocations)
+        raise
+    # Keep best-seller rankings, sales rollups, tracking and delivery estimates current without a rebuild
+    if service_manager.is_ready:
+        data_service = service_manager.get_chatbot_service().data_service
+        data_service.record_order_items(placed)
+        data_service.record_order_placement(order.order_id, order.user_id, [item["product_id"] for item in placed])
+    _record_status_change(order, "placed", order.created_at)
+    return order
+
+async def _update_order(db: Session, order_id: int, status: Optional[OrderStatus]) -> Optional[OrderOut]:
+    if status is None:
+        return await get_executor().run(_get_order, db, order_id)
+    order = await get_order_write_queue().commit(
+        lambda session: order_service.update_order_status(session, order_id, status),
+        lambda order: OrderOut.model_validate(order) if order is not None else None
+    )
+    if order is not None:
+        if status == OrderStatus.CANCELLED:
+            _restock(order)
+        elif status in (OrderStatus.SHIPPED, OrderStatus.DELIVERED, OrderStatus.RETURNED) and get_stock_ledger() is not None:
+            get_stock_ledger().settle(order_id)
+        if status == OrderStatus.RETURNED and service_manager.is_ready:
+            service_manager.get_chatbot_service().data_service.record_order_returns(
+                [{"product_id": item.product_id} for item in order.items], order.returned_at or datetime.utcnow()
+            )
+        _record_status_change(order, status.value, getattr(order, f"{status.value}_at", None) or datetime.utcnow())
+    return order
+
+async def _cancel_order(order_id: int) -> bool:
+    order = await get_order_write_queue().commit(
+        lambda session: order_service.cancel_order(session, order_id),
+        lambda order: OrderOut.model_validate(order) if order is not None else None
+    )
+    if order is None:
+        return False
+    _restock(order)
+    _record_status_change(order, "cancelled", datetime.utcnow())
+    return True
+
+def _get_tracking(db: Session, order_id: int) -> Optional[Dict[str, Any]]:
+    """Tracking from the precomputed timelines, falling back to the order's own timestamps"""
+    events = None
+    data_service = service_manager.get_chatbot_service().data_service if service_manager.is_ready else None
+    if data_service is not None:
+        events = data_service.get_order_timeline(order_id)
+
+    order = order_service.get_order(db, order_id)
+    if order is None and events is None:
+        return None
+    if events is None:
+        milestones = [
+            (order.created_at, "placed"),
+            (order.shipped_at, "shipped"),
+            (order.delivered_at, "delivered"),
+            (order.returned_at, "returned"),
+        ]
+        events = [
+            {"timestamp": timestamp, "event": event, "status": EVENT_LABELS[event], "item_ids": []}
+            for timestamp, event in milestones if timestamp is not None
+        ]
+    estimate = None
+    if data_service is not None and (order is None or order.status != OrderStatus.CANCELLED.value):
+        estimate = data_service.get_delivery_estimate(order_id, events)
+    return {
+        "order_id": order_id,
+        "status": order.status if order is not None else events[-1]["event"],
+        "tracking_events": events,
+        "delivery_estimate": estimate
+    }
+
+def _export_lines(user_id: Optional[int], status: Optional[str], export_format: OrderExportFormat) -> Iterator[str]:
+    """Export lines written chunk by chunk as orders are read, so memory stays flat for any history size"""
+    # The request's session is closed once the response starts, so the export holds its own
+    db = SessionLocal()
+    try:
+        if export_format == OrderExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_CSV_COLUMNS)
+            for orders in order_service.iter_orders(db, user_id, status):
+                for order in orders:
+                    writer.writerow([getattr(order, column) for column in EXPORT_CSV_COLUMNS])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for orders in order_service.iter_orders(db, user_id, status):
+                yield "".join(OrderOut.model_validate(order).model_dump_json() + "\n" for order in orders)
+    except Exception as e:
+        # Headers are already sent, so the best we can do is log and end the stream early
+        logger.error(f"Order export failed: {e}")
+        raise
+    finally:
+        db.close()
+
+@router.get("/orders", response_model=OrderPage)
+async def get_orders(
+    user_id: Optional[int] = Query(None, description="Only this user's orders"),
+    status: Optional[str] = Query(None, description="Only orders with this status"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500, description="Orders per page, newest first"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get orders with optional filtering by user ID and status and cursor pagination
+    """
+    try:
+        return await get_executor().run(_list_orders, db, user_id, status, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching orders: {str(e)}")
+
+@router.get("/orders/export")
+async def export_orders(
+    user_id: Optional[int] = Query(None, description="Only this user's orders"),
+    status: Optional[str] = Query(None, description="Only orders with this status"),
+    format: OrderExportFormat = Query(OrderExportFormat.NDJSON, description="ndjson (with items) or csv")
+):
+    """
+    Stream every matching order, newest first, as NDJSON or CSV
+    """
+    if format == OrderExportFormat.CSV:
+        return StreamingResponse(
+            _export_lines(user_id, status, format),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="orders.csv"'}
+        )
+    return StreamingResponse(_export_lines(user_id, status, format), media_type="application/x-ndjson")
+
+@router.post("/orders/imports", response_model=OrderImportJobOut, status_code=202)
+async def import_orders(
+    request: Request,
+    table: OrderImportTable = Query(..., description="orders or order_items"),
+    format: OrderExportFormat = Query(OrderExportFormat.NDJSON, description="ndjson or csv (with a header row)")
+):
+    """
+    Bulk import orders or order items from a streamed CSV or NDJSON body; rows whose ID
+    already exists are skipped. Answers once the body is read, while the last chunks may
+    still be writing; poll the job for progress.
+    """
+    job = get_import_jobs().create(table, format)
+    importer = OrderImporter(job, settings.ORDER_IMPORT_CHUNK_ROWS)
+    try:
+        async for data in request.stream():
+            await importer.feed(data)
+        await importer.finish()
+        return job.to_dict()
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        job.fail(str(e))
+        raise executor_http_exception(e)
+    except Exception as e:
+        job.fail(str(e))
+        raise HTTPException(status_code=500, detail=f"Error importing orders (job {job.job_id}): {str(e)}")
+
+@router.get("/orders/imports/{job_id}", response_model=OrderImportJobOut)
+async def get_import_job(job_id: str):
+    """
+    Progress of an order import
+    """
+    job = get_import_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
+
+@router.get("/orders/events")
+async def order_events(
+    user_id: Optional[int] = Query(None, description="Every order of this user"),
+    order_id: Optional[int] = Query(None, description="This order only")
+):
+    """
+    Server-Sent Events stream of order status changes for a user or an order
+    """
+    if user_id is None and order_id is None:
+        raise HTTPException(status_code=400, detail="Subscribe to a user_id or an order_id")
+
+    topics = ([f"user:{user_id}"] if user_id is not None else []) + (order_topics(order_id) if order_id is not None else [])
+    bus = get_event_bus()
+
+    async def generate() -> AsyncIterator[str]:
+        # Subscribe once streaming starts, so a client gone before then leaves no subscription behind
+        subscription = bus.subscribe(topics)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                event = await subscription.get(timeout=settings.EVENT_BUS_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Comment line so proxies keep the idle connection open
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/orders:batch", response_model=OrderBatchResponse)
+async def get_orders_batch(request: OrderBatchRequest, db: Session = Depends(get_db)):
+    """
+    Get up to 500 orders by ID in one call; unknown IDs are listed under missing
+    """
+    try:
+        return await get_executor().run(_get_orders_by_ids, db, request.ids)
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching orders: {str(e)}")
+
+@router.get("/orders/{order_id}", response_model=OrderOut)
+async def get_order(order_id: int, db: Session = Depends(get_db)):
+    """
+    Get a specific order by ID
+    """
+    try:
+        order = await get_executor().run(_get_order, db, order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return order
+    except HTTPException:
+        raise
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching order: {str(e)}")
+
+@router.post("/orders", response_model=OrderOut)
+async def create_order(
+    request: OrderCreateRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db)
+):
+    """
+    Create a new order; retries carrying the same Idempotency-Key get the first order back
+    """
+    try:
+        if idempotency_key is None:
+            return await _create_order(db, request)
+
+        async def compute():
+            order = await _create_order(db, request)
+            return order.model_dump(mode="json")
+
+        # Only failures that cannot have written an order free the key for an immediate retry
+        order, replayed = await get_idempotency_cache().run(
+            idempotency_key,
+            request_fingerprint(request.model_dump(mode="json")),
+            compute,
+            release_on=(ValueError, ExecutorSaturatedError)
+        )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return order
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating order: {str(e)}")
+
+@router.put("/orders/{order_id}", response_model=OrderOut)
+async def update_order(order_id: int, request: OrderUpdateRequest, db: Session = Depends(get_db)):
+    """
+    Update an existing order
+    """
+    try:
+        order = await _update_order(db, order_id, request.status)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return order
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating order: {str(e)}")
+
+@router.delete("/orders/{order_id}")
+async def cancel_order(order_id: int):
+    """
+    Cancel an order
+    """
+    try:
+        if not await _cancel_order(order_id):
+            raise HTTPException(status_code=404, detail="Order not found")
+        return {"message": "Order cancelled successfully", "order_id": order_id}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error cancelling order: {str(e)}")
+
+@router.get("/orders/{order_id}/tracking")
+async def get_order_tracking(order_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """
+    Get tracking information for an order
+    """
+    try:
+        tracking = await get_executor().run(_get_tracking, db, order_id)
+        if not tracking:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return tracking
+    except HTTPException:
+        raise
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching tracking info: {str(e)}")
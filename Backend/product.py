@@ -1,64 +1,120 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from enum import Enum
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from app.models.base import Base
-
-class ProductCategory(str, Enum):
-    SHIRTS = "shirts"
-    PANTS = "pants"
-    DRESSES = "dresses"
-    SHOES = "shoes"
-    ACCESSORIES = "accessories"
-    OUTERWEAR = "outerwear"
-
-class ProductSize(str, Enum):
-    XS = "XS"
-    S = "S"
-    M = "M"
-    L = "L"
-    XL = "XL"
-    XXL = "XXL"
-
-class ProductColor(str, Enum):
-    BLACK = "black"
-    WHITE = "white"
-    RED = "red"
-    BLUE = "blue"
-    GREEN = "green"
-    YELLOW = "yellow"
-    PINK = "pink"
-    PURPLE = "purple"
-    BROWN = "brown"
-    GRAY = "gray"
-
-class Product(Base):
-    __tablename__ = 'products'
-    id = Column(Integer, primary_key=True, index=True)
-    cost = Column(Float)
-    category = Column(String)
-    name = Column(String, nullable=False)
-    brand = Column(String)
-    retail_price = Column(Float)
-    department = Column(String)
-    sku = Column(String)
-    distribution_center_id = Column(Integer, ForeignKey('distribution_centers.id'))
-
-class ProductSearchRequest(BaseModel):
-    query: Optional[str] = None
-    category: Optional[ProductCategory] = None
-    min_price: Optional[float] = None
-    max_price: Optional[float] = None
-    colors: Optional[List[ProductColor]] = None
-    sizes: Optional[List[ProductSize]] = None
-    in_stock_only: bool = False
-    page: int = 1
-    limit: int = 20
-
-class ProductSearchResponse(BaseModel):
-    products: List[Product]
-    total: int
-    page: int
-    limit: int
-    total_pages: int 
\ No newline at end of file
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from app.models.base import Base
+
+class ProductCategory(str, Enum):
+    SHIRTS = "shirts"
+    PANTS = "pants"
+    DRESSES = "dresses"
+    SHOES = "shoes"
+    ACCESSORIES = "accessories"
+    OUTERWEAR = "outerwear"
+
+class ProductSize(str, Enum):
+    XS = "XS"
+    S = "S"
+    M = "M"
+    L = "L"
+    XL = "XL"
+    XXL = "XXL"
+
+class ProductColor(str, Enum):
+    BLACK = "black"
+    WHITE = "white"
+    RED = "red"
+    BLUE = "blue"
+    GREEN = "green"
+    YELLOW = "yellow"
+    PINK = "pink"
+    PURPLE = "purple"
+    BROWN = "brown"
+    GRAY = "gray"
+
+class ProductSort(str, Enum):
+    ID = "id"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+
+class SalesDimension(str, Enum):
+    PRODUCT = "product"
+    CATEGORY = "category"
+    BRAND = "brand"
+    DISTRIBUTION_CENTER = "distribution_center"
+
+class SalesMetric(str, Enum):
+    ORDERS = "orders"
+    ITEMS = "items"
+    REVENUE = "revenue"
+    RETURNS = "returns"
+
+class Product(Base):
+    __tablename__ = 'products'
+    # Each filter index ends in the keyset sort columns so a filtered page is one range scan
+    __table_args__ = (
+        Index('ix_products_retail_price_id', 'retail_price', 'id'),
+        Index('ix_products_category_retail_price_id', 'category', 'retail_price', 'id'),
+        Index('ix_products_brand_retail_price_id', 'brand', 'retail_price', 'id'),
+        Index('ix_products_department_retail_price_id', 'department', 'retail_price', 'id'),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    cost = Column(Float)
+    category = Column(String)
+    name = Column(String, nullable=False)
+    brand = Column(String)
+    retail_price = Column(Float)
+    department = Column(String)
+    sku = Column(String)
+    distribution_center_id = Column(Integer, ForeignKey('distribution_centers.id'))
+
+class ProductOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    brand: Optional[str] = None
+    category: Optional[str] = None
+    department: Optional[str] = None
+    retail_price: Optional[float] = None
+    sku: Optional[str] = None
+    distribution_center_id: Optional[int] = None
+
+class ProductSearchRequest(BaseModel):
+    query: Optional[str] = None
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    department: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    colors: Optional[List[ProductColor]] = None
+    in_stock_only: bool = False
+    sort: ProductSort = ProductSort.ID
+    cursor: Optional[str] = None
+    limit: int = Field(20, ge=1, le=100)
+
+class ProductSearchResponse(BaseModel):
+    products: List[ProductOut]
+    total: int
+    total_is_exact: bool
+    limit: int
+    next_cursor: Optional[str] = None 
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class ProductBatchResponse(BaseModel):
+    products: List[ProductOut]
+    missing: List[int]
+
+class StockCenterOut(BaseModel):
+    distribution_center_id: int
+    available: int
+
+class ProductAvailability(BaseModel):
+    product_id: int
+    # False when the product has no inventory rows and is not stock-controlled
+    tracked: bool
+    available: Optional[int] = None
+    distribution_centers: List[StockCenterOut] = []
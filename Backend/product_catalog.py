@@ -0,0 +1,266 @@
+import base64
+import binascii
+import json
+import re
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+from sqlalchemy import select, func, and_, or_, tuple_, text, exists, Integer
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.base import Base
+from app.models.distribution_center import DistributionCenter  # noqa: F401 (products reference it)
+from app.models.inventory_item import InventoryItem
+from app.models.product import Product, ProductSort, ProductSearchRequest
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "products_fts"
+
+# The query must repeat the indexed expression verbatim for PostgreSQL to use the GIN index
+PG_SEARCH_DOCUMENT = (
+    "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(brand, '') || ' ' "
+    "|| coalesce(category, '') || ' ' || coalesce(department, ''))"
+)
+
+# External-content FTS5 table kept in step with products by triggers
+_SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, brand, category, department, content='products', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, brand, category, department) "
+    "VALUES (new.id, new.name, new.brand, new.category, new.department); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, brand, category, department) "
+    "VALUES ('delete', old.id, old.name, old.brand, old.category, old.department); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON products BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, brand, category, department) "
+    "VALUES ('delete', old.id, old.name, old.brand, old.category, old.department); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, brand, category, department) "
+    "VALUES (new.id, new.name, new.brand, new.category, new.department); END",
+]
+
+# Full-text backend found by ensure_catalog_indexes: "fts5", "tsvector", or None for LIKE matching
+_full_text_backend: Optional[str] = None
+
+def ensure_catalog_indexes(engine) -> Optional[str]:
+    """Create the catalog tables, their filter indexes and the full-text index if missing"""
+    global _full_text_backend
+    Base.metadata.create_all(bind=engine, tables=[DistributionCenter.__table__, Product.__table__, InventoryItem.__table__])
+    for index in list(Product.__table__.indexes) + list(InventoryItem.__table__.indexes):
+        index.create(bind=engine, checkfirst=True)
+
+    backend = None
+    if engine.dialect.name == "sqlite":
+        try:
+            with engine.begin() as conn:
+                existed = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+                ).first() is not None
+                for ddl in _SQLITE_FTS_DDL:
+                    conn.exec_driver_sql(ddl)
+                if not existed:
+                    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            backend = "fts5"
+        except OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, product search falls back to LIKE: {e}")
+    elif engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_products_search ON products USING GIN ({PG_SEARCH_DOCUMENT})")
+        backend = "tsvector"
+
+    _full_text_backend = backend
+    logger.info(f"Product catalog indexes ready (full-text: {backend or 'none'})")
+    return backend
+
+def encode_cursor(sort: ProductSort, key: List[Any], total: int, total_is_exact: bool) -> str:
+    """Opaque cursor holding the last row's sort key and the count from the first page"""
+    payload = json.dumps({"s": sort.value, "k": list(key), "t": total, "e": total_is_exact}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(sort: ProductSort, cursor: str) -> Dict[str, Any]:
+    """Cursor contents; raises ValueError if it is malformed or from another sort order"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    expected = 1 if sort == ProductSort.ID else 2
+    if not isinstance(payload, dict) or not isinstance(payload.get("k"), list) or len(payload["k"]) != expected:
+        raise ValueError("Invalid cursor")
+    if payload.get("s") != sort.value:
+        raise ValueError("Cursor does not belong to this sort order")
+    return payload
+
+# Distinct values per filter column, cached briefly so filters can be matched case-insensitively
+_distinct_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_distinct_lock = threading.Lock()
+_DISTINCT_TTL_SECONDS = 300
+
+def distinct_values(db: Session, column_name: str) -> Dict[str, str]:
+    """Lowercased value -> stored value for a product column (served from its index)"""
+    with _distinct_lock:
+        cached = _distinct_cache.get(column_name)
+        if cached and time.monotonic() - cached[0] < _DISTINCT_TTL_SECONDS:
+            return cached[1]
+
+    column = getattr(Product, column_name)
+    values = {value.lower(): value for value in db.scalars(select(column).where(column.isnot(None)).distinct()) if value}
+    with _distinct_lock:
+        _distinct_cache[column_name] = (time.monotonic(), values)
+    return values
+
+def _fts_terms(query: str) -> List[str]:
+    return [f'"{token}"*' for token in re.findall(r"\w+", query.lower())]
+
+def full_text_condition(query: str):
+    """Rows matching every word of query, through the full-text index when there is one"""
+    if _full_text_backend == "fts5":
+        terms = _fts_terms(query)
+        if not terms:
+            return None
+        matches = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query").bindparams(
+            fts_query=" ".join(terms)
+        ).columns(rowid=Integer)
+        return Product.id.in_(matches)
+
+    if _full_text_backend == "tsvector":
+        return text(f"{PG_SEARCH_DOCUMENT} @@ websearch_to_tsquery('english', :ts_query)").bindparams(ts_query=query)
+
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return and_(*[
+        or_(Product.name.ilike(f"%{word}%"), Product.brand.ilike(f"%{word}%"), Product.category.ilike(f"%{word}%"))
+        for word in words
+    ])
+
+def color_condition(colors: List[str]):
+    """Products with any of the colors in their name"""
+    if _full_text_backend == "fts5":
+        matches = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :color_query").bindparams(
+            color_query="name : (" + " OR ".join(f'"{color}"' for color in colors) + ")"
+        ).columns(rowid=Integer)
+        return Product.id.in_(matches)
+    return or_(*[Product.name.ilike(f"%{color}%") for color in colors])
+
+def filter_conditions(db: Session, request: ProductSearchRequest, extra_ids: Optional[List[int]] = None) -> Optional[List[Any]]:
+    """WHERE clauses for a search; None when a filter value cannot match anything"""
+    conditions = []
+    for column_name in ("category", "brand", "department"):
+        value = getattr(request, column_name)
+        if value:
+            stored = distinct_values(db, column_name).get(value.lower())
+            if stored is None:
+                return None
+            conditions.append(getattr(Product, column_name) == stored)
+
+    if request.min_price is not None:
+        conditions.append(Product.retail_price >= request.min_price)
+    if request.max_price is not None:
+        conditions.append(Product.retail_price <= request.max_price)
+
+    if request.query:
+        matched = full_text_condition(request.query)
+        if extra_ids:
+            # Semantic matches join the full-text hits rather than replacing them
+            matched = Product.id.in_(extra_ids) if matched is None else or_(matched, Product.id.in_(extra_ids))
+        if matched is not None:
+            conditions.append(matched)
+
+    if request.colors:
+        conditions.append(color_condition([color.value for color in request.colors]))
+
+    if request.in_stock_only:
+        conditions.append(exists(
+            select(InventoryItem.id).where(InventoryItem.product_id == Product.id, InventoryItem.sold_at.is_(None))
+        ))
+    return conditions
+
+def estimate_total(db: Session, stmt, cap: int) -> Tuple[int, bool]:
+    """Exact count up to cap; past it the planner's estimate on PostgreSQL, else the cap"""
+    limited = stmt.with_only_columns(Product.id).order_by(None).limit(cap + 1).subquery()
+    count = db.scalar(select(func.count()).select_from(limited))
+    if count <= cap:
+        return count, True
+
+    if db.get_bind().dialect.name == "postgresql":
+        try:
+            compiled = stmt.with_only_columns(Product.id).compile(dialect=db.get_bind().dialect)
+            plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return max(int(plan[0]["Plan"]["Plan Rows"]), cap + 1), False
+        except Exception as e:
+            logger.warning(f"Could not estimate product count: {e}")
+    return cap, False
+
+def search_products(db: Session, request: ProductSearchRequest, extra_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    One page of products in keyset order.
+
+    The cursor carries the sort key of the last row served, so the next page starts
+    with an index seek past it instead of counting off an OFFSET, and the total from
+    the first page so later pages do not count again.
+    """
+    empty = {"products": [], "total": 0, "total_is_exact": True, "limit": request.limit, "next_cursor": None}
+    conditions = filter_conditions(db, request, extra_ids)
+    if conditions is None:
+        return empty
+
+    cursor = decode_cursor(request.sort, request.cursor) if request.cursor else None
+    position = cursor["k"] if cursor else None
+    if request.sort == ProductSort.ID:
+        order_by = [Product.id]
+        after = Product.id > position[0] if position else None
+    else:
+        # Products without a price have no place in a price ordering
+        conditions.append(Product.retail_price.isnot(None))
+        key = tuple_(Product.retail_price, Product.id)
+        if request.sort == ProductSort.PRICE_ASC:
+            order_by = [Product.retail_price, Product.id]
+            after = key > tuple(position) if position else None
+        else:
+            order_by = [Product.retail_price.desc(), Product.id.desc()]
+            after = key < tuple(position) if position else None
+
+    base = select(Product).where(*conditions)
+    page = base.where(after) if after is not None else base
+    rows = db.scalars(page.order_by(*order_by).limit(request.limit + 1)).all()
+
+    # Counted once on the first page and carried forward in the cursor
+    if cursor is not None:
+        total, total_is_exact = cursor.get("t", 0), cursor.get("e", False)
+    else:
+        total, total_is_exact = estimate_total(db, base, settings.PRODUCT_COUNT_EXACT_LIMIT)
+
+    next_cursor = None
+    if len(rows) > request.limit:
+        rows = rows[:request.limit]
+        last = rows[-1]
+        key = [last.id] if request.sort == ProductSort.ID else [last.retail_price, last.id]
+        next_cursor = encode_cursor(request.sort, key, total, total_is_exact)
+
+    return {
+        "products": rows,
+        "total": total,
+        "total_is_exact": total_is_exact,
+        "limit": request.limit,
+        "next_cursor": next_cursor
+    }
+
+def text_match_ids(db: Session, query: str, extra_ids: Optional[List[int]] = None) -> List[int]:
+    """IDs of every product a text query selects in search_products, semantic matches included"""
+    conditions = filter_conditions(db, ProductSearchRequest(query=query), extra_ids)
+    return list(db.scalars(select(Product.id).where(*conditions)))
+
+def get_products_by_ids(db: Session, ids: List[int]) -> Dict[str, Any]:
+    """Products for ids in request order, fetched with one primary-key IN query"""
+    wanted = list(dict.fromkeys(ids))
+    found = {product.id: product for product in db.scalars(select(Product).where(Product.id.in_(wanted)))}
+    return {
+        "products": [found[product_id] for product_id in wanted if product_id in found],
+        "missing": [product_id for product_id in wanted if product_id not in found]
+    }
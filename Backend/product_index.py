@@ -0,0 +1,210 @@
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Colors are not a column in the catalog; they are read from product names
+PRODUCT_COLORS = [
+    'black', 'white', 'red', 'blue', 'green', 'yellow', 'pink', 'purple', 'brown', 'gray',
+    'grey', 'navy', 'beige', 'orange', 'khaki', 'olive', 'cream', 'ivory', 'silver', 'gold'
+]
+COLOR_ALIASES = {'grey': 'gray'}
+
+# Lower edges of the price facet buckets; the last bucket is open-ended
+PRICE_FACET_EDGES = (0, 25, 50, 100, 200)
+
+FACET_NAMES = ('category', 'brand', 'department', 'color', 'price')
+
+@dataclass
+class ProductFilters:
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    department: Optional[str] = None
+    color: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.__dict__.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in self.__dict__.items() if value is not None}
+
+class ProductFilterIndex:
+    """
+    Column-oriented view of the products table for structured filtering.
+
+    Prices are kept as a sorted array so a price range is two binary searches;
+    category, brand, department and color each map a value to a boolean bitmap over
+    product rows, and a query ANDs the bitmaps it needs. Facet counts come from
+    per-row value codes, so counting a facet never goes back to the DataFrame.
+    """
+
+    def __init__(self, products: pd.DataFrame, popularity: Optional[Dict[Any, float]] = None):
+        products = products.reset_index(drop=True)
+        self.size = len(products)
+        self.ids = products['id'].to_numpy()
+        self.names = products['name'].fillna('').astype(str).to_numpy()
+        self.brands = products['brand'].fillna('').astype(str).to_numpy()
+        self.categories = products['category'].fillna('').astype(str).to_numpy()
+        self.departments = products['department'].fillna('').astype(str).to_numpy()
+        self.prices = products['retail_price'].astype(float).to_numpy()
+
+        self.price_order = np.argsort(self.prices, kind='stable')
+        self.sorted_prices = self.prices[self.price_order]
+
+        popularity = popularity or {}
+        self.popularity = np.array([popularity.get(product_id, 0.0) for product_id in self.ids], dtype=np.float64)
+
+        self.category_bitmaps = self._bitmaps(products['category'])
+        self.brand_bitmaps = self._bitmaps(products['brand'])
+        self.department_bitmaps = self._bitmaps(products['department'])
+        
+        # Facet counts are one bincount over the value codes of the matching rows
+        self.facet_codes: Dict[str, np.ndarray] = {}
+        self.facet_values: Dict[str, List[str]] = {}
+        for column in ('category', 'brand', 'department'):
+            self.facet_codes[column], self.facet_values[column] = self._codes(products[column])
+        
+        edges = np.array(PRICE_FACET_EDGES, dtype=np.float64)
+        price_codes = np.searchsorted(edges, self.prices, side='right') - 1
+        # Unpriced (or negative) rows get a code past the last bucket and are never counted
+        price_codes[(price_codes < 0) | np.isnan(self.prices)] = len(PRICE_FACET_EDGES)
+        self.facet_codes['price'] = price_codes
+        self.facet_values['price'] = [
+            f"${low:g}+" if high is None else f"${low:g} - ${high:g}"
+            for low, high in zip(PRICE_FACET_EDGES, list(PRICE_FACET_EDGES[1:]) + [None])
+        ]
+
+        lowered_names = products['name'].fillna('').str.lower()
+        self.color_bitmaps: Dict[str, np.ndarray] = {}
+        for color in PRODUCT_COLORS:
+            bitmap = lowered_names.str.contains(rf'\b{color}\b', regex=True).to_numpy()
+            canonical = COLOR_ALIASES.get(color, color)
+            if canonical in self.color_bitmaps:
+                self.color_bitmaps[canonical] = self.color_bitmaps[canonical] | bitmap
+            elif bitmap.any():
+                self.color_bitmaps[canonical] = bitmap
+
+    @staticmethod
+    def _bitmaps(column: pd.Series) -> Dict[str, np.ndarray]:
+        codes, uniques = pd.factorize(column.fillna('').astype(str).str.lower())
+        return {value: codes == code for code, value in enumerate(uniques) if value}
+
+    @staticmethod
+    def _codes(column: pd.Series):
+        """Per-row codes for the lowercased values, with a display value for each code"""
+        values = column.fillna('').astype(str)
+        codes, uniques = pd.factorize(values.str.lower())
+        display = values.groupby(codes).first()
+        return codes, [display.get(code, value) for code, value in enumerate(uniques)]
+
+    def price_mask(self, min_price: Optional[float] = None, max_price: Optional[float] = None) -> np.ndarray:
+        start = 0 if min_price is None else np.searchsorted(self.sorted_prices, min_price, side='left')
+        end = self.size if max_price is None else np.searchsorted(self.sorted_prices, max_price, side='right')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.price_order[start:end]] = True
+        return mask
+
+    def filter_masks(self, filters: ProductFilters) -> Dict[str, np.ndarray]:
+        """One bitmap per active filter, keyed by the facet it constrains"""
+        masks = {}
+        if filters.min_price is not None or filters.max_price is not None:
+            masks['price'] = self.price_mask(filters.min_price, filters.max_price)
+
+        for name, bitmaps, value in (
+            ('category', self.category_bitmaps, filters.category),
+            ('brand', self.brand_bitmaps, filters.brand),
+            ('department', self.department_bitmaps, filters.department),
+            ('color', self.color_bitmaps, filters.color)
+        ):
+            if value is not None:
+                bitmap = bitmaps.get(value.lower())
+                masks[name] = bitmap if bitmap is not None else np.zeros(self.size, dtype=bool)
+        return masks
+
+    def mask(self, filters: ProductFilters) -> np.ndarray:
+        """Rows matching every filter that is set"""
+        mask = np.ones(self.size, dtype=bool)
+        for bitmap in self.filter_masks(filters).values():
+            mask &= bitmap
+        return mask
+
+    def facet_counts(self, filters: ProductFilters, base: Optional[np.ndarray] = None, limit: int = 20) -> Dict[str, Any]:
+        """
+        Counts per value of every facet for the products matching filters.
+
+        Each facet is counted with every filter except its own applied, so the
+        counts show what choosing another value of that facet would return.
+        """
+        masks = self.filter_masks(filters)
+        if base is not None:
+            masks['query'] = base
+
+        def combined(exclude: Optional[str] = None) -> np.ndarray:
+            mask = np.ones(self.size, dtype=bool)
+            for name, bitmap in masks.items():
+                if name != exclude:
+                    mask &= bitmap
+            return mask
+
+        facets = {}
+        for name in FACET_NAMES:
+            rows = combined(exclude=name)
+            if name == 'color':
+                counts = [(color, int(np.count_nonzero(bitmap & rows))) for color, bitmap in self.color_bitmaps.items()]
+            else:
+                values = self.facet_values[name]
+                tallies = np.bincount(self.facet_codes[name][rows], minlength=len(values))
+                counts = [(values[code], int(tallies[code])) for code in np.flatnonzero(tallies[:len(values)])]
+
+            counts = [(value, count) for value, count in counts if value and count > 0]
+            if name != 'price':
+                counts.sort(key=lambda item: (-item[1], item[0]))
+                counts = counts[:limit]
+            facets[name] = [{'value': value, 'count': count} for value, count in counts]
+
+        return {'total': int(np.count_nonzero(combined())), 'facets': facets}
+
+    def query(self, filters: ProductFilters, limit: int = 5) -> Dict[str, Any]:
+        """Count matches and return the best ones, most popular first then cheapest"""
+        mask = self.mask(filters)
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return {'count': 0, 'min_price': None, 'max_price': None, 'products': []}
+
+        prices = self.prices[rows]
+        # lexsort sorts by the last key first: popularity descending, then price
+        best = rows[np.lexsort((prices, -self.popularity[rows]))[:limit]]
+
+        return {
+            'count': int(len(rows)),
+            'min_price': float(prices.min()),
+            'max_price': float(prices.max()),
+            'products': [
+                {
+                    'product_id': self.ids[row].item(),
+                    'name': self.names[row],
+                    'brand': self.brands[row],
+                    'category': self.categories[row],
+                    'department': self.departments[row],
+                    'retail_price': float(self.prices[row])
+                }
+                for row in best
+            ]
+        }
+
+    @property
+    def vocabulary(self) -> Dict[str, List[str]]:
+        """Distinct lowercased values per filterable column, for entity extraction"""
+        return {
+            'category': list(self.category_bitmaps),
+            'brand': list(self.brand_bitmaps),
+            'department': list(self.department_bitmaps),
+            'color': list(self.color_bitmaps)
+        }
@@ -0,0 +1,253 @@
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Trailing windows (in days) kept alongside the all-time ranking; None is all-time
+RANKING_WINDOWS = (None, 7, 30, 90)
+_LONGEST_WINDOW = max(window for window in RANKING_WINDOWS if window is not None)
+
+_NS_PER_DAY = 86_400 * 10**9
+
+def _day(timestamp) -> int:
+    """Days since 1970-01-01 of a timestamp"""
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return int(timestamp.value // _NS_PER_DAY)
+
+class RankedList:
+    """
+    Keys ordered by descending score (ties by key), kept sorted under small updates.
+
+    An update moves the key only past the neighbours it overtakes, so recording a
+    sale costs O(displacement) instead of a full re-sort, and top-N is a slice.
+    """
+
+    def __init__(self, scores: Dict[Any, float]):
+        self.scores = dict(scores)
+        self.order = sorted(self.scores, key=lambda key: (-self.scores[key], key))
+        self.position = {key: index for index, key in enumerate(self.order)}
+
+    def _ranks_before(self, a, b) -> bool:
+        return (-self.scores[a], a) < (-self.scores[b], b)
+
+    def _swap(self, i: int, j: int):
+        self.order[i], self.order[j] = self.order[j], self.order[i]
+        self.position[self.order[i]] = i
+        self.position[self.order[j]] = j
+
+    def adjust(self, key, delta: float):
+        if key not in self.scores:
+            self.scores[key] = 0.0
+            self.order.append(key)
+            self.position[key] = len(self.order) - 1
+        self.scores[key] += delta
+
+        index = self.position[key]
+        while index > 0 and self._ranks_before(key, self.order[index - 1]):
+            self._swap(index, index - 1)
+            index -= 1
+        while index < len(self.order) - 1 and self._ranks_before(self.order[index + 1], key):
+            self._swap(index, index + 1)
+            index += 1
+
+    def top(self, limit: int) -> List[Any]:
+        return self.order[:limit]
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+class _Segment:
+    """Units and revenue rankings for one slice (all, a category or a department) and window"""
+
+    def __init__(self, units: Dict[Any, float], revenue: Dict[Any, float]):
+        self.units = RankedList(units)
+        self.revenue = RankedList(revenue)
+
+class ProductRanking:
+    """
+    Best-seller rankings by units sold and by revenue, overall and per category and
+    department, for all time and for trailing windows.
+
+    A window of N days ends on the newest sale day and covers the N days up to it.
+    Units and revenue per product are kept in daily buckets for the longest window,
+    so when a sale on a later day moves the end forward, the days that fall out of
+    each window are taken off its rankings again.
+    """
+
+    def __init__(self):
+        self.products: Dict[Any, Dict[str, Any]] = {}
+        self.segments: Dict[Tuple[str, Optional[str], Optional[int]], _Segment] = {}
+        # day -> product_id -> [units, revenue], for the days the longest window covers
+        self.daily: Dict[int, Dict[Any, List[float]]] = {}
+        self.last_day: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, order_items: pd.DataFrame, products: pd.DataFrame) -> "ProductRanking":
+        ranking = cls()
+        ranking.products = {
+            row['id']: {
+                'name': row['name'],
+                'brand': row['brand'],
+                'retail_price': row['retail_price'],
+                'category': row['category'],
+                'department': row['department']
+            }
+            for row in products[['id', 'name', 'brand', 'retail_price', 'category', 'department']].to_dict('records')
+        }
+
+        sold = order_items[order_items['returned_at'].isna()][['product_id', 'created_at']].merge(
+            products[['id', 'retail_price', 'category', 'department']],
+            left_on='product_id',
+            right_on='id',
+            how='inner'
+        )
+        created_at = pd.to_datetime(sold['created_at'], errors='coerce')
+        if created_at.dt.tz is not None:
+            created_at = created_at.dt.tz_convert(None)
+        sold['day'] = np.where(created_at.isna(), -1, created_at.to_numpy(dtype='datetime64[D]').astype(np.int64))
+        dated = sold[sold['day'] >= 0]
+        ranking.last_day = int(dated['day'].max()) if not dated.empty else None
+
+        for window in RANKING_WINDOWS:
+            if window is None:
+                in_window = sold
+            elif ranking.last_day is None:
+                in_window = sold.iloc[0:0]
+            else:
+                in_window = dated[dated['day'] > ranking.last_day - window]
+
+            ranking._add_segments(in_window, 'all', None, window)
+            ranking._add_segments(in_window, 'category', 'category', window)
+            ranking._add_segments(in_window, 'department', 'department', window)
+
+        if ranking.last_day is not None:
+            recent = dated[dated['day'] > ranking.last_day - _LONGEST_WINDOW]
+            totals = recent.groupby(['day', 'product_id']).agg(units=('product_id', 'size'), revenue=('retail_price', 'sum'))
+            for (day, product_id), units, revenue in zip(totals.index, totals['units'], totals['revenue']):
+                ranking.daily.setdefault(int(day), {})[product_id] = [float(units), float(revenue)]
+
+        return ranking
+
+    def _add_segments(self, sold: pd.DataFrame, scope: str, column: Optional[str], window: Optional[int]):
+        keys = ['product_id'] if column is None else [column, 'product_id']
+        totals = sold.groupby(keys).agg(units=('product_id', 'size'), revenue=('retail_price', 'sum'))
+
+        if column is None:
+            self.segments[(scope, None, window)] = _Segment(totals['units'].to_dict(), totals['revenue'].to_dict())
+            return
+
+        for value, group in totals.groupby(level=0):
+            group = group.droplevel(0)
+            self.segments[(scope, str(value).lower(), window)] = _Segment(group['units'].to_dict(), group['revenue'].to_dict())
+
+    def _segment_keys(self, product_id, windows=RANKING_WINDOWS) -> List[Tuple[str, Optional[str], Optional[int]]]:
+        product = self.products.get(product_id, {})
+        keys = []
+        for window in windows:
+            keys.append(('all', None, window))
+            if product.get('category') is not None:
+                keys.append(('category', str(product['category']).lower(), window))
+            if product.get('department') is not None:
+                keys.append(('department', str(product['department']).lower(), window))
+        return keys
+
+    def _adjust(self, product_id, units: float, revenue: float, windows):
+        """Caller holds the lock"""
+        for key in self._segment_keys(product_id, windows):
+            segment = self.segments.get(key)
+            if segment is None:
+                segment = self.segments[key] = _Segment({}, {})
+            segment.units.adjust(product_id, units)
+            segment.revenue.adjust(product_id, revenue)
+
+    def _advance(self, day: int):
+        """Caller holds the lock; moves the windows' end to day, dropping the days that fall out"""
+        for window in RANKING_WINDOWS:
+            if window is None:
+                continue
+            old_first, new_first = self.last_day - window + 1, day - window + 1
+            for expired in sorted(d for d in self.daily if old_first <= d < new_first):
+                for product_id, (units, revenue) in self.daily[expired].items():
+                    self._adjust(product_id, -units, -revenue, (window,))
+        self.last_day = day
+        for expired in [d for d in self.daily if d <= day - _LONGEST_WINDOW]:
+            del self.daily[expired]
+
+    def record_sale(self, product_id, quantity: int = 1, unit_price: Optional[float] = None,
+                    timestamp: Optional[datetime] = None):
+        """
+        Add a sale at timestamp (now by default) to every ranking the product belongs
+        to whose window covers it; negative quantity records a return
+        """
+        if unit_price is None:
+            unit_price = self.products.get(product_id, {}).get('retail_price') or 0.0
+        day = _day(timestamp or datetime.utcnow())
+        units, revenue = float(quantity), quantity * unit_price
+
+        with self._lock:
+            if self.last_day is None:
+                self.last_day = day
+            elif day > self.last_day:
+                self._advance(day)
+            windows = [window for window in RANKING_WINDOWS if window is None or day > self.last_day - window]
+            self._adjust(product_id, units, revenue, windows)
+            if day > self.last_day - _LONGEST_WINDOW:
+                bucket = self.daily.setdefault(day, {}).setdefault(product_id, [0.0, 0.0])
+                bucket[0] += units
+                bucket[1] += revenue
+
+    def top(self, limit: int = 5, by: str = 'units', category: Optional[str] = None,
+            department: Optional[str] = None, window_days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Slice the matching ranking; only one of category/department applies, category first"""
+        if window_days not in RANKING_WINDOWS:
+            raise ValueError(f"Unsupported window: {window_days} (choose from {RANKING_WINDOWS})")
+
+        if category:
+            key = ('category', category.lower(), window_days)
+        elif department:
+            key = ('department', department.lower(), window_days)
+        else:
+            key = ('all', None, window_days)
+
+        with self._lock:
+            segment = self.segments.get(key)
+            if segment is None:
+                return []
+
+            ranked = segment.revenue if by == 'revenue' else segment.units
+            results = []
+            for product_id in ranked.top(limit):
+                units = segment.units.scores.get(product_id, 0)
+                if units <= 0:
+                    break
+                product = self.products.get(product_id, {})
+                results.append({
+                    'product_id': product_id,
+                    'name': product.get('name'),
+                    'brand': product.get('brand'),
+                    'unit_price': product.get('retail_price'),
+                    'units_sold': int(units),
+                    'total_revenue': float(segment.revenue.scores.get(product_id, 0.0))
+                })
+            return results
+
+    def units_sold(self, window_days: Optional[int] = None) -> Dict[Any, float]:
+        """Units sold per product across the whole catalog"""
+        segment = self.segments.get(('all', None, window_days))
+        return dict(segment.units.scores) if segment else {}
+
+    @property
+    def categories(self) -> List[str]:
+        return sorted({value for scope, value, _ in self.segments if scope == 'category'})
+
+    @property
+    def departments(self) -> List[str]:
+        return sorted({value for scope, value, _ in self.segments if scope == 'department'})
@@ -1,206 +1,253 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from datetime import datetime
-import uuid
-
-from app.models.product import Product, ProductSearchRequest, ProductSearchResponse, ProductCategory, ProductColor, ProductSize
-
-router = APIRouter()
-
-# Mock product data - in real implementation, this would come from database
-MOCK_PRODUCTS = [
-    Product(
-        id="1",
-        name="Classic White T-Shirt",
-        description="Premium cotton t-shirt perfect for everyday wear",
-        price=29.99,
-        category=ProductCategory.SHIRTS,
-        colors=[ProductColor.WHITE, ProductColor.BLACK, ProductColor.GRAY],
-        sizes=[ProductSize.S, ProductSize.M, ProductSize.L, ProductSize.XL],
-        images=["https://example.com/white-tshirt.jpg"],
-        in_stock=True,
-        stock_quantity=100,
-        rating=4.5,
-        review_count=127,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    ),
-    Product(
-        id="2",
-        name="Slim Fit Jeans",
-        description="Modern slim fit jeans with stretch comfort",
-        price=79.99,
-        category=ProductCategory.PANTS,
-        colors=[ProductColor.BLUE, ProductColor.BLACK],
-        sizes=[ProductSize.S, ProductSize.M, ProductSize.L, ProductSize.XL, ProductSize.XXL],
-        images=["https://example.com/slim-jeans.jpg"],
-        in_stock=True,
-        stock_quantity=75,
-        rating=4.2,
-        review_count=89,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    ),
-    Product(
-        id="3",
-        name="Summer Dress",
-        description="Lightweight summer dress perfect for warm weather",
-        price=59.99,
-        category=ProductCategory.DRESSES,
-        colors=[ProductColor.RED, ProductColor.BLUE, ProductColor.GREEN],
-        sizes=[ProductSize.XS, ProductSize.S, ProductSize.M, ProductSize.L],
-        images=["https://example.com/summer-dress.jpg"],
-        in_stock=True,
-        stock_quantity=50,
-        rating=4.7,
-        review_count=203,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    ),
-    Product(
-        id="4",
-        name="Running Shoes",
-        description="Comfortable running shoes with excellent support",
-        price=129.99,
-        category=ProductCategory.SHOES,
-        colors=[ProductColor.BLACK, ProductColor.WHITE, ProductColor.RED],
-        sizes=[ProductSize.S, ProductSize.M, ProductSize.L, ProductSize.XL],
-        images=["https://example.com/running-shoes.jpg"],
-        in_stock=True,
-        stock_quantity=60,
-        rating=4.6,
-        review_count=156,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    ),
-    Product(
-        id="5",
-        name="Leather Wallet",
-        description="Genuine leather wallet with multiple card slots",
-        price=39.99,
-        category=ProductCategory.ACCESSORIES,
-        colors=[ProductColor.BROWN, ProductColor.BLACK],
-        sizes=[ProductSize.M],
-        images=["https://example.com/leather-wallet.jpg"],
-        in_stock=True,
-        stock_quantity=200,
-        rating=4.3,
-        review_count=78,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    )
-]
-
-@router.get("/products", response_model=ProductSearchResponse)
-async def get_products(
-    query: Optional[str] = Query(None, description="Search query"),
-    category: Optional[ProductCategory] = Query(None, description="Product category"),
-    min_price: Optional[float] = Query(None, description="Minimum price"),
-    max_price: Optional[float] = Query(None, description="Maximum price"),
-    colors: Optional[List[ProductColor]] = Query(None, description="Filter by colors"),
-    sizes: Optional[List[ProductSize]] = Query(None, description="Filter by sizes"),
-    in_stock_only: bool = Query(False, description="Show only in-stock items"),
-    page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=1, le=100, description="Items per page")
-):
-    """
-    Get products with optional filtering and pagination
-    """
-    try:
-        # Filter products based on parameters
-        filtered_products = MOCK_PRODUCTS.copy()
-        
-        # Apply filters
-        if query:
-            query_lower = query.lower()
-            filtered_products = [
-                p for p in filtered_products 
-                if query_lower in p.name.lower() or query_lower in p.description.lower()
-            ]
-        
-        if category:
-            filtered_products = [p for p in filtered_products if p.category == category]
-        
-        if min_price is not None:
-            filtered_products = [p for p in filtered_products if p.price >= min_price]
-        
-        if max_price is not None:
-            filtered_products = [p for p in filtered_products if p.price <= max_price]
-        
-        if colors:
-            filtered_products = [
-                p for p in filtered_products 
-                if any(color in p.colors for color in colors)
-            ]
-        
-        if sizes:
-            filtered_products = [
-                p for p in filtered_products 
-                if any(size in p.sizes for size in sizes)
-            ]
-        
-        if in_stock_only:
-            filtered_products = [p for p in filtered_products if p.in_stock]
-        
-        # Apply pagination
-        total = len(filtered_products)
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_products = filtered_products[start_idx:end_idx]
-        
-        total_pages = (total + limit - 1) // limit
-        
-        return ProductSearchResponse(
-            products=paginated_products,
-            total=total,
-            page=page,
-            limit=limit,
-            total_pages=total_pages
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
-
-@router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str):
-    """
-    Get a specific product by ID
-    """
-    try:
-        product = next((p for p in MOCK_PRODUCTS if p.id == product_id), None)
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-        return product
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching product: {str(e)}")
-
-@router.get("/products/categories", response_model=List[str])
-async def get_categories():
-    """
-    Get all available product categories
-    """
-    try:
-        return [category.value for category in ProductCategory]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
-
-@router.get("/products/colors", response_model=List[str])
-async def get_colors():
-    """
-    Get all available product colors
-    """
-    try:
-        return [color.value for color in ProductColor]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching colors: {str(e)}")
-
-@router.get("/products/sizes", response_model=List[str])
-async def get_sizes():
-    """
-    Get all available product sizes
-    """
-    try:
-        return [size.value for size in ProductSize]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching sizes: {str(e)}") 
\ No newline at end of file
+from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import List, Optional, Dict, Any
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.models.product import (
+    Product, ProductOut, ProductSearchRequest, ProductSearchResponse, ProductBatchRequest, ProductBatchResponse,
+    ProductColor, ProductSize, ProductSort, ProductAvailability, StockCenterOut, SalesDimension, SalesMetric
+)
+from app.services import product_catalog
+from app.services.async_service import AsyncChatbotService, get_executor, ExecutorSaturatedError, ExecutorTimeoutError
+from app.services.chatbot_service import ChatbotService
+from app.services.product_index import ProductFilters
+from app.services.stock_ledger import get_stock_ledger
+from app.services.service_manager import service_manager
+from app.api.deps import get_db, require_chatbot_service, require_async_chatbot_service, executor_http_exception
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Semantic matches considered alongside full-text hits for a text query
+SEMANTIC_CANDIDATES = 50
+
+def _semantic_ids(query: str) -> Optional[List[int]]:
+    """Products semantically close to a text query, when the chatbot services are up"""
+    if not service_manager.is_ready:
+        return None
+    data_service = service_manager.get_chatbot_service().data_service
+    semantic = data_service.semantic_search_products([query], limit=SEMANTIC_CANDIDATES)[0]
+    return [int(product['id']) for product in semantic]
+
+def _search_products(db: Session, request: ProductSearchRequest) -> ProductSearchResponse:
+    """Run a catalog search, widening text queries with semantically close products when available"""
+    extra_ids = _semantic_ids(request.query) if request.query else None
+    return ProductSearchResponse.model_validate(product_catalog.search_products(db, request, extra_ids))
+
+def _text_match_ids(db: Session, query: str) -> List[int]:
+    """Products a text query matches in /products: full-text hits plus semantic matches"""
+    return product_catalog.text_match_ids(db, query, _semantic_ids(query))
+
+@router.get("/products", response_model=ProductSearchResponse)
+async def get_products(
+    query: Optional[str] = Query(None, description="Full-text search query"),
+    category: Optional[str] = Query(None, description="Product category"),
+    brand: Optional[str] = Query(None, description="Product brand"),
+    department: Optional[str] = Query(None, description="Department"),
+    min_price: Optional[float] = Query(None, description="Minimum price"),
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    colors: Optional[List[ProductColor]] = Query(None, description="Filter by colors"),
+    in_stock_only: bool = Query(False, description="Show only in-stock items"),
+    sort: ProductSort = Query(ProductSort.ID, description="Sort order"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get products with optional filtering and cursor pagination
+    """
+    try:
+        request = ProductSearchRequest(
+            query=query,
+            category=category,
+            brand=brand,
+            department=department,
+            min_price=min_price,
+            max_price=max_price,
+            colors=colors,
+            in_stock_only=in_stock_only,
+            sort=sort,
+            cursor=cursor,
+            limit=limit
+        )
+        return await get_executor().run(_search_products, db, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
+
+@router.post("/products:batch", response_model=ProductBatchResponse)
+async def get_products_batch(request: ProductBatchRequest, db: Session = Depends(get_db)):
+    """
+    Get up to 500 products by ID in one call; unknown IDs are listed under missing
+    """
+    try:
+        return ProductBatchResponse.model_validate(await get_executor().run(product_catalog.get_products_by_ids, db, request.ids))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
+
+@router.get("/products/facets")
+async def get_product_facets(
+    query: Optional[str] = Query(None, description="Text the products must contain"),
+    category: Optional[str] = Query(None, description="Product category"),
+    brand: Optional[str] = Query(None, description="Product brand"),
+    department: Optional[str] = Query(None, description="Department"),
+    color: Optional[ProductColor] = Query(None, description="Color"),
+    min_price: Optional[float] = Query(None, description="Minimum price"),
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    limit: int = Query(20, ge=1, le=200, description="Values per facet"),
+    service: AsyncChatbotService = Depends(require_async_chatbot_service),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get product counts per category, brand, department, color and price bucket for a search
+    """
+    try:
+        filters = ProductFilters(
+            category=category,
+            brand=brand,
+            department=department,
+            color=color.value if color else None,
+            min_price=min_price,
+            max_price=max_price
+        )
+        # Count among the same products the query selects in /products
+        product_ids = await get_executor().run(_text_match_ids, db, query) if query else None
+        return await service.data_service.facet_counts(filters, product_ids, limit)
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching product facets: {str(e)}")
+
+@router.get("/products/suggest")
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100, description="What has been typed so far"),
+    limit: int = Query(8, ge=1, le=20, description="Maximum suggestions"),
+    service: ChatbotService = Depends(require_chatbot_service)
+) -> List[Dict[str, Any]]:
+    """
+    Get typeahead suggestions for product names, brands and categories
+    """
+    try:
+        # A prefix lookup is two binary searches, cheap enough to answer on the event loop
+        return service.data_service.suggest(q, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching suggestions: {str(e)}")
+
+@router.get("/products/trends")
+async def get_sales_trends(
+    by: SalesDimension = Query(SalesDimension.PRODUCT, description="Group sales by"),
+    days: int = Query(7, ge=1, le=365, description="Window length, ending on the newest sales day"),
+    metric: SalesMetric = Query(SalesMetric.ITEMS, description="Figure to rank by"),
+    trending: bool = Query(False, description="Rank by the gain over the previous window instead"),
+    category: Optional[str] = Query(None, description="Only products in this category"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum entries"),
+    service: ChatbotService = Depends(require_chatbot_service)
+) -> Dict[str, Any]:
+    """
+    Get top sellers per product, category, brand or distribution center over a window,
+    with each one's change over the window before
+    """
+    try:
+        data_service = service.data_service
+        entries = await get_executor().run(
+            data_service.get_sales_trends, by.value, days, metric.value, limit, trending, category
+        )
+        return {"days": days, "summary": data_service.get_sales_summary((days,)), "entries": entries}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching sales trends: {str(e)}")
+
+@router.get("/products/categories", response_model=List[str])
+async def get_categories(db: Session = Depends(get_db)):
+    """
+    Get all available product categories
+    """
+    try:
+        return sorted((await get_executor().run(product_catalog.distinct_values, db, "category")).values())
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
+
+@router.get("/products/colors", response_model=List[str])
+async def get_colors():
+    """
+    Get all available product colors
+    """
+    try:
+        return [color.value for color in ProductColor]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching colors: {str(e)}")
+
+@router.get("/products/sizes", response_model=List[str])
+async def get_sizes():
+    """
+    Get all available product sizes
+    """
+    try:
+        return [size.value for size in ProductSize]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching sizes: {str(e)}")
+
+@router.get("/products/{product_id}", response_model=ProductOut)
+async def get_product(product_id: int, db: Session = Depends(get_db)):
+    """
+    Get a specific product by ID
+    """
+    try:
+        product = await get_executor().run(db.get, Product, product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return ProductOut.model_validate(product)
+    except HTTPException:
+        raise
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching product: {str(e)}")
+
+@router.get("/products/{product_id}/availability", response_model=ProductAvailability)
+async def get_product_availability(product_id: int):
+    """
+    Units left of a product, in total and per distribution center, from the stock ledger
+    """
+    ledger = get_stock_ledger()
+    if ledger is None:
+        raise HTTPException(status_code=503, detail="Service is warming up: stock ledger is not loaded yet")
+    return ProductAvailability(
+        product_id=product_id,
+        tracked=ledger.is_tracked(product_id),
+        available=ledger.available(product_id),
+        distribution_centers=[
+            StockCenterOut(distribution_center_id=center, available=available)
+            for center, available in ledger.by_center(product_id).items()
+        ]
+    )
+
+@router.get("/products/{product_id}/recommendations")
+async def get_product_recommendations(
+    product_id: int,
+    limit: int = Query(5, ge=1, le=20, description="Products per list"),
+    service: ChatbotService = Depends(require_chatbot_service)
+) -> Dict[str, Any]:
+    """
+    Get frequently bought together and similar products for a catalog product
+    """
+    try:
+        recommendations = service.data_service.get_recommendations(product_id, limit)
+        if recommendations is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return recommendations
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching recommendations: {str(e)}")
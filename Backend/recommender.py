@@ -0,0 +1,116 @@
+from typing import List, Dict, Any, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Orders bigger than this are bulk or wholesale buys and say little about what goes together
+MAX_BASKET_SIZE = 50
+
+class CoPurchaseRecommender:
+    """
+    "Frequently bought together" from order baskets, precomputed per product.
+
+    Every pair of distinct products in a non-returned order adds the order's recency
+    weight (halving every half_life_days back from the newest order) to their
+    co-occurrence. Pairs are scored by cosine similarity, co-occurrence over the
+    geometric mean of each product's own weight, so best sellers do not become
+    everyone's neighbour. The best k neighbours of each product are stored as flat
+    arrays indexed by an offset table, so a lookup is a dict hit and a slice.
+    """
+
+    def __init__(self, products: Dict[Any, Dict[str, Any]], anchors: np.ndarray, offsets: np.ndarray,
+                 neighbors: np.ndarray, scores: np.ndarray, counts: np.ndarray):
+        self.products = products
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.scores = scores
+        self.counts = counts
+        self._rows = {product_id: row for row, product_id in enumerate(anchors.tolist())}
+
+    @classmethod
+    def build(cls, order_items: pd.DataFrame, products: pd.DataFrame, neighbors: int = 20,
+              half_life_days: float = 180.0) -> "CoPurchaseRecommender":
+        product_info = {
+            row['id']: {
+                'name': row['name'],
+                'brand': row['brand'],
+                'category': row['category'],
+                'retail_price': row['retail_price']
+            }
+            for row in products[['id', 'name', 'brand', 'category', 'retail_price']].to_dict('records')
+        }
+
+        sold = order_items[order_items['returned_at'].isna()][['order_id', 'product_id', 'created_at']].dropna(
+            subset=['order_id', 'product_id']
+        )
+        created_at = pd.to_datetime(sold['created_at'], errors='coerce')
+        age_days = (created_at.max() - created_at).dt.total_seconds() / 86400
+        # Items without a usable date count as one half-life old
+        weight = np.power(0.5, age_days.fillna(half_life_days).to_numpy() / half_life_days)
+
+        baskets = (
+            sold.assign(weight=weight)
+            .groupby(['order_id', 'product_id'], sort=False)['weight'].max()
+            .reset_index()
+        )
+        product_weight = baskets.groupby('product_id')['weight'].sum()
+
+        basket_size = baskets.groupby('order_id')['product_id'].transform('size')
+        baskets = baskets[(basket_size >= 2) & (basket_size <= MAX_BASKET_SIZE)]
+
+        pairs = baskets.merge(baskets[['order_id', 'product_id']], on='order_id', suffixes=('', '_other'))
+        pairs = pairs[pairs['product_id'] != pairs['product_id_other']]
+        if pairs.empty:
+            empty = np.array([], dtype=np.int64)
+            return cls(product_info, empty, np.zeros(1, dtype=np.int64), empty,
+                       np.array([], dtype=np.float32), np.array([], dtype=np.int32))
+
+        together = pairs.groupby(['product_id', 'product_id_other'])['weight'].agg(['sum', 'size']).reset_index()
+        together['score'] = together['sum'] / np.sqrt(
+            product_weight.reindex(together['product_id']).to_numpy()
+            * product_weight.reindex(together['product_id_other']).to_numpy()
+        )
+
+        together = together.sort_values(['product_id', 'score', 'size'], ascending=[True, False, False])
+        together = together[together.groupby('product_id').cumcount() < neighbors]
+
+        anchors, starts = np.unique(together['product_id'].to_numpy(), return_index=True)
+        offsets = np.append(starts, len(together)).astype(np.int64)
+
+        recommender = cls(
+            product_info,
+            anchors,
+            offsets,
+            together['product_id_other'].to_numpy(),
+            together['score'].to_numpy(dtype=np.float32),
+            together['size'].to_numpy(dtype=np.int32)
+        )
+        logger.info(f"Built co-purchase neighbours for {len(anchors)} products from {len(pairs)} basket pairs")
+        return recommender
+
+    def bought_together(self, product_id, limit: int = 5) -> List[Dict[str, Any]]:
+        """Products most often in the same order as product_id, best first"""
+        row = self._rows.get(product_id)
+        if row is None:
+            return []
+
+        start = self.offsets[row]
+        stop = min(self.offsets[row + 1], start + limit)
+        return [
+            dict(
+                self.products.get(neighbor, {}),
+                product_id=neighbor,
+                score=round(float(score), 4),
+                orders=int(count)
+            )
+            for neighbor, score, count in zip(
+                self.neighbors[start:stop].tolist(), self.scores[start:stop], self.counts[start:stop]
+            )
+        ]
+
+    def describe(self, product_id) -> Optional[Dict[str, Any]]:
+        product = self.products.get(product_id)
+        return dict(product, product_id=product_id) if product is not None else None
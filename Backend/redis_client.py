@@ -0,0 +1,199 @@
+import fnmatch
+import queue
+import threading
+import time
+from typing import Dict, Any, List, Optional, Union
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LOCAL_REDIS_SCHEME = "local://"
+
+class LocalPubSub:
+    """Subscriber side of LocalRedis pub/sub, shaped like redis-py's PubSub"""
+
+    def __init__(self, owner: "LocalRedis"):
+        self._owner = owner
+        self._channels = set()
+        self._patterns = set()
+        self._messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def subscribe(self, *channels: str):
+        self._channels.update(channels)
+        self._owner._register(self)
+
+    def psubscribe(self, *patterns: str):
+        self._patterns.update(patterns)
+        self._owner._register(self)
+
+    def unsubscribe(self, *channels: str):
+        self._channels.difference_update(channels or set(self._channels))
+
+    def punsubscribe(self, *patterns: str):
+        self._patterns.difference_update(patterns or set(self._patterns))
+
+    def _deliver(self, channel: str, data: bytes) -> int:
+        delivered = 0
+        if channel in self._channels:
+            self._messages.put({"type": "message", "pattern": None, "channel": channel.encode(), "data": data})
+            delivered += 1
+        for pattern in self._patterns:
+            if fnmatch.fnmatchcase(channel, pattern):
+                self._messages.put({"type": "pmessage", "pattern": pattern.encode(), "channel": channel.encode(), "data": data})
+                delivered += 1
+        return delivered
+
+    def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+        try:
+            return self._messages.get(timeout=timeout) if timeout else self._messages.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._channels.clear()
+        self._patterns.clear()
+        self._owner._unregister(self)
+
+class LocalRedis:
+    """
+    In-process stand-in for the subset of the Redis API the services use.
+
+    Selected with REDIS_URL=local:// so tests and single-node development can
+    exercise the Redis-backed code paths without a server. Values are stored
+    as bytes, like redis-py without decode_responses.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._pubsubs: List[LocalPubSub] = []
+
+    @staticmethod
+    def _encode(value: Union[str, bytes, int, float]) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def _expire_if_needed(self, key: str):
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self._expire_if_needed(key)
+            value = self._data.get(key)
+            return value if isinstance(value, bytes) else None
+
+    def set(self, key: str, value, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            self._expire_if_needed(key)
+            if nx and key in self._data:
+                return None
+            self._data[key] = self._encode(value)
+            self._expires.pop(key, None)
+            if ex is not None:
+                self._expires[key] = time.monotonic() + ex
+            elif px is not None:
+                self._expires[key] = time.monotonic() + px / 1000
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                self._expire_if_needed(key)
+                if self._data.pop(key, None) is not None:
+                    removed += 1
+                self._expires.pop(key, None)
+            return removed
+
+    def exists(self, *keys: str) -> int:
+        with self._lock:
+            count = 0
+            for key in keys:
+                self._expire_if_needed(key)
+                count += key in self._data
+            return count
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            self._expire_if_needed(key)
+            if key not in self._data:
+                return False
+            self._expires[key] = time.monotonic() + seconds
+            return True
+
+    def rpush(self, key: str, *values) -> int:
+        with self._lock:
+            self._expire_if_needed(key)
+            items = self._data.setdefault(key, [])
+            items.extend(self._encode(value) for value in values)
+            return len(items)
+
+    def ltrim(self, key: str, start: int, end: int) -> bool:
+        with self._lock:
+            self._expire_if_needed(key)
+            items = self._data.get(key)
+            if items is None:
+                return True
+            stop = None if end == -1 else end + 1
+            self._data[key] = items[start:stop]
+            return True
+
+    def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        with self._lock:
+            self._expire_if_needed(key)
+            items = self._data.get(key) or []
+            stop = None if end == -1 else end + 1
+            return list(items[start:stop])
+
+    def llen(self, key: str) -> int:
+        with self._lock:
+            self._expire_if_needed(key)
+            return len(self._data.get(key) or [])
+
+    def ping(self) -> bool:
+        return True
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> LocalPubSub:
+        return LocalPubSub(self)
+
+    def _register(self, pubsub: LocalPubSub):
+        with self._lock:
+            if pubsub not in self._pubsubs:
+                self._pubsubs.append(pubsub)
+
+    def _unregister(self, pubsub: LocalPubSub):
+        with self._lock:
+            if pubsub in self._pubsubs:
+                self._pubsubs.remove(pubsub)
+
+    def publish(self, channel: str, message) -> int:
+        """Deliver to every matching subscriber; returns how many received it"""
+        with self._lock:
+            pubsubs = list(self._pubsubs)
+        data = self._encode(message)
+        return sum(pubsub._deliver(channel, data) for pubsub in pubsubs)
+
+# Global client instances
+_client = None
+_client_lock = threading.Lock()
+
+def get_redis_client():
+    """Return a shared client for settings.REDIS_URL (or the local stand-in)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if settings.REDIS_URL.startswith(LOCAL_REDIS_SCHEME):
+                    _client = LocalRedis()
+                else:
+                    import redis
+                    _client = redis.Redis.from_url(settings.REDIS_URL)
+                    logger.info(f"Connected Redis client to {settings.REDIS_URL}")
+    return _client
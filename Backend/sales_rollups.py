@@ -0,0 +1,316 @@
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("orders", "items", "revenue", "returns")
+# "all" has a single key and gives store-wide totals
+DIMENSIONS = ("all", "product", "category", "brand", "distribution_center")
+_DIMENSION_COLUMNS = {
+    "all": "all",
+    "product": "product_id",
+    "category": "category",
+    "brand": "brand",
+    "distribution_center": "distribution_center_id",
+}
+# Where trailing windows end: the newest sale in the loaded history, or the newest sale recorded since
+ANCHORS = ("history", "live")
+# Buckets are addressed by (row << _DAY_BITS) | day, with days counted from 1970-01-01
+_DAY_BITS = 20
+# Overlay buckets held before they are folded into the sorted arrays
+_MERGE_BUCKETS = 4096
+
+_NS_PER_DAY = 86_400 * 10**9
+
+def _day(timestamp) -> int:
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return int(timestamp.value // _NS_PER_DAY)
+
+def _to_days(values: pd.Series) -> np.ndarray:
+    """Epoch days of a timestamp column, -1 where missing or unparseable"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values.dt.tz_convert(None) if values.dt.tz is not None else values
+    else:
+        # Only the calendar date matters, and parsing just that is several times faster
+        parsed = pd.to_datetime(values.astype(str).str.slice(0, 10), format='%Y-%m-%d', errors='coerce')
+    days = parsed.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    return np.where(parsed.isna().to_numpy(), -1, days)
+
+class _Rollup:
+    """One dimension's daily buckets, sorted by key row then day, with running totals per metric"""
+
+    def __init__(self, labels: List[Any], codes: np.ndarray, values: np.ndarray):
+        self.labels = labels
+        self.rows = {label: row for row, label in enumerate(labels)}
+        self.codes = codes
+        # prefix[i] is the sum of the first i buckets, so any run of buckets sums in O(1)
+        self.prefix = np.vstack([np.zeros((1, len(METRICS))), np.cumsum(values, axis=0)])
+        self.base_rows = len(labels)
+
+    def window(self, first_day: int, last_day: int) -> np.ndarray:
+        """Metric sums per base row over [first_day, last_day], two binary searches per row"""
+        rows = np.arange(self.base_rows, dtype=np.int64) << _DAY_BITS
+        lo = np.searchsorted(self.codes, rows | first_day, side='left')
+        hi = np.searchsorted(self.codes, rows | (last_day + 1), side='left')
+        return self.prefix[hi] - self.prefix[lo]
+
+    def row_days(self, row: int, first_day: int, last_day: int) -> Tuple[np.ndarray, np.ndarray]:
+        lo = np.searchsorted(self.codes, (row << _DAY_BITS) | first_day, side='left')
+        hi = np.searchsorted(self.codes, (row << _DAY_BITS) | (last_day + 1), side='left')
+        days = self.codes[lo:hi] & ((1 << _DAY_BITS) - 1)
+        return days, np.diff(self.prefix[lo:hi + 1], axis=0)
+
+    def merged(self, codes: np.ndarray, values: np.ndarray) -> "_Rollup":
+        """This rollup with more buckets added in, rows labelled since the build included"""
+        merged_codes = np.union1d(self.codes, codes)
+        merged_values = np.zeros((len(merged_codes), len(METRICS)))
+        merged_values[np.searchsorted(merged_codes, self.codes)] += np.diff(self.prefix, axis=0)
+        merged_values[np.searchsorted(merged_codes, codes)] += values
+        return _Rollup(self.labels, merged_codes, merged_values)
+
+class SalesRollups:
+    """
+    Daily orders, items, revenue and returns per product, category, brand and
+    distribution center.
+
+    Each dimension keeps its non-empty (key, day) buckets as one sorted array with
+    running totals, so the sums for every key over any window are two binary searches
+    per key and a subtraction, whatever the window length. Sales and returns recorded
+    after the build go into an overlay of buckets, indexed by dimension and day, that
+    is added in on read and folded into the sorted arrays once it holds a few thousand
+    buckets. Windows end on the anchor day unless another end is given. With the "live"
+    anchor the first order placed today moves the end to today, so on historical data
+    every trailing window then covers the days since the history ends rather than its
+    last weeks. "history" keeps the end on the newest sale in the data the rollups were
+    built from, for studying a fixed dataset: sales recorded later are kept but only
+    count once a window reaches their day. Orders are distinct per key and day, so a
+    window's order count assumes an order's items share a date, as they do when placed.
+    """
+
+    def __init__(self, rollups: Dict[str, _Rollup], products: Dict[Any, Dict[str, Any]], last_day: int, anchor: str = "live"):
+        self.rollups = rollups
+        self.products = products
+        self.last_day = last_day
+        self.anchor = anchor
+        # dimension -> day -> row -> metric sums
+        self._recent: Dict[str, Dict[int, Dict[int, np.ndarray]]] = {}
+        self._recent_buckets = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, order_items: pd.DataFrame, products: pd.DataFrame, anchor: str = "live") -> "SalesRollups":
+        if anchor not in ANCHORS:
+            raise ValueError(f"Unknown window anchor: {anchor} (choose from {', '.join(ANCHORS)})")
+        product_columns = [column for column in ('id', 'name', 'brand', 'category', 'retail_price', 'distribution_center_id') if column in products]
+        items = order_items.merge(products[product_columns], left_on='product_id', right_on='id', how='left', suffixes=('', '_product'))
+        price = items['sale_price'] if 'sale_price' in items else items['retail_price']
+        price = pd.to_numeric(price, errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+        order_ids = pd.factorize(items['order_id'])[0]
+
+        sold_day = _to_days(items['created_at'])
+        returned_day = _to_days(items['returned_at']) if 'returned_at' in items else np.full(len(items), -1)
+
+        rollups = {}
+        for dimension, column in _DIMENSION_COLUMNS.items():
+            if dimension == "all":
+                rows, labels = np.zeros(len(items), dtype=np.int64), ["all"]
+            elif column in items:
+                rows, labels = pd.factorize(items[column], sort=True)
+                labels = labels.tolist()
+            else:
+                continue
+
+            sold = (rows >= 0) & (sold_day >= 0)
+            sold_codes = (rows[sold].astype(np.int64) << _DAY_BITS) | sold_day[sold]
+            returned = (rows >= 0) & (returned_day >= 0)
+            returned_codes = (rows[returned].astype(np.int64) << _DAY_BITS) | returned_day[returned]
+
+            codes = np.union1d(sold_codes, returned_codes)
+            sold_at = np.searchsorted(codes, sold_codes)
+            values = np.zeros((len(codes), len(METRICS)))
+            # An order counts once per bucket however many of its items fall in it
+            first_of_order = pd.DataFrame({'bucket': sold_at, 'order': order_ids[sold]}).duplicated().to_numpy()
+            values[:, 0] = np.bincount(sold_at[~first_of_order], minlength=len(codes))
+            values[:, 1] = np.bincount(sold_at, minlength=len(codes))
+            values[:, 2] = np.bincount(sold_at, weights=price[sold], minlength=len(codes))
+            values[:, 3] = np.bincount(np.searchsorted(codes, returned_codes), minlength=len(codes))
+            rollups[dimension] = _Rollup(labels, codes, values)
+
+        product_info = {
+            row['id']: {
+                'name': row.get('name'), 'brand': row.get('brand'), 'category': row.get('category'),
+                'distribution_center_id': row.get('distribution_center_id')
+            }
+            for row in products[product_columns].to_dict('records')
+        }
+        # Windows end on the newest sale; returns logged after it wait for sales to catch up
+        last_day = int(sold_day.max()) if len(sold_day) else -1
+        index = cls(rollups, product_info, last_day, anchor)
+        logger.info(
+            "Built sales rollups with "
+            + ", ".join(f"{len(rollup.codes)} {dimension} buckets" for dimension, rollup in rollups.items())
+        )
+        return index
+
+    def _keys(self, product_id) -> Dict[str, Any]:
+        product = self.products.get(product_id, {})
+        return {
+            "all": "all",
+            "product": product_id,
+            "category": product.get('category'),
+            "brand": product.get('brand'),
+            "distribution_center": product.get('distribution_center_id'),
+        }
+
+    def _row(self, dimension: str, label) -> int:
+        """Caller holds the lock; keys first seen after the build get new rows"""
+        rollup = self.rollups[dimension]
+        row = rollup.rows.get(label)
+        if row is None:
+            row = rollup.rows[label] = len(rollup.labels)
+            rollup.labels.append(label)
+        return row
+
+    def record(self, items: Iterable[Dict[str, Any]], timestamp: Optional[datetime] = None, returned: bool = False):
+        """
+        Add one order's items (product_id, quantity, unit_price) placed, or returned,
+        at timestamp
+        """
+        day = _day(timestamp or datetime.utcnow())
+        with self._lock:
+            counted = set()
+            for item in items:
+                product_id = item.get('product_id')
+                quantity = int(item.get('quantity', 1))
+                revenue = quantity * float(item.get('unit_price') or 0.0)
+                for dimension, label in self._keys(product_id).items():
+                    if label is None or dimension not in self.rollups:
+                        continue
+                    row = self._row(dimension, label)
+                    buckets = self._recent.setdefault(dimension, {}).setdefault(day, {})
+                    bucket = buckets.get(row)
+                    if bucket is None:
+                        bucket = buckets[row] = np.zeros(len(METRICS))
+                        self._recent_buckets += 1
+                    key = (dimension, row)
+                    if returned:
+                        bucket[3] += quantity
+                    else:
+                        # An order counts once per key however many of its items share it
+                        bucket[0] += key not in counted
+                        bucket[1] += quantity
+                        bucket[2] += revenue
+                        counted.add(key)
+            if not returned and self.anchor == "live":
+                self.last_day = max(self.last_day, day)
+            if self._recent_buckets >= _MERGE_BUCKETS:
+                self._merge_recent()
+
+    def _merge_recent(self):
+        """Caller holds the lock; folds the overlay into each dimension's sorted buckets"""
+        for dimension, days in self._recent.items():
+            codes = np.array([(row << _DAY_BITS) | day for day, buckets in days.items() for row in buckets], dtype=np.int64)
+            values = np.array([bucket for buckets in days.values() for bucket in buckets.values()])
+            self.rollups[dimension] = self.rollups[dimension].merged(codes, values)
+        self._recent = {}
+        self._recent_buckets = 0
+
+    def window(self, dimension: str, days: int, end_day: Optional[int] = None) -> Tuple[List[Any], np.ndarray]:
+        """Keys and their metric sums over the days-long window ending on end_day (newest sales day by default)"""
+        if dimension not in self.rollups:
+            raise ValueError(f"Unknown dimension: {dimension} (choose from {', '.join(self.rollups)})")
+        last_day = self.last_day if end_day is None else end_day
+        first_day = last_day - days + 1
+        if days < 1:
+            raise ValueError("days must be at least 1")
+        rollup = self.rollups[dimension]
+
+        with self._lock:
+            labels = list(rollup.labels)
+            sums = np.zeros((len(labels), len(METRICS)))
+            if last_day >= 0:
+                sums[:rollup.base_rows] = rollup.window(max(first_day, 0), last_day)
+            for day, buckets in self._recent.get(dimension, {}).items():
+                if first_day <= day <= last_day:
+                    for row, bucket in buckets.items():
+                        sums[row] += bucket
+        return labels, sums
+
+    def _describe(self, dimension: str, label, current: np.ndarray, previous: np.ndarray, metric: int) -> Dict[str, Any]:
+        entry = {"key": label}
+        if dimension == "product":
+            entry.update(self.products.get(label, {}))
+        entry.update({name: round(float(value), 2) if name == "revenue" else int(value) for name, value in zip(METRICS, current)})
+        entry[f"previous_{METRICS[metric]}"] = round(float(previous[metric]), 2)
+        entry["change_pct"] = round((current[metric] - previous[metric]) / previous[metric] * 100, 1) if previous[metric] else None
+        return entry
+
+    def top(self, dimension: str, days: int = 7, metric: str = "items", limit: int = 10,
+            trending: bool = False, category: Optional[str] = None, min_count: int = 2) -> List[Dict[str, Any]]:
+        """
+        Keys with the highest metric over the last days, each compared with the window
+        before it. trending ranks by the gain over that previous window instead, among
+        keys with at least min_count in the current one.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric} (choose from {', '.join(METRICS)})")
+        column = METRICS.index(metric)
+        labels, current = self.window(dimension, days)
+        _, previous = self.window(dimension, days, self.last_day - days)
+        previous = np.vstack([previous, np.zeros((len(labels) - len(previous), len(METRICS)))])
+
+        eligible = current[:, column] > 0
+        if trending:
+            eligible &= current[:, column] >= min_count
+        if category and dimension == "product":
+            wanted = category.lower()
+            eligible &= np.array([str(self.products.get(label, {}).get('category', '')).lower() == wanted for label in labels], dtype=bool)
+
+        score = current[:, column] - previous[:, column] if trending else current[:, column]
+        candidates = np.flatnonzero(eligible)
+        # Highest score first, ties by the larger current figure
+        ranked = candidates[np.lexsort((-current[candidates, column], -score[candidates]))][:limit]
+        return [self._describe(dimension, labels[row], current[row], previous[row], column) for row in ranked]
+
+    def summary(self, windows: Iterable[int] = (7, 30, 90)) -> Dict[str, Any]:
+        """Store-wide totals for trailing windows, each with the change over the window before it"""
+        summary = {}
+        for days in windows:
+            entries = self.top("all", days=days, limit=1)
+            if entries:
+                entry = entries[0]
+                summary[f"last_{days}_days"] = {
+                    **{name: entry[name] for name in METRICS},
+                    "previous_items": entry["previous_items"],
+                    "change_pct": entry["change_pct"]
+                }
+        if self.last_day >= 0:
+            summary["as_of"] = str(np.datetime64(self.last_day, 'D'))
+        return summary
+
+    def series(self, dimension: str, label, days: int = 30) -> List[Dict[str, Any]]:
+        """Daily metrics for one key over the last days, with empty days filled in"""
+        rollup = self.rollups.get(dimension)
+        if rollup is None or label not in rollup.rows:
+            return []
+        first_day = self.last_day - days + 1
+        totals = np.zeros((days, len(METRICS)))
+        with self._lock:
+            row = rollup.rows[label]
+            if row < rollup.base_rows and self.last_day >= 0:
+                bucket_days, values = rollup.row_days(row, max(first_day, 0), self.last_day)
+                totals[bucket_days - first_day] += values
+            for day, buckets in self._recent.get(dimension, {}).items():
+                if row in buckets and first_day <= day <= self.last_day:
+                    totals[day - first_day] += buckets[row]
+        return [
+            {"date": str(np.datetime64(first_day + offset, 'D')), **{name: float(value) for name, value in zip(METRICS, values)}}
+            for offset, values in enumerate(totals)
+        ]
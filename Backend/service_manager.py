@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+from datetime import datetime
+import logging
+
+from app.services.chatbot_service import ChatbotService
+from app.services.data_service import DataService
+from app.services.async_service import AsyncChatbotService
+
+logger = logging.getLogger(__name__)
+
+class ServiceNotReadyError(RuntimeError):
+    """Raised when a request needs the chatbot service before warm-up has finished"""
+
+class ServiceManager:
+    """Owns the process-wide ChatbotService and builds it exactly once"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chatbot_service: Optional[ChatbotService] = None
+        self._async_chatbot_service: Optional[AsyncChatbotService] = None
+        self.state = "pending"  # pending -> initializing -> ready | failed
+        self.error: Optional[str] = None
+        self.phase_timings: Dict[str, float] = {}
+        self.started_at: Optional[datetime] = None
+        self.ready_at: Optional[datetime] = None
+
+    def initialize(self) -> ChatbotService:
+        """Load data and train the chatbot; concurrent callers wait for the first one"""
+        if self._chatbot_service is not None:
+            return self._chatbot_service
+
+        with self._lock:
+            if self._chatbot_service is not None:
+                return self._chatbot_service
+
+            self.state = "initializing"
+            self.error = None
+            self.phase_timings = {}
+            self.started_at = datetime.utcnow()
+            total_start = time.perf_counter()
+
+            try:
+                phase_start = time.perf_counter()
+                data_service = DataService()
+                self.phase_timings['data_load'] = time.perf_counter() - phase_start
+                for index_name, seconds in data_service.index_timings.items():
+                    self.phase_timings[f'index:{index_name}'] = seconds
+
+                phase_start = time.perf_counter()
+                chatbot_service = ChatbotService(data_service=data_service)
+                self.phase_timings['training'] = time.perf_counter() - phase_start
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                logger.error(f"Chatbot service initialization failed: {e}")
+                raise
+
+            self.phase_timings['total'] = time.perf_counter() - total_start
+            self._async_chatbot_service = AsyncChatbotService(chatbot_service)
+            self._chatbot_service = chatbot_service
+            self.state = "ready"
+            self.ready_at = datetime.utcnow()
+
+            timings = ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in self.phase_timings.items())
+            logger.info(f"Chatbot service ready ({timings})")
+            return chatbot_service
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready" and self._chatbot_service is not None
+
+    def get_chatbot_service(self) -> ChatbotService:
+        """Return the warmed-up service without ever building it on a request path"""
+        if not self.is_ready:
+            raise ServiceNotReadyError(f"Chatbot service is {self.state}")
+        return self._chatbot_service
+
+    def get_async_chatbot_service(self) -> AsyncChatbotService:
+        """Same as get_chatbot_service, wrapped so blocking calls run on the worker pool"""
+        if not self.is_ready:
+            raise ServiceNotReadyError(f"Chatbot service is {self.state}")
+        return self._async_chatbot_service
+
+    def readiness(self) -> Dict[str, Any]:
+        """Report whether data and trained knowledge are available"""
+        data_loaded = False
+        knowledge_loaded = False
+
+        if self._chatbot_service is not None:
+            data_loaded = bool(self._chatbot_service.data_service.dfs)
+            knowledge_loaded = self._chatbot_service.training_service.is_trained
+
+        return {
+            "ready": self.is_ready and data_loaded and knowledge_loaded,
+            "state": self.state,
+            "checks": {
+                "data_loaded": data_loaded,
+                "knowledge_loaded": knowledge_loaded
+            },
+            "error": self.error,
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "phase_timings": {phase: round(seconds, 4) for phase, seconds in self.phase_timings.items()}
+        }
+
+# Global service manager instance
+service_manager = ServiceManager()
+
+def get_chatbot_service() -> ChatbotService:
+    return service_manager.get_chatbot_service()
+
+def get_async_chatbot_service() -> AsyncChatbotService:
+    return service_manager.get_async_chatbot_service()
@@ -0,0 +1,347 @@
+import json
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, NamedTuple
+import logging
+
+from app.core.config import settings
+from app.models.chat import ChatMessage, ChatResponse, ChatSession, MessageType
+
+logger = logging.getLogger(__name__)
+
+_MESSAGE_TYPE_CODES = {MessageType.USER: "u", MessageType.BOT: "b", MessageType.SYSTEM: "s"}
+_MESSAGE_TYPES_BY_CODE = {code: message_type for message_type, code in _MESSAGE_TYPE_CODES.items()}
+
+# Rough fixed cost of one record (tuple, float, short strings) on top of its content
+_RECORD_OVERHEAD_BYTES = 120
+
+def _to_epoch(timestamp: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are UTC, as datetime.utcnow() gives them"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+def _from_epoch(seconds: float) -> datetime:
+    """Naive UTC datetime, matching the utcnow() timestamps used everywhere else"""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+class MessageRecord(NamedTuple):
+    """Compact history entry; ChatMessage is only materialized when history is read"""
+    kind: str
+    content: str
+    timestamp: float
+    response_type: Optional[str] = None
+
+    @classmethod
+    def from_message(cls, message: ChatMessage) -> "MessageRecord":
+        response_type = (message.metadata or {}).get("response_type")
+        return cls(_MESSAGE_TYPE_CODES[message.message_type], message.content, _to_epoch(message.timestamp), response_type)
+
+    def to_message(self) -> ChatMessage:
+        # Built unvalidated: bot replies may run past the length limit that applies to user input
+        return ChatMessage.model_construct(
+            id=None,
+            content=self.content,
+            message_type=_MESSAGE_TYPES_BY_CODE[self.kind],
+            timestamp=_from_epoch(self.timestamp),
+            metadata={"response_type": self.response_type} if self.response_type else None
+        )
+
+    def size(self) -> int:
+        return _RECORD_OVERHEAD_BYTES + sys.getsizeof(self.content)
+
+class SessionBackend(ABC):
+    """Storage interface behind SessionStore"""
+
+    @abstractmethod
+    def save_session(self, session: ChatSession): ...
+
+    @abstractmethod
+    def get_session(self, session_id: str) -> Optional[ChatSession]: ...
+
+    @abstractmethod
+    def append(self, session_id: str, record: MessageRecord) -> Optional[ChatSession]: ...
+
+    @abstractmethod
+    def history(self, session_id: str, limit: int) -> List[MessageRecord]: ...
+
+    @abstractmethod
+    def delete_session(self, session_id: str) -> bool: ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]: ...
+
+class _SessionEntry:
+    __slots__ = ("session", "messages", "bytes_used", "last_access")
+
+    def __init__(self, session: ChatSession, history_size: int):
+        self.session = session
+        self.messages: deque = deque(maxlen=history_size)
+        self.bytes_used = _RECORD_OVERHEAD_BYTES
+        self.last_access = time.monotonic()
+
+class InMemorySessionBackend(SessionBackend):
+    """
+    Sessions in an LRU-ordered dict, each with a fixed-size ring buffer of records.
+
+    Sessions idle longer than the TTL are dropped, and least recently used sessions
+    are evicted whenever the session count or estimated memory exceeds its cap.
+    """
+
+    def __init__(self, history_size: int, idle_ttl_seconds: float, max_sessions: int, memory_cap_bytes: int):
+        self.history_size = history_size
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self.memory_cap_bytes = memory_cap_bytes
+        self._entries: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._bytes_used = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def _touch(self, session_id: str) -> Optional[_SessionEntry]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.last_access > self.idle_ttl_seconds:
+            self._remove(session_id)
+            return None
+        entry.last_access = time.monotonic()
+        self._entries.move_to_end(session_id)
+        return entry
+
+    def _remove(self, session_id: str):
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes_used -= entry.bytes_used
+
+    def _evict(self):
+        # Idle sessions sit at the LRU end, so expiry only has to look at the head
+        now = time.monotonic()
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_access <= self.idle_ttl_seconds:
+                break
+            self._remove(session_id)
+            self._evictions += 1
+
+        while self._entries and (len(self._entries) > self.max_sessions or self._bytes_used > self.memory_cap_bytes):
+            session_id = next(iter(self._entries))
+            self._remove(session_id)
+            self._evictions += 1
+
+    def save_session(self, session: ChatSession):
+        with self._lock:
+            entry = self._touch(session.session_id)
+            if entry is None:
+                entry = _SessionEntry(session, self.history_size)
+                self._entries[session.session_id] = entry
+                self._bytes_used += entry.bytes_used
+            else:
+                entry.session = session
+            self._evict()
+
+    def get_session(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            entry = self._touch(session_id)
+            return entry.session.model_copy() if entry else None
+
+    def append(self, session_id: str, record: MessageRecord) -> Optional[ChatSession]:
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is None:
+                return None
+            if len(entry.messages) == entry.messages.maxlen:
+                dropped = entry.messages[0].size()
+                entry.bytes_used -= dropped
+                self._bytes_used -= dropped
+            entry.messages.append(record)
+            added = record.size()
+            entry.bytes_used += added
+            self._bytes_used += added
+
+            entry.session.message_count += 1
+            entry.session.last_activity = _from_epoch(record.timestamp)
+            session = entry.session.model_copy()
+            self._evict()
+            return session
+
+    def history(self, session_id: str, limit: int) -> List[MessageRecord]:
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is None:
+                return []
+            records = list(entry.messages)
+        return records[-limit:] if limit > 0 else []
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._entries:
+                return False
+            self._remove(session_id)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._entries),
+                "bytes_used": self._bytes_used,
+                "memory_cap_bytes": self.memory_cap_bytes,
+                "evictions": self._evictions
+            }
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Sessions in a Redis-compatible server: a JSON key per session and a capped list
+    of history records. Both keys expire after the idle TTL; the global memory cap is
+    the server's maxmemory with an LRU eviction policy.
+    """
+
+    def __init__(self, client, history_size: int, idle_ttl_seconds: float, key_prefix: str = "chat"):
+        self.client = client
+        self.history_size = history_size
+        self.idle_ttl_seconds = int(idle_ttl_seconds)
+        self.key_prefix = key_prefix
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:session:{session_id}"
+
+    def _history_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:history:{session_id}"
+
+    def save_session(self, session: ChatSession):
+        self.client.set(self._session_key(session.session_id), session.model_dump_json(), ex=self.idle_ttl_seconds)
+        self.client.expire(self._history_key(session.session_id), self.idle_ttl_seconds)
+
+    def get_session(self, session_id: str) -> Optional[ChatSession]:
+        raw = self.client.get(self._session_key(session_id))
+        if raw is None:
+            return None
+        self.client.expire(self._session_key(session_id), self.idle_ttl_seconds)
+        self.client.expire(self._history_key(session_id), self.idle_ttl_seconds)
+        return ChatSession.model_validate_json(raw)
+
+    def append(self, session_id: str, record: MessageRecord) -> Optional[ChatSession]:
+        session = self.get_session(session_id)
+        if session is None:
+            return None
+
+        history_key = self._history_key(session_id)
+        self.client.rpush(history_key, json.dumps(list(record), separators=(",", ":")))
+        self.client.ltrim(history_key, -self.history_size, -1)
+        self.client.expire(history_key, self.idle_ttl_seconds)
+
+        session.message_count += 1
+        session.last_activity = _from_epoch(record.timestamp)
+        self.client.set(self._session_key(session_id), session.model_dump_json(), ex=self.idle_ttl_seconds)
+        return session
+
+    def history(self, session_id: str, limit: int) -> List[MessageRecord]:
+        if limit <= 0:
+            return []
+        raw_records = self.client.lrange(self._history_key(session_id), -limit, -1)
+        return [MessageRecord(*json.loads(raw)) for raw in raw_records]
+
+    def delete_session(self, session_id: str) -> bool:
+        return self.client.delete(self._session_key(session_id), self._history_key(session_id)) > 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+class SessionStore:
+    """Chat sessions and their recent history, independent of where they are kept"""
+
+    def __init__(self, backend: SessionBackend):
+        self.backend = backend
+
+    def create_session(self, user_id: Optional[str] = None, session_id: Optional[str] = None) -> ChatSession:
+        now = datetime.utcnow()
+        session = ChatSession(
+            session_id=session_id or str(uuid.uuid4()),
+            user_id=user_id,
+            created_at=now,
+            last_activity=now
+        )
+        self.backend.save_session(session)
+        return session
+
+    def get_or_create_session(self, session_id: Optional[str] = None, user_id: Optional[str] = None) -> ChatSession:
+        if session_id:
+            session = self.backend.get_session(session_id)
+            if session is not None:
+                return session
+        return self.create_session(user_id=user_id, session_id=session_id)
+
+    def get_session(self, session_id: str) -> Optional[ChatSession]:
+        return self.backend.get_session(session_id)
+
+    def record_message(self, session_id: str, message: ChatMessage) -> Optional[ChatSession]:
+        return self.backend.append(session_id, MessageRecord.from_message(message))
+
+    def record_turn(self, session_id: str, message: str, response: ChatResponse,
+                    sent_at: Optional[datetime] = None) -> Optional[ChatSession]:
+        """
+        Add a user message, sent at sent_at (UTC), and the reply to it; None if the session
+        does not exist. The turn has already been answered, so a failure here is logged
+        rather than raised.
+        """
+        try:
+            # Stored as records directly: ChatMessage's length limit is for user input, and replies run longer
+            user_record = MessageRecord(
+                _MESSAGE_TYPE_CODES[MessageType.USER], message, _to_epoch(sent_at or response.timestamp)
+            )
+            if self.backend.append(session_id, user_record) is None:
+                return None
+            bot_record = MessageRecord(
+                _MESSAGE_TYPE_CODES[MessageType.BOT], response.message, _to_epoch(response.timestamp),
+                (response.metadata or {}).get("response_type")
+            )
+            return self.backend.append(session_id, bot_record)
+        except Exception as e:
+            logger.error(f"Error recording chat turn in session {session_id}: {e}")
+            return None
+
+    def get_history(self, session_id: str, limit: int = 50) -> List[ChatMessage]:
+        limit = min(limit, settings.MAX_CONVERSATION_HISTORY)
+        return [record.to_message() for record in self.backend.history(session_id, limit)]
+
+    def end_session(self, session_id: str) -> bool:
+        return self.backend.delete_session(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
+
+def create_session_backend(backend_name: str) -> SessionBackend:
+    if backend_name == "redis":
+        from app.core.redis_client import get_redis_client
+
+        return RedisSessionBackend(
+            get_redis_client(),
+            history_size=settings.MAX_CONVERSATION_HISTORY,
+            idle_ttl_seconds=settings.SESSION_IDLE_TTL_SECONDS
+        )
+    if backend_name == "memory":
+        return InMemorySessionBackend(
+            history_size=settings.MAX_CONVERSATION_HISTORY,
+            idle_ttl_seconds=settings.SESSION_IDLE_TTL_SECONDS,
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            memory_cap_bytes=settings.SESSION_MEMORY_CAP_BYTES
+        )
+    raise ValueError(f"Unknown session backend: {backend_name}")
+
+# Global session store instance
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = SessionStore(create_session_backend(settings.SESSION_BACKEND))
+    return _session_store
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from datetime import datetime
+import logging
+
+from app.models.chat import ChatMessage, ChatResponse, MessageType
+from app.services.async_service import AsyncChatbotService
+from app.services.session_store import get_session_store
+from app.api.deps import require_async_chatbot_service
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post("/chat/start", response_model=ChatResponse)
+async def start_chat(user_id: str = None, service: AsyncChatbotService = Depends(require_async_chatbot_service)):
+    """
+    Start a new chat session and return the welcome message
+    """
+    try:
+        store = get_session_store()
+        session = store.create_session(user_id=user_id)
+        
+        welcome = service.get_welcome_message(session.session_id)
+        store.record_message(session.session_id, ChatMessage(
+            content=welcome.message,
+            message_type=MessageType.BOT,
+            timestamp=welcome.timestamp,
+            metadata={"response_type": "welcome"}
+        ))
+        
+        return welcome
+    except Exception as e:
+        logger.error(f"Error starting chat session: {e}")
+        raise HTTPException(status_code=500, detail=f"Error starting chat session: {str(e)}")
+
+@router.get("/chat/session/{session_id}/history")
+async def get_chat_history(session_id: str, limit: int = Query(50, ge=1, le=500, description="Most recent messages to return")):
+    """
+    Get the most recent messages of a chat session
+    """
+    try:
+        store = get_session_store()
+        session = store.get_session(session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Chat session not found")
+        
+        messages = store.get_history(session_id, limit)
+        
+        return {
+            "session": session,
+            "messages": messages,
+            "count": len(messages)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching chat history: {e}")
+        raise HTTPException(status_code=500, detail=f"Error fetching chat history: {str(e)}")
+
+@router.delete("/chat/session/{session_id}")
+async def end_chat_session(session_id: str):
+    """
+    End a chat session and discard its history
+    """
+    try:
+        if not get_session_store().end_session(session_id):
+            raise HTTPException(status_code=404, detail="Chat session not found")
+        
+        return {"message": "Chat session ended", "session_id": session_id, "ended_at": datetime.utcnow()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error ending chat session: {e}")
+        raise HTTPException(status_code=500, detail=f"Error ending chat session: {str(e)}")
+
+@router.get("/chat/sessions/stats")
+async def get_session_stats():
+    """
+    Get session store occupancy and eviction counters
+    """
+    return get_session_store().stats()
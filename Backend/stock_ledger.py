@@ -0,0 +1,258 @@
+import threading
+from contextlib import ExitStack
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+import logging
+
+from sqlalchemy import select, update, func, case
+from sqlalchemy.orm import Session
+
+from app.models.inventory_item import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+# (product_id, distribution_center_id)
+StockKey = Tuple[int, int]
+# (product_id, distribution_center_id, quantity)
+Allocation = Tuple[int, int, int]
+
+class InsufficientStockError(ValueError):
+    """Raised when an order asks for more units than are left"""
+
+class StockLedger:
+    """
+    Available units per product and distribution center, kept in memory.
+
+    Each (product, distribution center) counter has its own lock. An order locks the
+    counters of every product it touches in key order, checks them all and only then
+    takes its units, so two orders never oversell a product and never deadlock. Reads
+    are a dict lookup. Changes are summed per counter and written to inventory_items
+    by flush() in one transaction. Products without any inventory rows are not
+    stock-controlled and are always available.
+    """
+
+    def __init__(self, counts: Dict[StockKey, int]):
+        self._counts: Dict[StockKey, int] = dict(counts)
+        self._locks: Dict[StockKey, threading.Lock] = {key: threading.Lock() for key in counts}
+        self._centers: Dict[int, List[int]] = {}
+        for product_id, center_id in sorted(counts):
+            self._centers.setdefault(product_id, []).append(center_id)
+        # Net change per counter since the last flush; negative means units taken
+        self._unflushed: Dict[StockKey, int] = {}
+        # Where each open order's units came from, so a cancel puts them back there
+        self._orders: Dict[int, List[Allocation]] = {}
+        # Orders whose units have shipped or gone back already, so a repeat cancel restores nothing
+        self._closed: set = set()
+        self._orders_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @classmethod
+    def load(cls, db: Session) -> "StockLedger":
+        """Counters from the unsold inventory_items rows, one grouped scan"""
+        unsold = func.sum(case((InventoryItem.sold_at.is_(None), 1), else_=0))
+        rows = db.execute(
+            select(InventoryItem.product_id, InventoryItem.product_distribution_center_id, unsold)
+            .where(InventoryItem.product_id.is_not(None))
+            .group_by(InventoryItem.product_id, InventoryItem.product_distribution_center_id)
+        ).all()
+        ledger = cls({(int(product_id), int(center_id or 0)): int(count or 0) for product_id, center_id, count in rows})
+        logger.info(f"Loaded stock ledger with {len(ledger._counts)} counters for {len(ledger._centers)} products")
+        return ledger
+
+    def is_tracked(self, product_id: int) -> bool:
+        return int(product_id) in self._centers
+
+    def available(self, product_id: int, center_id: Optional[int] = None) -> Optional[int]:
+        """Units left of a product, at one distribution center or in total; None if untracked"""
+        product_id = int(product_id)
+        if center_id is not None:
+            return self._counts.get((product_id, int(center_id)))
+        centers = self._centers.get(product_id)
+        if centers is None:
+            return None
+        return sum(self._counts[(product_id, center)] for center in centers)
+
+    def by_center(self, product_id: int) -> Dict[int, int]:
+        product_id = int(product_id)
+        return {center: self._counts[(product_id, center)] for center in self._centers.get(product_id, ())}
+
+    def _change(self, key: StockKey, delta: int):
+        """Caller holds the key's lock"""
+        self._counts[key] += delta
+        self._unflushed[key] = self._unflushed.get(key, 0) + delta
+
+    def reserve(self, items: Iterable[Dict[str, Any]]) -> List[Allocation]:
+        """
+        Take the units for an order's items, all or nothing, from the distribution
+        centers holding the most. Raises InsufficientStockError if any product is short.
+        """
+        wanted = Counter()
+        for item in items:
+            wanted[int(item["product_id"])] += int(item.get("quantity", 1))
+        wanted = {product_id: quantity for product_id, quantity in wanted.items() if product_id in self._centers}
+
+        keys = sorted((product_id, center) for product_id in wanted for center in self._centers[product_id])
+        with ExitStack() as stack:
+            for key in keys:
+                stack.enter_context(self._locks[key])
+
+            short = [
+                product_id for product_id, quantity in wanted.items()
+                if sum(self._counts[(product_id, center)] for center in self._centers[product_id]) < quantity
+            ]
+            if short:
+                raise InsufficientStockError(f"Not enough stock for product IDs: {sorted(short)}")
+
+            allocations: List[Allocation] = []
+            for product_id, quantity in wanted.items():
+                for center in sorted(self._centers[product_id], key=lambda c: -self._counts[(product_id, c)]):
+                    take = min(quantity, self._counts[(product_id, center)])
+                    if take <= 0:
+                        break
+                    self._change((product_id, center), -take)
+                    allocations.append((product_id, center, take))
+                    quantity -= take
+        return allocations
+
+    def release(self, allocations: Iterable[Allocation]):
+        """Put reserved units back"""
+        for product_id, center, quantity in allocations:
+            key = (product_id, center)
+            if key in self._locks:
+                with self._locks[key]:
+                    self._change(key, quantity)
+
+    def hold(self, order_id: int, allocations: List[Allocation]):
+        """Remember where a placed order's units came from until it ships or is cancelled"""
+        if allocations:
+            with self._orders_lock:
+                self._orders[int(order_id)] = allocations
+
+    def settle(self, order_id: int):
+        """The order's units have left the warehouse for good"""
+        with self._orders_lock:
+            self._orders.pop(int(order_id), None)
+            self._closed.add(int(order_id))
+
+    def cancel(self, order_id: int, items: Iterable[Dict[str, Any]] = ()):
+        """
+        Restore a cancelled order's units. Orders placed before this ledger was loaded
+        have no recorded allocation, so their items go back to the product's first
+        distribution center. Orders already settled or cancelled restore nothing.
+        """
+        with self._orders_lock:
+            if int(order_id) in self._closed:
+                return
+            self._closed.add(int(order_id))
+            allocations = self._orders.pop(int(order_id), None)
+        if allocations is None:
+            returned = Counter()
+            for item in items:
+                returned[int(item["product_id"])] += int(item.get("quantity", 1))
+            allocations = [
+                (product_id, self._centers[product_id][0], quantity)
+                for product_id, quantity in returned.items() if product_id in self._centers
+            ]
+        self.release(allocations)
+
+    def flush(self, session_factory: Callable[[], Session]) -> int:
+        """Write the net change of every counter to inventory_items; returns rows updated"""
+        changes = {}
+        for key in list(self._unflushed):
+            with self._locks[key]:
+                delta = self._unflushed.pop(key, 0)
+            if delta:
+                changes[key] = delta
+        if not changes:
+            return 0
+
+        now = datetime.utcnow()
+        updated = 0
+        db = session_factory()
+        try:
+            for (product_id, center), delta in changes.items():
+                at_key = (InventoryItem.product_id == product_id) & (InventoryItem.product_distribution_center_id == center)
+                if delta < 0:
+                    rows = select(InventoryItem.id).where(at_key, InventoryItem.sold_at.is_(None)).limit(-delta)
+                    values = {"sold_at": now}
+                else:
+                    rows = select(InventoryItem.id).where(at_key, InventoryItem.sold_at.is_not(None)).order_by(
+                        InventoryItem.sold_at.desc()
+                    ).limit(delta)
+                    values = {"sold_at": None}
+                result = db.execute(
+                    update(InventoryItem).where(InventoryItem.id.in_(rows)).values(**values).execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount or 0
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the changes for the next flush
+            for key, delta in changes.items():
+                with self._locks[key]:
+                    self._unflushed[key] = self._unflushed.get(key, 0) + delta
+            raise
+        finally:
+            db.close()
+        return updated
+
+    def start_flushing(self, session_factory: Callable[[], Session], interval: float):
+        """Flush every interval seconds on a background thread until stop()"""
+        def run():
+            while not self._stopping.wait(interval):
+                try:
+                    self.flush(session_factory)
+                except Exception as e:
+                    logger.error(f"Stock ledger flush failed: {e}")
+
+        self._flusher = threading.Thread(target=run, name="stock-ledger-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop(self, session_factory: Callable[[], Session]):
+        """Stop the background flusher and write what is left"""
+        self._stopping.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        try:
+            self.flush(session_factory)
+        except Exception as e:
+            logger.error(f"Final stock ledger flush failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "counters": len(self._counts),
+            "products": len(self._centers),
+            "unflushed_counters": len(self._unflushed),
+            "open_orders": len(self._orders)
+        }
+
+# Global stock ledger, loaded during warm-up
+_stock_ledger: Optional[StockLedger] = None
+_stock_ledger_lock = threading.Lock()
+
+def get_stock_ledger() -> Optional[StockLedger]:
+    """The loaded ledger, or None while warm-up has not reached it"""
+    return _stock_ledger
+
+def load_stock_ledger(session_factory: Callable[[], Session], flush_interval: float) -> StockLedger:
+    global _stock_ledger
+    if _stock_ledger is None:
+        with _stock_ledger_lock:
+            if _stock_ledger is None:
+                db = session_factory()
+                try:
+                    ledger = StockLedger.load(db)
+                finally:
+                    db.close()
+                ledger.start_flushing(session_factory, flush_interval)
+                _stock_ledger = ledger
+    return _stock_ledger
+
+def shutdown_stock_ledger(session_factory: Callable[[], Session]):
+    global _stock_ledger
+    with _stock_ledger_lock:
+        if _stock_ledger is not None:
+            _stock_ledger.stop(session_factory)
+            _stock_ledger = None
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, HTTPException, Depends, WebSocket, Query
+from fastapi.responses import StreamingResponse
+from typing import List, AsyncIterator, Optional
+import asyncio
+import json
+import logging
+import uuid
+
+from app.models.chat import BatchChatRequest, BatchChatMessage
+from app.core.config import settings
+from app.services.async_service import AsyncChatbotService, ExecutorSaturatedError
+from app.services.service_manager import get_async_chatbot_service, ServiceNotReadyError
+from app.services.chat_connections import connection_manager
+from app.api.deps import require_async_chatbot_service
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# A streaming batch waits for pool capacity instead of failing mid-stream
+BATCH_SATURATION_RETRIES = 50
+
+async def _process_chunk(service: AsyncChatbotService, chunk: List[BatchChatMessage], default_session_id: str):
+    """Run one chunk on the worker pool, waiting for a free slot rather than failing the stream"""
+    for attempt in range(BATCH_SATURATION_RETRIES):
+        try:
+            return await service.process_batch(
+                [item.message for item in chunk],
+                [item.session_id or default_session_id for item in chunk],
+                [item.context for item in chunk]
+            )
+        except ExecutorSaturatedError:
+            if attempt == BATCH_SATURATION_RETRIES - 1:
+                raise
+            await asyncio.sleep(0.1)
+
+@router.post("/chat/batch")
+async def process_chat_batch(request: BatchChatRequest, service: AsyncChatbotService = Depends(require_async_chatbot_service)):
+    """
+    Process a batch of chat messages and stream one NDJSON result line per message
+    """
+    if len(request.messages) > settings.CHAT_BATCH_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.messages)} messages (max {settings.CHAT_BATCH_MAX_MESSAGES})"
+        )
+    
+    default_session_id = request.session_id or str(uuid.uuid4())
+    chunk_size = settings.CHAT_BATCH_CHUNK_SIZE
+    
+    async def generate() -> AsyncIterator[str]:
+        for start in range(0, len(request.messages), chunk_size):
+            chunk = request.messages[start:start + chunk_size]
+            try:
+                responses = await _process_chunk(service, chunk, default_session_id)
+                for offset, (item, response) in enumerate(zip(chunk, responses)):
+                    line = {
+                        "index": start + offset,
+                        "id": item.id,
+                        "response": json.loads(response.model_dump_json())
+                    }
+                    yield json.dumps(line) + "\n"
+            except Exception as e:
+                # Headers are already sent, so report the failure per message and carry on
+                logger.error(f"Error processing chat batch chunk at {start}: {e}")
+                for offset, item in enumerate(chunk):
+                    yield json.dumps({"index": start + offset, "id": item.id, "error": str(e)}) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.websocket("/chat/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    session_id: Optional[str] = Query(None, description="Resume an existing chat session"),
+    user_id: Optional[str] = Query(None, description="User the session belongs to")
+):
+    """
+    Persistent chat transport: send {"type": "message", "message": ...} frames and
+    receive typing, progress and response frames for each one, in order
+    """
+    try:
+        service = get_async_chatbot_service()
+    except ServiceNotReadyError:
+        await websocket.close(code=1013, reason="Service is warming up")
+        return
+    
+    connection = await connection_manager.connect(websocket, service, session_id=session_id, user_id=user_id)
+    try:
+        await connection.send({"type": "session", "session": connection.session.model_dump(mode="json")})
+        if session_id is None:
+            welcome = service.get_welcome_message(connection.session.session_id)
+            await connection.send({"type": "response", "id": None, "response": welcome.model_dump(mode="json")})
+        await connection.run()
+    finally:
+        connection_manager.disconnect(connection)
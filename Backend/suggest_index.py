@@ -0,0 +1,119 @@
+import re
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A name is also reachable from its later words ("jeans" finds "Slim Fit Jeans"), up to this many
+MAX_WORD_STARTS = 4
+
+# Matches starting mid-name rank a little below ones that start at the beginning
+MID_NAME_PENALTY = 0.8
+
+# One- and two-character prefixes span most of the index, so their answers are precomputed
+CACHED_PREFIX_LENGTH = 2
+MAX_SUGGESTIONS = 20
+
+def normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", re.sub(r"['’`]", "", str(text).lower())))
+
+class SuggestIndex:
+    """
+    Prefix suggestions over product names, brands and categories, most popular first.
+
+    Every suggestion is stored under its normalized text (and the tails starting at
+    its next few words) in one sorted list. A prefix is the contiguous slice between
+    two binary searches; the slice's scores sit in a parallel NumPy array, so picking
+    the best few is an argpartition rather than a sort. Memory is a handful of keys
+    per product, independent of how many prefixes are ever asked for.
+    """
+
+    def __init__(self, keys: List[str], targets: np.ndarray, scores: np.ndarray, suggestions: List[Dict[str, Any]]):
+        self.keys = keys
+        self.targets = targets
+        self.scores = scores
+        self.suggestions = suggestions
+        self._cache: Dict[str, List[Dict[str, Any]]] = {}
+        for prefix in sorted({key[:length] for key in keys for length in range(1, CACHED_PREFIX_LENGTH + 1)}):
+            self._cache[prefix] = self._lookup(prefix, MAX_SUGGESTIONS)
+
+    @classmethod
+    def build(cls, products: pd.DataFrame, popularity: Optional[Dict[Any, float]] = None) -> "SuggestIndex":
+        popularity = popularity or {}
+        products = products[['id', 'name', 'brand', 'category']].copy()
+        products['units'] = products['id'].map(popularity).fillna(0.0).astype(float)
+
+        suggestions: List[Dict[str, Any]] = []
+        weights: List[float] = []
+
+        # One suggestion per distinct name; duplicates point at the best-selling product
+        names = products.dropna(subset=['name']).sort_values('units', ascending=False)
+        names = names.assign(key=names['name'].map(normalize))
+        named = names.groupby('key', sort=False).agg(
+            name=('name', 'first'), product_id=('id', 'first'), units=('units', 'sum')
+        )
+        for row in named.itertuples():
+            suggestions.append({'text': row.name, 'type': 'product', 'product_id': row.product_id})
+            weights.append(row.units)
+
+        for column in ('brand', 'category'):
+            grouped = products.dropna(subset=[column]).groupby(column)['units'].sum()
+            for value, units in grouped.items():
+                suggestions.append({'text': value, 'type': column})
+                weights.append(units)
+
+        entries: List[Tuple[str, int, float]] = []
+        for target, (suggestion, weight) in enumerate(zip(suggestions, weights)):
+            words = normalize(suggestion['text']).split()
+            # Non-product suggestions get a small boost so "nike" offers the brand before its products
+            boost = 1.0 if suggestion['type'] == 'product' else 1.5
+            for start in range(min(len(words), MAX_WORD_STARTS)):
+                score = (weight + 1.0) * boost * (1.0 if start == 0 else MID_NAME_PENALTY)
+                entries.append((" ".join(words[start:]), target, score))
+        entries.sort(key=lambda entry: entry[0])
+
+        index = cls(
+            [key for key, _, _ in entries],
+            np.array([target for _, target, _ in entries], dtype=np.int32),
+            np.array([score for _, _, score in entries], dtype=np.float64),
+            suggestions
+        )
+        logger.info(f"Built suggestion index with {len(entries)} keys for {len(suggestions)} suggestions")
+        return index
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        if len(prefix) <= CACHED_PREFIX_LENGTH:
+            return self._cache.get(prefix, [])[:limit]
+        return self._lookup(prefix, limit)
+
+    def _lookup(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        start = bisect_left(self.keys, prefix)
+        # Every key with this prefix sorts before prefix + the highest code point
+        end = bisect_left(self.keys, prefix + "￿", lo=start)
+        if start == end:
+            return []
+
+        scores = self.scores[start:end]
+        # Over-select a little since one suggestion can match through several of its word starts
+        wanted = min(len(scores), limit * MAX_WORD_STARTS)
+        best = np.argpartition(-scores, wanted - 1)[:wanted] if len(scores) > wanted else np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+
+        results, seen = [], set()
+        for offset in best:
+            target = int(self.targets[start + offset])
+            if target in seen:
+                continue
+            seen.add(target)
+            results.append(self.suggestions[target])
+            if len(results) == limit:
+                break
+        return results
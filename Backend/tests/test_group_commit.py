@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User
+from app.services.async_service import ExecutorTimeoutError
+from app.services.group_commit import GroupCommitQueue, WriteQueueFullError
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}", connect_args={"check_same_thread": False})
+    User.__table__.create(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    engine.dispose()
+
+@pytest.fixture
+def make_queue(session_factory):
+    queues = []
+
+    def make(max_batch=10, flush_interval=0.05, max_pending=100):
+        queue = GroupCommitQueue(session_factory, max_batch=max_batch, flush_interval=flush_interval, max_pending=max_pending)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+def add_user(user_id, email=None):
+    def write(session):
+        user = User(id=user_id, first_name="Test", last_name=str(user_id), email=email or f"{user_id}@example.com")
+        session.add(user)
+        session.flush()
+        return user
+    return write
+
+def user_ids(session_factory):
+    with session_factory() as session:
+        return sorted(session.scalars(select(User.id)))
+
+class Gate:
+    """A write that holds the writer thread until opened"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.opened = threading.Event()
+
+    def __call__(self, session):
+        self.started.set()
+        self.opened.wait(5)
+
+def test_concurrent_writes_share_one_commit(make_queue, session_factory):
+    queue = make_queue()
+    futures = [queue.submit(add_user(user_id), lambda user: user.id) for user_id in range(1, 6)]
+
+    assert [future.result(5) for future in futures] == [1, 2, 3, 4, 5]
+    assert user_ids(session_factory) == [1, 2, 3, 4, 5]
+    assert queue.stats()["batches"] == 1
+    assert queue.stats()["average_batch"] == 5
+
+def test_batches_stop_at_max_batch(make_queue):
+    queue = make_queue(max_batch=2)
+    futures = [queue.submit(add_user(user_id)) for user_id in range(1, 6)]
+
+    for future in futures:
+        future.result(5)
+    assert queue.stats()["batches"] == 3
+
+def test_failed_write_is_rolled_back_and_the_rest_replayed(make_queue, session_factory):
+    queue = make_queue()
+    futures = [
+        queue.submit(add_user(1, "same@example.com")),
+        queue.submit(add_user(2, "same@example.com")),
+        queue.submit(add_user(3)),
+    ]
+
+    futures[0].result(5)
+    with pytest.raises(IntegrityError):
+        futures[1].result(5)
+    futures[2].result(5)
+    assert user_ids(session_factory) == [1, 3]
+    assert queue.stats()["replayed_batches"] == 1
+
+def test_failing_finish_fails_only_its_write(make_queue, session_factory):
+    queue = make_queue()
+
+    def finish(user):
+        raise ValueError("cannot serialize")
+
+    failing = queue.submit(add_user(1), finish)
+    ok = queue.submit(add_user(2), lambda user: user.id)
+
+    with pytest.raises(ValueError):
+        failing.result(5)
+    assert ok.result(5) == 2
+    # The write itself committed; only building its response failed
+    assert user_ids(session_factory) == [1, 2]
+
+def test_full_queue_rejects_writes(make_queue):
+    queue = make_queue(max_pending=1, flush_interval=0)
+    gate = Gate()
+    queue.submit(gate)
+    assert gate.started.wait(5)
+    queue.submit(add_user(1))
+
+    with pytest.raises(WriteQueueFullError):
+        queue.submit(add_user(2))
+    gate.opened.set()
+
+def test_write_still_queued_at_timeout_is_dropped(make_queue, session_factory):
+    queue = make_queue(flush_interval=0)
+    gate = Gate()
+    queue.submit(gate)
+    assert gate.started.wait(5)
+    done = []
+
+    async def commit():
+        await queue.commit(add_user(1), timeout=0.05, on_done=done.append)
+
+    with pytest.raises(ExecutorTimeoutError):
+        asyncio.run(commit())
+    gate.opened.set()
+    queue.shutdown()
+
+    assert len(done) == 1 and done[0].cancelled()
+    assert user_ids(session_factory) == []
+    with pytest.raises(CancelledError):
+        done[0].result()
+
+def test_write_running_at_timeout_still_reports_done(make_queue, session_factory):
+    queue = make_queue(flush_interval=0)
+    gate = Gate()
+    done = threading.Event()
+    results = []
+
+    def write(session):
+        gate(session)
+        return add_user(1)(session)
+
+    def on_done(future):
+        results.append(future.result().id)
+        done.set()
+
+    async def commit():
+        await queue.commit(write, timeout=0.05, on_done=on_done)
+
+    with pytest.raises(ExecutorTimeoutError):
+        asyncio.run(commit())
+    gate.opened.set()
+
+    assert done.wait(5)
+    assert results == [1]
+    assert user_ids(session_factory) == [1]
+
+def test_shutdown_commits_queued_writes(session_factory):
+    queue = GroupCommitQueue(session_factory, max_batch=10, flush_interval=1, max_pending=100)
+    futures = [queue.submit(add_user(user_id)) for user_id in range(1, 4)]
+    queue.shutdown()
+
+    assert all(future.done() for future in futures)
+    assert user_ids(session_factory) == [1, 2, 3]
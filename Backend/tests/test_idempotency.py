@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+from app.core import redis_client
+from app.core.config import settings
+from app.core.redis_client import LocalRedis
+from app.services.idempotency import (
+    IdempotencyCache,
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    InMemoryIdempotencyStore,
+    RedisIdempotencyStore,
+    create_idempotency_store,
+    request_fingerprint,
+)
+
+STORES = {
+    "memory": lambda lock_seconds: InMemoryIdempotencyStore(ttl_seconds=60, max_keys=100, lock_seconds=lock_seconds),
+    "redis": lambda lock_seconds: RedisIdempotencyStore(LocalRedis(), ttl_seconds=60, lock_seconds=lock_seconds),
+}
+
+@pytest.fixture(params=sorted(STORES))
+def make_store(request):
+    """Each test runs against the in-process store and the Redis one over the local stand-in"""
+    return STORES[request.param]
+
+@pytest.fixture
+def store(make_store):
+    return make_store(30)
+
+class Counter:
+    """compute() for IdempotencyCache.run that counts its calls and can be held open"""
+
+    def __init__(self, result="ok", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({"a": 1, "b": [1, 2]}) == request_fingerprint({"b": [1, 2], "a": 1})
+    assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
+
+def test_result_is_replayed(store):
+    async def scenario():
+        cache = IdempotencyCache(store, wait_seconds=1)
+        compute = Counter({"order_id": 7})
+        first = await cache.run("key", "fp", compute)
+        second = await cache.run("key", "fp", compute)
+        return compute.calls, first, second
+
+    calls, first, second = asyncio.run(scenario())
+    assert calls == 1
+    assert first == ({"order_id": 7}, False)
+    assert second == ({"order_id": 7}, True)
+
+def test_reused_key_with_another_body_conflicts(store):
+    async def scenario():
+        cache = IdempotencyCache(store, wait_seconds=1)
+        await cache.run("key", "fp", Counter())
+        await cache.run("key", "other", Counter())
+
+    with pytest.raises(IdempotencyConflictError):
+        asyncio.run(scenario())
+
+def test_in_flight_retries_share_the_first_run(store):
+    async def scenario():
+        cache = IdempotencyCache(store, wait_seconds=1)
+        compute = Counter("placed")
+        compute.gate.clear()
+        first = asyncio.ensure_future(cache.run("key", "fp", compute))
+        await asyncio.sleep(0)
+        retries = [asyncio.ensure_future(cache.run("key", "fp", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        compute.gate.set()
+        return compute.calls, await first, await asyncio.gather(*retries)
+
+    calls, first, retries = asyncio.run(scenario())
+    assert calls == 1
+    assert first == ("placed", False)
+    assert retries == [("placed", True)] * 3
+
+def test_in_flight_retry_with_another_body_conflicts(store):
+    async def scenario():
+        cache = IdempotencyCache(store, wait_seconds=1)
+        compute = Counter()
+        compute.gate.clear()
+        first = asyncio.ensure_future(cache.run("key", "fp", compute))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(IdempotencyConflictError):
+                await cache.run("key", "other", compute)
+        finally:
+            compute.gate.set()
+            await first
+
+    asyncio.run(scenario())
+
+def test_in_flight_retries_see_the_first_error(store):
+    async def scenario():
+        cache = IdempotencyCache(store, wait_seconds=1)
+        compute = Counter(error=ValueError("bad order"))
+        compute.gate.clear()
+        first = asyncio.ensure_future(cache.run("key", "fp", compute))
+        await asyncio.sleep(0)
+        retry = asyncio.ensure_future(cache.run("key", "fp", compute))
+        await asyncio.sleep(0)
+        compute.gate.set()
+        return await asyncio.gather(first, retry, return_exceptions=True), compute.calls
+
+    (first, retry), calls = asyncio.run(scenario())
+    assert calls == 1
+    assert isinstance(first, ValueError) and retry is first
+
+def test_released_failure_lets_a_retry_run(store):
+    async def scenario():
+        cache = IdempotencyCache(store, wait_seconds=1)
+        with pytest.raises(ValueError):
+            await cache.run("key", "fp", Counter(error=ValueError("bad order")))
+        return await cache.run("key", "fp", Counter("placed"))
+
+    assert asyncio.run(scenario()) == ("placed", False)
+    assert store.get("key")["state"] == "done"
+
+def test_unreleased_failure_keeps_the_claim(store):
+    async def scenario():
+        cache = IdempotencyCache(store, wait_seconds=0.1)
+        with pytest.raises(TimeoutError):
+            await cache.run("key", "fp", Counter(error=TimeoutError()), release_on=(ValueError,))
+        await cache.run("key", "fp", Counter())
+
+    with pytest.raises(IdempotencyInProgressError):
+        asyncio.run(scenario())
+    assert store.get("key")["state"] == "pending"
+
+def test_other_node_waits_for_the_result(store):
+    async def scenario():
+        # Two caches over one store stand for two nodes; the second polls the first's claim
+        first_node = IdempotencyCache(store, wait_seconds=1)
+        second_node = IdempotencyCache(store, wait_seconds=1)
+        compute = Counter("placed")
+        compute.gate.clear()
+        first = asyncio.ensure_future(first_node.run("key", "fp", compute))
+        await asyncio.sleep(0)
+        retry = asyncio.ensure_future(second_node.run("key", "fp", compute))
+        await asyncio.sleep(0.1)
+        assert not retry.done()
+        compute.gate.set()
+        return compute.calls, await first, await retry
+
+    calls, first, retry = asyncio.run(scenario())
+    assert calls == 1
+    assert first == ("placed", False)
+    assert retry == ("placed", True)
+
+def test_in_memory_store_evicts_least_recently_used():
+    store = InMemoryIdempotencyStore(ttl_seconds=60, max_keys=2, lock_seconds=30)
+    for key in ("a", "b", "c"):
+        store.complete(key, "fp", key)
+    assert store.get("a") is None
+    assert store.get("c")["result"] == "c"
+
+def test_pending_claim_expires(make_store):
+    # A node that dies mid-request does not hold the key past the lock time
+    store = make_store(0)
+    assert store.claim("key", "fp")
+    assert store.claim("key", "fp")
+
+def test_redis_backend_uses_local_stand_in(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "local://")
+    monkeypatch.setattr(redis_client, "_client", None)
+    store = create_idempotency_store("redis")
+    assert isinstance(store, RedisIdempotencyStore)
+    assert isinstance(store.client, LocalRedis)
+    assert store.claim("key", "fp")
+    assert not store.claim("key", "fp")
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_idempotency_store("memcached")
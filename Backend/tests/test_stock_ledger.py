@@ -0,0 +1,232 @@
+import asyncio
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.orders import _settle_reservation
+from app.models.distribution_center import DistributionCenter  # noqa: F401 (inventory items reference it)
+from app.models.inventory_item import InventoryItem
+from app.services.async_service import ExecutorTimeoutError
+from app.services.group_commit import GroupCommitQueue
+from app.services.stock_ledger import StockLedger, InsufficientStockError
+
+def make_ledger():
+    # Product 1 is stocked at two centers, product 2 at one
+    return StockLedger({(1, 10): 3, (1, 20): 5, (2, 10): 2})
+
+class RecordingLock:
+    """A lock that notes the key whenever it is taken"""
+
+    def __init__(self, key, taken):
+        self.key = key
+        self.taken = taken
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.taken.append(self.key)
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+def test_reserve_takes_from_the_fullest_centers_first():
+    ledger = make_ledger()
+    allocations = ledger.reserve([{"product_id": 1, "quantity": 7}, {"product_id": 2}])
+
+    assert sorted(allocations) == [(1, 10, 2), (1, 20, 5), (2, 10, 1)]
+    assert ledger.by_center(1) == {10: 1, 20: 0}
+    assert ledger.available(2) == 1
+
+def test_reserve_is_all_or_nothing():
+    ledger = make_ledger()
+
+    with pytest.raises(InsufficientStockError):
+        ledger.reserve([{"product_id": 1, "quantity": 2}, {"product_id": 2, "quantity": 3}])
+    assert ledger.available(1) == 8
+    assert ledger.available(2) == 2
+    assert ledger.stats()["unflushed_counters"] == 0
+
+def test_untracked_products_are_always_available():
+    ledger = make_ledger()
+
+    assert not ledger.is_tracked(99)
+    assert ledger.available(99) is None
+    assert ledger.reserve([{"product_id": 99, "quantity": 1000}]) == []
+
+def test_reserve_locks_counters_in_key_order():
+    ledger = make_ledger()
+    taken = []
+    ledger._locks = {key: RecordingLock(key, taken) for key in ledger._locks}
+
+    ledger.reserve([{"product_id": 2}, {"product_id": 1}])
+    assert taken == [(1, 10), (1, 20), (2, 10)]
+
+def test_concurrent_orders_never_oversell_or_deadlock():
+    ledger = StockLedger({(1, 10): 50, (1, 20): 50, (2, 10): 100})
+    placed = []
+    short = []
+    start = threading.Barrier(8)
+
+    def place(items):
+        start.wait()
+        for _ in range(30):
+            try:
+                placed.append(ledger.reserve(items))
+            except InsufficientStockError:
+                short.append(items)
+
+    # Half the threads list the products in the opposite order
+    orders = [[{"product_id": 1}, {"product_id": 2}], [{"product_id": 2}, {"product_id": 1}]]
+    threads = [threading.Thread(target=place, args=(orders[i % 2],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(placed) == 100 and len(short) == 140
+    assert ledger.available(1) == 0 and ledger.available(2) == 0
+
+def test_cancel_puts_units_back_where_they_came_from():
+    ledger = make_ledger()
+    ledger.hold(1001, ledger.reserve([{"product_id": 1, "quantity": 7}]))
+
+    ledger.cancel(1001)
+    assert ledger.by_center(1) == {10: 3, 20: 5}
+    # A repeated cancel restores nothing
+    ledger.cancel(1001)
+    assert ledger.available(1) == 8
+    assert ledger.stats()["open_orders"] == 0
+
+def test_cancel_after_settle_restores_nothing():
+    ledger = make_ledger()
+    ledger.hold(1001, ledger.reserve([{"product_id": 2, "quantity": 2}]))
+
+    ledger.settle(1001)
+    ledger.cancel(1001)
+    assert ledger.available(2) == 0
+
+def test_cancel_of_an_order_placed_before_loading_uses_its_items():
+    ledger = make_ledger()
+
+    ledger.cancel(7, [{"product_id": 1}, {"product_id": 1}, {"product_id": 99}])
+    assert ledger.by_center(1) == {10: 5, 20: 5}
+
+@pytest.fixture
+def write_queue(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}", connect_args={"check_same_thread": False})
+    queue = GroupCommitQueue(sessionmaker(bind=engine), max_batch=10, flush_interval=0, max_pending=100)
+    yield queue
+    queue.shutdown()
+    engine.dispose()
+
+def place_order(ledger, queue, write, timeout):
+    """Reserve, then commit the order write with its reservation settled as orders.py does"""
+    allocations = ledger.reserve([{"product_id": 1, "quantity": 4}])
+
+    async def commit():
+        return await queue.commit(write, timeout=timeout, on_done=_settle_reservation(ledger, allocations))
+
+    return asyncio.run(commit())
+
+def test_failed_order_write_restores_stock(write_queue):
+    ledger = make_ledger()
+
+    def write(session):
+        raise ValueError("unknown user")
+
+    with pytest.raises(ValueError):
+        place_order(ledger, write_queue, write, timeout=5)
+    assert ledger.by_center(1) == {10: 3, 20: 5}
+
+def test_order_write_dropped_at_timeout_restores_stock(write_queue):
+    ledger = make_ledger()
+    started, opened = threading.Event(), threading.Event()
+    write_queue.submit(lambda session: (started.set(), opened.wait(5)))
+    assert started.wait(5)
+
+    with pytest.raises(ExecutorTimeoutError):
+        place_order(ledger, write_queue, lambda session: SimpleNamespace(order_id=1001), timeout=0.05)
+    assert ledger.available(1) == 8
+    opened.set()
+
+def test_order_write_finishing_after_timeout_holds_its_units(write_queue):
+    ledger = make_ledger()
+    started, opened, done = threading.Event(), threading.Event(), threading.Event()
+
+    def write(session):
+        started.set()
+        opened.wait(5)
+        return SimpleNamespace(order_id=1001)
+
+    with pytest.raises(ExecutorTimeoutError):
+        place_order(ledger, write_queue, write, timeout=0.05)
+    assert started.wait(5)
+    write_queue.submit(lambda session: done.set())
+    opened.set()
+    assert done.wait(5)
+
+    assert ledger.available(1) == 4
+    assert ledger.stats()["open_orders"] == 1
+    ledger.cancel(1001)
+    assert ledger.available(1) == 8
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'inventory.db'}")
+    InventoryItem.__table__.create(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        stock = [(1, 10, 3), (1, 20, 5), (2, 10, 2)]
+        db.add_all(
+            InventoryItem(product_id=product_id, product_distribution_center_id=center)
+            for product_id, center, count in stock for _ in range(count)
+        )
+        db.add(InventoryItem(product_id=2, product_distribution_center_id=10, sold_at=datetime(2024, 1, 1)))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+def unsold(factory, product_id):
+    with factory() as db:
+        return db.scalar(
+            select(func.count()).where(InventoryItem.product_id == product_id, InventoryItem.sold_at.is_(None))
+        )
+
+def test_load_counts_unsold_items(session_factory):
+    with session_factory() as db:
+        ledger = StockLedger.load(db)
+
+    assert ledger.by_center(1) == {10: 3, 20: 5}
+    assert ledger.by_center(2) == {10: 2}
+
+def test_flush_writes_the_net_change(session_factory):
+    with session_factory() as db:
+        ledger = StockLedger.load(db)
+    ledger.hold(1001, ledger.reserve([{"product_id": 1, "quantity": 6}]))
+    ledger.reserve([{"product_id": 2, "quantity": 2}])
+    ledger.cancel(1001)
+    ledger.release([(2, 10, 1)])
+
+    # Product 1 nets out to no change, so only product 2's counter is written
+    assert ledger.flush(session_factory) == 1
+    assert unsold(session_factory, 1) == 8
+    assert unsold(session_factory, 2) == 1
+    assert ledger.flush(session_factory) == 0
+
+def test_flush_keeps_changes_that_fail_to_write(session_factory, tmp_path):
+    with session_factory() as db:
+        ledger = StockLedger.load(db)
+    ledger.reserve([{"product_id": 1, "quantity": 2}])
+    # A database without the inventory table fails the update
+    broken = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+
+    with pytest.raises(OperationalError):
+        ledger.flush(broken)
+    assert ledger.flush(session_factory) == 2
+    assert unsold(session_factory, 1) == 6
@@ -0,0 +1,136 @@
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Event codes in lifecycle order; ties on the same timestamp sort by this
+EVENTS = ["placed", "shipped", "delivered", "returned", "cancelled"]
+EVENT_LABELS = {
+    "placed": "Order placed",
+    "shipped": "Shipped",
+    "delivered": "Delivered",
+    "returned": "Returned",
+    "cancelled": "Cancelled",
+}
+_EVENT_CODES = {event: code for code, event in enumerate(EVENTS)}
+_TIMESTAMP_COLUMNS = {"created_at": "placed", "shipped_at": "shipped", "delivered_at": "delivered", "returned_at": "returned"}
+
+# Item ID recorded for events known only at the order level
+ORDER_LEVEL = -1
+
+class OrderTimelines:
+    """
+    Tracking timelines for every order, built once from item-level timestamps.
+
+    Each order's events sit contiguously in three flat arrays (timestamp, event code,
+    order item ID) sorted by time, with an offset table over the sorted order IDs, so
+    a timeline is a binary search and a slice. Order-level timestamps only fill in
+    events none of the order's items carry. Status changes arriving after the build
+    go into a small per-order overlay that is merged in on read.
+    """
+
+    def __init__(self, order_ids: np.ndarray, offsets: np.ndarray, timestamps: np.ndarray,
+                 events: np.ndarray, items: np.ndarray):
+        self.order_ids = order_ids
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.events = events
+        self.items = items
+        self._recent: Dict[int, List[tuple]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, orders: pd.DataFrame, order_items: pd.DataFrame) -> "OrderTimelines":
+        frames = []
+        for column, event in _TIMESTAMP_COLUMNS.items():
+            if column in order_items:
+                frames.append(pd.DataFrame({
+                    'order_id': order_items['order_id'],
+                    'timestamp': pd.to_datetime(order_items[column], errors='coerce'),
+                    'event': _EVENT_CODES[event],
+                    'item': order_items['id']
+                }))
+        item_events = pd.concat(frames, ignore_index=True).dropna(subset=['order_id', 'timestamp'])
+
+        frames = []
+        for column, event in _TIMESTAMP_COLUMNS.items():
+            if column in orders:
+                frames.append(pd.DataFrame({
+                    'order_id': orders['order_id'],
+                    'timestamp': pd.to_datetime(orders[column], errors='coerce'),
+                    'event': _EVENT_CODES[event],
+                    'item': ORDER_LEVEL
+                }))
+        order_events = pd.concat(frames, ignore_index=True).dropna(subset=['order_id', 'timestamp'])
+        # Keep an order-level event only where no item already reports it
+        covered = item_events[['order_id', 'event']].drop_duplicates()
+        order_events = order_events.merge(covered, on=['order_id', 'event'], how='left', indicator=True)
+        order_events = order_events[order_events['_merge'] == 'left_only'].drop(columns='_merge')
+
+        timeline = pd.concat([item_events, order_events], ignore_index=True)
+        timeline['order_id'] = timeline['order_id'].astype(np.int64)
+        timeline = timeline.sort_values(['order_id', 'timestamp', 'event', 'item'], kind='stable')
+
+        order_ids, starts = np.unique(timeline['order_id'].to_numpy(), return_index=True)
+        offsets = np.append(starts, len(timeline)).astype(np.int64)
+        index = cls(
+            order_ids,
+            offsets,
+            timeline['timestamp'].to_numpy(dtype='datetime64[ns]'),
+            timeline['event'].to_numpy(dtype=np.int8),
+            timeline['item'].to_numpy(dtype=np.int64)
+        )
+        logger.info(f"Built tracking timelines with {len(timeline)} events for {len(order_ids)} orders")
+        return index
+
+    def record(self, order_id: int, event: str, timestamp: datetime, item_ids: Iterable[int] = ()):
+        """Add a status change that arrived after the build"""
+        code = _EVENT_CODES[event]
+        when = np.datetime64(timestamp, 'ns')
+        entries = [(when, code, int(item)) for item in item_ids] or [(when, code, ORDER_LEVEL)]
+        with self._lock:
+            self._recent.setdefault(int(order_id), []).extend(entries)
+
+    def events_for(self, order_id: int) -> Optional[List[tuple]]:
+        """(timestamp, event code, item ID) entries for an order in time order, or None if unknown"""
+        order_id = int(order_id)
+        row = int(np.searchsorted(self.order_ids, order_id))
+        known = row < len(self.order_ids) and self.order_ids[row] == order_id
+        with self._lock:
+            recent = list(self._recent.get(order_id, ()))
+        if not known and not recent:
+            return None
+
+        entries = []
+        if known:
+            start, end = self.offsets[row], self.offsets[row + 1]
+            entries = list(zip(self.timestamps[start:end], self.events[start:end].tolist(), self.items[start:end].tolist()))
+        if recent:
+            entries = sorted(entries + recent, key=lambda entry: (entry[0], entry[1]))
+        return entries
+
+    def timeline(self, order_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Tracking events for an order, with items that changed together folded into one event"""
+        entries = self.events_for(order_id)
+        if entries is None:
+            return None
+
+        events: List[Dict[str, Any]] = []
+        last_key = None
+        for timestamp, code, item in entries:
+            if (timestamp, code) != last_key:
+                last_key = (timestamp, code)
+                events.append({
+                    'timestamp': pd.Timestamp(timestamp).to_pydatetime(),
+                    'event': EVENTS[code],
+                    'status': EVENT_LABELS[EVENTS[code]],
+                    'item_ids': []
+                })
+            if item != ORDER_LEVEL:
+                events[-1]['item_ids'].append(item)
+        return events
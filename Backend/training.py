@@ -1,169 +1,206 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any, List
-import logging
-
-from app.services.chatbot_service import ChatbotService
-
-router = APIRouter()
-logger = logging.getLogger(__name__)
-
-# Global chatbot service instance
-chatbot_service = None
-
-def get_chatbot_service():
-    global chatbot_service
-    if chatbot_service is None:
-        chatbot_service = ChatbotService()
-    return chatbot_service
-
-@router.get("/training/status")
-async def get_training_status():
-    """
-    Get the current training status and summary
-    """
-    try:
-        service = get_chatbot_service()
-        summary = service.get_training_summary()
-        
-        return {
-            "status": "trained",
-            "summary": summary,
-            "message": "Chatbot has been trained on the dataset"
-        }
-    except Exception as e:
-        logger.error(f"Error getting training status: {e}")
-        raise HTTPException(status_code=500, detail=f"Error getting training status: {str(e)}")
-
-@router.post("/training/retrain")
-async def retrain_chatbot():
-    """
-    Retrain the chatbot with current data
-    """
-    try:
-        service = get_chatbot_service()
-        service._train_chatbot()
-        
-        summary = service.get_training_summary()
-        
-        return {
-            "status": "success",
-            "message": "Chatbot retraining completed successfully",
-            "summary": summary
-        }
-    except Exception as e:
-        logger.error(f"Error during retraining: {e}")
-        raise HTTPException(status_code=500, detail=f"Error during retraining: {str(e)}")
-
-@router.get("/training/knowledge")
-async def get_training_knowledge():
-    """
-    Get the knowledge base built during training
-    """
-    try:
-        service = get_chatbot_service()
-        training_service = service.training_service
-        
-        return {
-            "product_knowledge": training_service.product_knowledge,
-            "order_patterns": training_service.order_patterns,
-            "inventory_patterns": training_service.inventory_patterns,
-            "user_preferences": training_service.user_preferences,
-            "response_patterns": training_service.response_patterns
-        }
-    except Exception as e:
-        logger.error(f"Error getting training knowledge: {e}")
-        raise HTTPException(status_code=500, detail=f"Error getting training knowledge: {str(e)}")
-
-@router.get("/training/scenarios")
-async def get_training_scenarios():
-    """
-    Get the training scenarios generated from the data
-    """
-    try:
-        service = get_chatbot_service()
-        scenarios = service.training_service.training_data.get('scenarios', [])
-        
-        return {
-            "scenarios": scenarios,
-            "count": len(scenarios)
-        }
-    except Exception as e:
-        logger.error(f"Error getting training scenarios: {e}")
-        raise HTTPException(status_code=500, detail=f"Error getting training scenarios: {str(e)}")
-
-@router.get("/training/analytics")
-async def get_training_analytics():
-    """
-    Get detailed analytics from the training data
-    """
-    try:
-        service = get_chatbot_service()
-        training_service = service.training_service
-        
-        analytics = {
-            "product_analytics": {
-                "total_categories": len(training_service.product_knowledge.get('categories', {})),
-                "total_brands": len(training_service.product_knowledge.get('brands', {})),
-                "price_range": training_service.product_knowledge.get('pricing', {}),
-                "department_breakdown": training_service.product_knowledge.get('departments', {})
-            },
-            "order_analytics": {
-                "status_distribution": training_service.order_patterns.get('status_distribution', {}),
-                "order_sizes": training_service.order_patterns.get('order_sizes', {}),
-                "popular_products": training_service.order_patterns.get('popular_products', {}),
-                "gender_patterns": training_service.order_patterns.get('gender_patterns', {})
-            },
-            "inventory_analytics": {
-                "stock_analysis": training_service.inventory_patterns.get('stock_analysis', {}),
-                "category_availability": training_service.inventory_patterns.get('category_availability', {}),
-                "distribution_centers": training_service.inventory_patterns.get('dc_availability', {}),
-                "price_availability": training_service.inventory_patterns.get('price_availability', {})
-            },
-            "user_analytics": {
-                "demographics": training_service.user_preferences.get('demographics', {}),
-                "geographic": training_service.user_preferences.get('geographic', {}),
-                "traffic_sources": training_service.user_preferences.get('traffic_sources', {}),
-                "order_patterns": training_service.user_preferences.get('order_patterns', {})
-            }
-        }
-        
-        return analytics
-    except Exception as e:
-        logger.error(f"Error getting training analytics: {e}")
-        raise HTTPException(status_code=500, detail=f"Error getting training analytics: {str(e)}")
-
-@router.post("/training/test")
-async def test_training_response(message: str):
-    """
-    Test the trained chatbot with a specific message
-    """
-    try:
-        service = get_chatbot_service()
-        
-        # Create a test session
-        test_session_id = "test_session_123"
-        
-        # Get response using training service
-        enhanced_response = service.training_service.get_enhanced_response(message)
-        
-        # Get regular response
-        regular_response = service.process_message(message, test_session_id)
-        
-        return {
-            "input_message": message,
-            "enhanced_response": enhanced_response,
-            "regular_response": {
-                "message": regular_response.message,
-                "response_type": regular_response.metadata.get("response_type"),
-                "confidence": regular_response.metadata.get("confidence"),
-                "training_used": regular_response.metadata.get("training_used", False)
-            },
-            "comparison": {
-                "enhanced_confidence": enhanced_response.get('confidence', 0),
-                "regular_confidence": regular_response.metadata.get("confidence", 0),
-                "improvement": enhanced_response.get('confidence', 0) - regular_response.metadata.get("confidence", 0)
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error testing training response: {e}")
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import Dict, Any, List, Optional
+import logging
+
+from app.services.chatbot_service import ChatbotService
+from app.services.async_service import AsyncChatbotService, get_executor, ExecutorSaturatedError, ExecutorTimeoutError
+from app.services.knowledge_cache import get_knowledge_cache
+from app.api.deps import require_chatbot_service, require_async_chatbot_service, executor_http_exception
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/training/status")
+async def get_training_status(service: AsyncChatbotService = Depends(require_async_chatbot_service)):
+    """
+    Get the current training status and summary
+    """
+    try:
+        summary = await service.get_training_summary()
+        
+        return {
+            "status": "trained",
+            "summary": summary,
+            "message": "Chatbot has been trained on the dataset"
+        }
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error getting training status: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting training status: {str(e)}")
+
+@router.post("/training/retrain")
+async def retrain_chatbot(service: AsyncChatbotService = Depends(require_async_chatbot_service)):
+    """
+    Retrain the chatbot with current data
+    """
+    try:
+        summary = await service.retrain()
+        
+        return {
+            "status": "success",
+            "message": "Chatbot retraining completed successfully",
+            "summary": summary
+        }
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error during retraining: {e}")
+        raise HTTPException(status_code=500, detail=f"Error during retraining: {str(e)}")
+
+def _knowledge_payload(training_service) -> Dict[str, Any]:
+    return {
+        "product_knowledge": training_service.product_knowledge,
+        "order_patterns": training_service.order_patterns,
+        "inventory_patterns": training_service.inventory_patterns,
+        "user_preferences": training_service.user_preferences,
+        "response_patterns": training_service.response_patterns
+    }
+
+def _scenarios_payload(training_service) -> Dict[str, Any]:
+    scenarios = training_service.training_data.get('scenarios', [])
+    return {
+        "scenarios": scenarios,
+        "count": len(scenarios)
+    }
+
+def _analytics_payload(training_service) -> Dict[str, Any]:
+    return {
+        "product_analytics": {
+            "total_categories": len(training_service.product_knowledge.get('categories', {})),
+            "total_brands": len(training_service.product_knowledge.get('brands', {})),
+            "price_range": training_service.product_knowledge.get('pricing', {}),
+            "department_breakdown": training_service.product_knowledge.get('departments', {})
+        },
+        "order_analytics": {
+            "status_distribution": training_service.order_patterns.get('status_distribution', {}),
+            "order_sizes": training_service.order_patterns.get('order_sizes', {}),
+            "popular_products": training_service.order_patterns.get('popular_products', {}),
+            "gender_patterns": training_service.order_patterns.get('gender_patterns', {})
+        },
+        "inventory_analytics": {
+            "stock_analysis": training_service.inventory_patterns.get('stock_analysis', {}),
+            "category_availability": training_service.inventory_patterns.get('category_availability', {}),
+            "distribution_centers": training_service.inventory_patterns.get('dc_availability', {}),
+            "price_availability": training_service.inventory_patterns.get('price_availability', {})
+        },
+        "user_analytics": {
+            "demographics": training_service.user_preferences.get('demographics', {}),
+            "geographic": training_service.user_preferences.get('geographic', {}),
+            "traffic_sources": training_service.user_preferences.get('traffic_sources', {}),
+            "order_patterns": training_service.user_preferences.get('order_patterns', {})
+        }
+    }
+
+async def _knowledge_response(request: Request, name: str, builder, training_service, fields: Optional[str]) -> Response:
+    """
+    A knowledge payload serialized and compressed once per training run and
+    projection, answered with 304 when the client already holds it
+    """
+    field_list = sorted({field.strip() for field in fields.split(",") if field.strip()}) if fields else []
+    key = (name, id(training_service), training_service.version, tuple(field_list))
+    cache = get_knowledge_cache()
+    payload = cache.get(key)
+    if payload is None:
+        payload = await get_executor().run(cache.build, key, lambda: builder(training_service), field_list)
+
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if payload.etag in {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}:
+        return Response(status_code=304, headers=headers)
+    body, encoding = payload.for_encoding(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/training/knowledge")
+async def get_training_knowledge(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated sections or dotted paths, e.g. product_knowledge.brands"),
+    service: ChatbotService = Depends(require_chatbot_service)
+):
+    """
+    Get the knowledge base built during training
+    """
+    try:
+        return await _knowledge_response(request, "knowledge", _knowledge_payload, service.training_service, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error getting training knowledge: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting training knowledge: {str(e)}")
+
+@router.get("/training/scenarios")
+async def get_training_scenarios(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated keys: scenarios, count"),
+    service: ChatbotService = Depends(require_chatbot_service)
+):
+    """
+    Get the training scenarios generated from the data
+    """
+    try:
+        return await _knowledge_response(request, "scenarios", _scenarios_payload, service.training_service, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error getting training scenarios: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting training scenarios: {str(e)}")
+
+@router.get("/training/analytics")
+async def get_training_analytics(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated sections or dotted paths, e.g. order_analytics.status_distribution"),
+    service: ChatbotService = Depends(require_chatbot_service)
+):
+    """
+    Get detailed analytics from the training data
+    """
+    try:
+        return await _knowledge_response(request, "analytics", _analytics_payload, service.training_service, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error getting training analytics: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting training analytics: {str(e)}")
+
+@router.post("/training/test")
+async def test_training_response(message: str, service: AsyncChatbotService = Depends(require_async_chatbot_service)):
+    """
+    Test the trained chatbot with a specific message
+    """
+    try:
+        # Create a test session
+        test_session_id = "test_session_123"
+        
+        # Get response using training service
+        enhanced_response = await service.get_enhanced_response(message)
+        
+        # Get regular response
+        regular_response = await service.process_message(message, test_session_id)
+        
+        return {
+            "input_message": message,
+            "enhanced_response": enhanced_response,
+            "regular_response": {
+                "message": regular_response.message,
+                "response_type": regular_response.metadata.get("response_type"),
+                "confidence": regular_response.metadata.get("confidence"),
+                "training_used": regular_response.metadata.get("training_used", False)
+            },
+            "comparison": {
+                "enhanced_confidence": enhanced_response.get('confidence', 0),
+                "regular_confidence": regular_response.metadata.get("confidence", 0),
+                "improvement": enhanced_response.get('confidence', 0) - regular_response.metadata.get("confidence", 0)
+            }
+        }
+    except (ExecutorSaturatedError, ExecutorTimeoutError) as e:
+        raise executor_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error testing training response: {e}")
         raise HTTPException(status_code=500, detail=f"Error testing training response: {str(e)}") 
\ No newline at end of file
@@ -1,20 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
-from app.models.base import Base
-
-class User(Base):
-    __tablename__ = 'users'
-    id = Column(Integer, primary_key=True, index=True)
-    first_name = Column(String, nullable=False)
-    last_name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=False)
-    age = Column(Integer)
-    gender = Column(String)
-    state = Column(String)
-    street_address = Column(String)
-    postal_code = Column(String)
-    city = Column(String)
-    country = Column(String)
-    latitude = Column(Float)
-    longitude = Column(Float)
-    traffic_source = Column(String)
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from app.models.base import Base
+
+class User(Base):
+    __tablename__ = 'users'
+    id = Column(Integer, primary_key=True, index=True)
+    first_name = Column(String, nullable=False)
+    last_name = Column(String, nullable=False)
+    email = Column(String, unique=True, nullable=False)
+    age = Column(Integer)
+    gender = Column(String)
+    state = Column(String)
+    street_address = Column(String)
+    postal_code = Column(String)
+    city = Column(String)
+    country = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    traffic_source = Column(String)
     created_at = Column(DateTime) 
\ No newline at end of file
@@ -1,177 +1,177 @@
-import React, { useState, useEffect, useRef } from 'react';
-import { Send, Bot, User, Loader2 } from 'lucide-react';
-import ChatMessage from './ChatMessage';
-import QuickReplies from './QuickReplies';
-import { sendMessage, startChat } from '../services/api';
-
-interface Message {
-  id: string;
-  content: string;
-  type: 'user' | 'bot';
-  timestamp: Date;
-  suggestions?: string[];
-  quickReplies?: string[];
-}
-
-const ChatInterface: React.FC = () => {
-  const [messages, setMessages] = useState<Message[]>([]);
-  const [inputValue, setInputValue] = useState('');
-  const [isLoading, setIsLoading] = useState(false);
-  const [sessionId, setSessionId] = useState<string | null>(null);
-  const messagesEndRef = useRef<HTMLDivElement>(null);
-
-  const scrollToBottom = () => {
-    messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  };
-
-  useEffect(() => {
-    scrollToBottom();
-  }, [messages]);
-
-  useEffect(() => {
-    // Start chat session when component mounts
-    const initializeChat = async () => {
-      try {
-        const response = await startChat();
-        setSessionId(response.session_id);
-        setMessages([
-          {
-            id: 'welcome',
-            content: response.message,
-            type: 'bot',
-            timestamp: new Date(response.timestamp),
-            quickReplies: response.quick_replies || []
-          }
-        ]);
-      } catch (error) {
-        console.error('Failed to start chat:', error);
-        setMessages([
-          {
-            id: 'error',
-            content: "Hello! I'm StyleBot, your fashion assistant. How can I help you today?",
-            type: 'bot',
-            timestamp: new Date(),
-            quickReplies: ['Show me products', 'Track my order', 'Return policy', 'Contact support']
-          }
-        ]);
-      }
-    };
-
-    initializeChat();
-  }, []);
-
-  const handleSendMessage = async (content: string) => {
-    if (!content.trim() || isLoading) return;
-
-    const userMessage: Message = {
-      id: Date.now().toString(),
-      content: content.trim(),
-      type: 'user',
-      timestamp: new Date()
-    };
-
-    setMessages(prev => [...prev, userMessage]);
-    setInputValue('');
-    setIsLoading(true);
-
-    try {
-      const response = await sendMessage({
-        message: content.trim(),
-        session_id: sessionId
-      });
-
-      const botMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        content: response.message,
-        type: 'bot',
-        timestamp: new Date(response.timestamp),
-        suggestions: response.suggestions,
-        quickReplies: response.quick_replies
-      };
-
-      setMessages(prev => [...prev, botMessage]);
-    } catch (error) {
-      console.error('Failed to send message:', error);
-      const errorMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        content: "I'm sorry, I'm having trouble connecting right now. Please try again in a moment.",
-        type: 'bot',
-        timestamp: new Date()
-      };
-      setMessages(prev => [...prev, errorMessage]);
-    } finally {
-      setIsLoading(false);
-    }
-  };
-
-  const handleQuickReply = (reply: string) => {
-    handleSendMessage(reply);
-  };
-
-  const handleSubmit = (e: React.FormEvent) => {
-    e.preventDefault();
-    handleSendMessage(inputValue);
-  };
-
-  return (
-    <div className="max-w-4xl mx-auto">
-      <div className="bg-white rounded-lg shadow-lg overflow-hidden">
-        {/* Chat Header */}
-        <div className="bg-gradient-to-r from-primary-500 to-secondary-500 px-6 py-4">
-          <div className="flex items-center space-x-3">
-            <div className="w-10 h-10 bg-white/20 rounded-full flex items-center justify-center">
-              <Bot className="w-6 h-6 text-white" />
-            </div>
-            <div>
-              <h2 className="text-white font-semibold text-lg">StyleBot</h2>
-              <p className="text-white/80 text-sm">Your fashion assistant</p>
-            </div>
-          </div>
-        </div>
-
-        {/* Messages */}
-        <div className="h-96 overflow-y-auto p-4 space-y-4">
-          {messages.map((message) => (
-            <ChatMessage
-              key={message.id}
-              message={message}
-              onQuickReply={handleQuickReply}
-            />
-          ))}
-          
-          {isLoading && (
-            <div className="flex items-center space-x-2 text-gray-500">
-              <Loader2 className="w-4 h-4 animate-spin" />
-              <span className="text-sm">StyleBot is typing...</span>
-            </div>
-          )}
-          
-          <div ref={messagesEndRef} />
-        </div>
-
-        {/* Input */}
-        <div className="border-t p-4">
-          <form onSubmit={handleSubmit} className="flex space-x-2">
-            <input
-              type="text"
-              value={inputValue}
-              onChange={(e) => setInputValue(e.target.value)}
-              placeholder="Type your message..."
-              className="flex-1 px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-transparent"
-              disabled={isLoading}
-            />
-            <button
-              type="submit"
-              disabled={isLoading || !inputValue.trim()}
-              className="px-4 py-2 bg-primary-600 text-white rounded-lg hover:bg-primary-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
-            >
-              <Send className="w-4 h-4" />
-            </button>
-          </form>
-        </div>
-      </div>
-    </div>
-  );
-};
-
+import React, { useState, useEffect, useRef } from 'react';
+import { Send, Bot, User, Loader2 } from 'lucide-react';
+import ChatMessage from './ChatMessage';
+import QuickReplies from './QuickReplies';
+import { sendMessage, startChat } from '../services/api';
+
+interface Message {
+  id: string;
+  content: string;
+  type: 'user' | 'bot';
+  timestamp: Date;
+  suggestions?: string[];
+  quickReplies?: string[];
+}
+
+const ChatInterface: React.FC = () => {
+  const [messages, setMessages] = useState<Message[]>([]);
+  const [inputValue, setInputValue] = useState('');
+  const [isLoading, setIsLoading] = useState(false);
+  const [sessionId, setSessionId] = useState<string | null>(null);
+  const messagesEndRef = useRef<HTMLDivElement>(null);
+
+  const scrollToBottom = () => {
+    messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
+  };
+
+  useEffect(() => {
+    scrollToBottom();
+  }, [messages]);
+
+  useEffect(() => {
+    // Start chat session when component mounts
+    const initializeChat = async () => {
+      try {
+        const response = await startChat();
+        setSessionId(response.session_id);
+        setMessages([
+          {
+            id: 'welcome',
+            content: response.message,
+            type: 'bot',
+            timestamp: new Date(response.timestamp),
+            quickReplies: response.quick_replies || []
+          }
+        ]);
+      } catch (error) {
+        console.error('Failed to start chat:', error);
+        setMessages([
+          {
+            id: 'error',
+            content: "Hello! I'm StyleBot, your fashion assistant. How can I help you today?",
+            type: 'bot',
+            timestamp: new Date(),
+            quickReplies: ['Show me products', 'Track my order', 'Return policy', 'Contact support']
+          }
+        ]);
+      }
+    };
+
+    initializeChat();
+  }, []);
+
+  const handleSendMessage = async (content: string) => {
+    if (!content.trim() || isLoading) return;
+
+    const userMessage: Message = {
+      id: Date.now().toString(),
+      content: content.trim(),
+      type: 'user',
+      timestamp: new Date()
+    };
+
+    setMessages(prev => [...prev, userMessage]);
+    setInputValue('');
+    setIsLoading(true);
+
+    try {
+      const response = await sendMessage({
+        message: content.trim(),
+        session_id: sessionId
+      });
+
+      const botMessage: Message = {
+        id: (Date.now() + 1).toString(),
+        content: response.message,
+        type: 'bot',
+        timestamp: new Date(response.timestamp),
+        suggestions: response.suggestions,
+        quickReplies: response.quick_replies
+      };
+
+      setMessages(prev => [...prev, botMessage]);
+    } catch (error) {
+      console.error('Failed to send message:', error);
+      const errorMessage: Message = {
+        id: (Date.now() + 1).toString(),
+        content: "I'm sorry, I'm having trouble connecting right now. Please try again in a moment.",
+        type: 'bot',
+        timestamp: new Date()
+      };
+      setMessages(prev => [...prev, errorMessage]);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const handleQuickReply = (reply: string) => {
+    handleSendMessage(reply);
+  };
+
+  const handleSubmit = (e: React.FormEvent) => {
+    e.preventDefault();
+    handleSendMessage(inputValue);
+  };
+
+  return (
+    <div className="max-w-4xl mx-auto">
+      <div className="bg-white rounded-lg shadow-lg overflow-hidden">
+        {/* Chat Header */}
+        <div className="bg-gradient-to-r from-primary-500 to-secondary-500 px-6 py-4">
+          <div className="flex items-center space-x-3">
+            <div className="w-10 h-10 bg-white/20 rounded-full flex items-center justify-center">
+              <Bot className="w-6 h-6 text-white" />
+            </div>
+            <div>
+              <h2 className="text-white font-semibold text-lg">StyleBot</h2>
+              <p className="text-white/80 text-sm">Your fashion assistant</p>
+            </div>
+          </div>
+        </div>
+
+        {/* Messages */}
+        <div className="h-96 overflow-y-auto p-4 space-y-4">
+          {messages.map((message) => (
+            <ChatMessage
+              key={message.id}
+              message={message}
+              onQuickReply={handleQuickReply}
+            />
+          ))}
+          
+          {isLoading && (
+            <div className="flex items-center space-x-2 text-gray-500">
+              <Loader2 className="w-4 h-4 animate-spin" />
+              <span className="text-sm">StyleBot is typing...</span>
+            </div>
+          )}
+          
+          <div ref={messagesEndRef} />
+        </div>
+
+        {/* Input */}
+        <div className="border-t p-4">
+          <form onSubmit={handleSubmit} className="flex space-x-2">
+            <input
+              type="text"
+              value={inputValue}
+              onChange={(e) => setInputValue(e.target.value)}
+              placeholder="Type your message..."
+              className="flex-1 px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-transparent"
+              disabled={isLoading}
+            />
+            <button
+              type="submit"
+              disabled={isLoading || !inputValue.trim()}
+              className="px-4 py-2 bg-primary-600 text-white rounded-lg hover:bg-primary-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
+            >
+              <Send className="w-4 h-4" />
+            </button>
+          </form>
+        </div>
+      </div>
+    </div>
+  );
+};
+
 export default ChatInterface; 
\ No newline at end of file
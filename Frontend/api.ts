@@ -1,203 +1,525 @@
-import axios from 'axios';
-
-const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
-
-const api = axios.create({
-  baseURL: API_BASE_URL,
-  headers: {
-    'Content-Type': 'application/json',
-  },
-});
-
-export interface ChatRequest {
-  message: string;
-  session_id?: string;
-  user_id?: string;
-  context?: Record<string, any>;
-}
-
-export interface ChatResponse {
-  message: string;
-  session_id: string;
-  timestamp: string;
-  suggestions?: string[];
-  quick_replies?: string[];
-  metadata?: Record<string, any>;
-}
-
-export const sendMessage = async (request: ChatRequest): Promise<ChatResponse> => {
-  try {
-    const response = await api.post('/api/chat', request);
-    return response.data;
-  } catch (error) {
-    console.error('Error sending message:', error);
-    throw error;
-  }
-};
-
-export const startChat = async (): Promise<ChatResponse> => {
-  try {
-    const response = await api.post('/api/chat/start');
-    return response.data;
-  } catch (error) {
-    console.error('Error starting chat:', error);
-    throw error;
-  }
-};
-
-export const getChatHistory = async (sessionId: string, limit: number = 50) => {
-  try {
-    const response = await api.get(`/api/chat/session/${sessionId}/history?limit=${limit}`);
-    return response.data;
-  } catch (error) {
-    console.error('Error fetching chat history:', error);
-    throw error;
-  }
-};
-
-export const endChatSession = async (sessionId: string) => {
-  try {
-    const response = await api.delete(`/api/chat/session/${sessionId}`);
-    return response.data;
-  } catch (error) {
-    console.error('Error ending chat session:', error);
-    throw error;
-  }
-};
-
-// Product API
-export const getProducts = async (params?: {
-  query?: string;
-  category?: string;
-  min_price?: number;
-  max_price?: number;
-  colors?: string[];
-  sizes?: string[];
-  in_stock_only?: boolean;
-  page?: number;
-  limit?: number;
-}) => {
-  try {
-    const response = await api.get('/api/products', { params });
-    return response.data;
-  } catch (error) {
-    console.error('Error fetching products:', error);
-    throw error;
-  }
-};
-
-export const getProduct = async (productId: string) => {
-  try {
-    const response = await api.get(`/api/products/${productId}`);
-    return response.data;
-  } catch (error) {
-    console.error('Error fetching product:', error);
-    throw error;
-  }
-};
-
-// Order API
-export const getOrders = async (params?: {
-  user_id?: string;
-  status?: string;
-}) => {
-  try {
-    const response = await api.get('/api/orders', { params });
-    return response.data;
-  } catch (error) {
-    console.error('Error fetching orders:', error);
-    throw error;
-  }
-};
-
-export const getOrder = async (orderId: string) => {
-  try {
-    const response = await api.get(`/api/orders/${orderId}`);
-    return response.data;
-  } catch (error) {
-    console.error('Error fetching order:', error);
-    throw error;
-  }
-};
-
-export const getOrderTracking = async (orderId: string) => {
-  try {
-    const response = await api.get(`/api/orders/${orderId}/tracking`);
-    return response.data;
-  } catch (error) {
-    console.error('Error fetching order tracking:', error);
-    throw error;
-  }
-};
-
-// Health check
-export const healthCheck = async () => {
-  try {
-    const response = await api.get('/api/health');
-    return response.data;
-  } catch (error) {
-    console.error('Error checking health:', error);
-    throw error;
-  }
-};
-
-// Training API
-export const getTrainingStatus = async () => {
-  try {
-    const response = await api.get('/api/training/status');
-    return response.data;
-  } catch (error) {
-    console.error('Error getting training status:', error);
-    throw error;
-  }
-};
-
-export const retrainChatbot = async () => {
-  try {
-    const response = await api.post('/api/training/retrain');
-    return response.data;
-  } catch (error) {
-    console.error('Error retraining chatbot:', error);
-    throw error;
-  }
-};
-
-export const getTrainingAnalytics = async () => {
-  try {
-    const response = await api.get('/api/training/analytics');
-    return response.data;
-  } catch (error) {
-    console.error('Error getting training analytics:', error);
-    throw error;
-  }
-};
-
-export const getTrainingKnowledge = async () => {
-  try {
-    const response = await api.get('/api/training/knowledge');
-    return response.data;
-  } catch (error) {
-    console.error('Error getting training knowledge:', error);
-    throw error;
-  }
-};
-
-export const getTrainingScenarios = async () => {
-  try {
-    const response = await api.get('/api/training/scenarios');
-    return response.data;
-  } catch (error) {
-    console.error('Error getting training scenarios:', error);
-    throw error;
-  }
-};
-
-export const testTrainingResponse = async (message: string) => {
-  try {
-    const response = await api.post('/api/training/test', { message });
-    return response.data;
-  } catch (error) {
-    console.error('Error testing training response:', error);
-    throw error;
-  }
+import axios from 'axios';
+
+const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
+const api = axios.create({
+  baseURL: API_BASE_URL,
+  headers: {
+    'Content-Type': 'application/json',
+  },
+});
+
+export interface ChatRequest {
+  message: string;
+  session_id?: string;
+  user_id?: string;
+  context?: Record<string, any>;
+}
+
+export interface ChatResponse {
+  message: string;
+  session_id: string;
+  timestamp: string;
+  suggestions?: string[];
+  quick_replies?: string[];
+  metadata?: Record<string, any>;
+}
+
+export const sendMessage = async (request: ChatRequest): Promise<ChatResponse> => {
+  try {
+    const response = await api.post('/api/chat', request);
+    return response.data;
+  } catch (error) {
+    console.error('Error sending message:', error);
+    throw error;
+  }
+};
+
+export const startChat = async (): Promise<ChatResponse> => {
+  try {
+    const response = await api.post('/api/chat/start');
+    return response.data;
+  } catch (error) {
+    console.error('Error starting chat:', error);
+    throw error;
+  }
+};
+
+export const getChatHistory = async (sessionId: string, limit: number = 50) => {
+  try {
+    const response = await api.get(`/api/chat/session/${sessionId}/history?limit=${limit}`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching chat history:', error);
+    throw error;
+  }
+};
+
+export const endChatSession = async (sessionId: string) => {
+  try {
+    const response = await api.delete(`/api/chat/session/${sessionId}`);
+    return response.data;
+  } catch (error) {
+    console.error('Error ending chat session:', error);
+    throw error;
+  }
+};
+
+export type ChatSocketFrame =
+  | { type: 'session'; session: Record<string, any> }
+  | { type: 'typing'; id: string }
+  | { type: 'progress'; id: string; elapsed_ms: number }
+  | { type: 'response'; id: string | null; response: ChatResponse }
+  | { type: 'error'; id?: string; code: string; detail: string }
+  | { type: 'pong'; timestamp: string };
+
+// Opens one persistent connection per chat session; messages can be sent
+// back to back and replies arrive in order as 'response' frames.
+export const openChatSocket = (
+  onFrame: (frame: ChatSocketFrame) => void,
+  sessionId?: string,
+  userId?: string
+) => {
+  const wsBase = API_BASE_URL.replace(/^http/, 'ws');
+  const params = new URLSearchParams();
+  if (sessionId) params.set('session_id', sessionId);
+  if (userId) params.set('user_id', userId);
+  const query = params.toString();
+  const socket = new WebSocket(`${wsBase}/api/chat/ws${query ? `?${query}` : ''}`);
+
+  socket.onmessage = (event) => {
+    try {
+      onFrame(JSON.parse(event.data));
+    } catch (error) {
+      console.error('Error parsing chat frame:', error);
+    }
+  };
+
+  return {
+    socket,
+    send: (message: string, id?: string, context?: Record<string, any>) =>
+      socket.send(JSON.stringify({ type: 'message', message, id, context })),
+    close: () => socket.close(),
+  };
+};
+
+// Product API
+export interface ProductPage {
+  products: Array<{
+    id: number;
+    name: string;
+    brand?: string;
+    category?: string;
+    department?: string;
+    retail_price?: number;
+    sku?: string;
+    distribution_center_id?: number;
+  }>;
+  total: number;
+  total_is_exact: boolean;
+  limit: number;
+  next_cursor?: string | null;
+}
+
+// Pass the previous page's next_cursor to fetch the following page
+export const getProducts = async (params?: {
+  query?: string;
+  category?: string;
+  brand?: string;
+  department?: string;
+  min_price?: number;
+  max_price?: number;
+  colors?: string[];
+  in_stock_only?: boolean;
+  sort?: 'id' | 'price_asc' | 'price_desc';
+  cursor?: string;
+  limit?: number;
+}): Promise<ProductPage> => {
+  try {
+    const response = await api.get('/api/products', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching products:', error);
+    throw error;
+  }
+};
+
+export interface FacetCount {
+  value: string;
+  count: number;
+}
+
+export const getProductFacets = async (params?: {
+  query?: string;
+  category?: string;
+  brand?: string;
+  department?: string;
+  color?: string;
+  min_price?: number;
+  max_price?: number;
+  limit?: number;
+}): Promise<{ total: number; facets: Record<string, FacetCount[]> }> => {
+  try {
+    const response = await api.get('/api/products/facets', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching product facets:', error);
+    throw error;
+  }
+};
+
+export interface ProductSuggestion {
+  text: string;
+  type: 'product' | 'brand' | 'category';
+  product_id?: number;
+}
+
+export const getProductSuggestions = async (q: string, limit: number = 8): Promise<ProductSuggestion[]> => {
+  try {
+    const response = await api.get('/api/products/suggest', { params: { q, limit } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching suggestions:', error);
+    throw error;
+  }
+};
+
+export const getProduct = async (productId: string) => {
+  try {
+    const response = await api.get(`/api/products/${productId}`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching product:', error);
+    throw error;
+  }
+};
+
+// Fetches up to 500 products in one request; results keep the order of productIds
+export const getProductsBatch = async (
+  productIds: number[]
+): Promise<{ products: ProductPage['products']; missing: number[] }> => {
+  try {
+    const response = await api.post('/api/products:batch', { ids: productIds });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching products:', error);
+    throw error;
+  }
+};
+
+export const getProductRecommendations = async (productId: string, limit: number = 5) => {
+  try {
+    const response = await api.get(`/api/products/${productId}/recommendations`, { params: { limit } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching recommendations:', error);
+    throw error;
+  }
+};
+
+export interface ProductAvailability {
+  product_id: number;
+  tracked: boolean;
+  available: number | null;
+  distribution_centers: { distribution_center_id: number; available: number }[];
+}
+
+export const getProductAvailability = async (productId: string): Promise<ProductAvailability> => {
+  try {
+    const response = await api.get(`/api/products/${productId}/availability`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching availability:', error);
+    throw error;
+  }
+};
+
+export type SalesDimension = 'product' | 'category' | 'brand' | 'distribution_center';
+export type SalesMetric = 'orders' | 'items' | 'revenue' | 'returns';
+
+// change_pct compares the ranked metric with the window before; null when that was zero
+export interface SalesTrendEntry {
+  key: string | number;
+  name?: string;
+  brand?: string;
+  category?: string;
+  orders: number;
+  items: number;
+  revenue: number;
+  returns: number;
+  change_pct: number | null;
+  [previous: string]: unknown;
+}
+
+export interface SalesTrends {
+  days: number;
+  summary: Record<string, unknown>;
+  entries: SalesTrendEntry[];
+}
+
+export const getSalesTrends = async (params?: {
+  by?: SalesDimension;
+  days?: number;
+  metric?: SalesMetric;
+  trending?: boolean;
+  category?: string;
+  limit?: number;
+}): Promise<SalesTrends> => {
+  try {
+    const response = await api.get('/api/products/trends', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching sales trends:', error);
+    throw error;
+  }
+};
+
+// Order API
+// Pass the previous page's next_cursor to fetch the following page
+export const getOrders = async (params?: {
+  user_id?: number;
+  status?: string;
+  cursor?: string;
+  limit?: number;
+}): Promise<{ orders: any[]; limit: number; next_cursor?: string | null }> => {
+  try {
+    const response = await api.get('/api/orders', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching orders:', error);
+    throw error;
+  }
+};
+
+// Send the same idempotencyKey when retrying so a timed-out request cannot create a second order
+export const createOrder = async (
+  order: { user_id: number; items: Array<{ product_id: number; quantity?: number }> },
+  idempotencyKey: string = crypto.randomUUID()
+) => {
+  try {
+    const response = await api.post('/api/orders', order, { headers: { 'Idempotency-Key': idempotencyKey } });
+    return response.data;
+  } catch (error) {
+    console.error('Error creating order:', error);
+    throw error;
+  }
+};
+
+// Streams the whole history server-side; use as a download link rather than through axios
+export const getOrdersExportUrl = (params: { user_id?: number; status?: string; format?: 'ndjson' | 'csv' } = {}) => {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined) query.set(key, String(value));
+  });
+  const queryString = query.toString();
+  return `${API_BASE_URL}/api/orders/export${queryString ? `?${queryString}` : ''}`;
+};
+
+export interface OrderImportJob {
+  job_id: string;
+  table: 'orders' | 'order_items';
+  format: 'ndjson' | 'csv';
+  state: 'receiving' | 'writing' | 'completed' | 'failed';
+  bytes_received: number;
+  rows_received: number;
+  rows_written: number;
+  rows_skipped: number;
+  rows_rejected: number;
+  errors: string[];
+  started_at: string;
+  finished_at: string | null;
+}
+
+// The browser streams the file from disk; poll getOrderImportJob until the job completes
+export const importOrders = async (
+  file: Blob,
+  table: 'orders' | 'order_items',
+  format: 'ndjson' | 'csv' = 'ndjson'
+): Promise<OrderImportJob> => {
+  try {
+    const response = await api.post('/api/orders/imports', file, {
+      params: { table, format },
+      headers: { 'Content-Type': format === 'csv' ? 'text/csv' : 'application/x-ndjson' },
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error importing orders:', error);
+    throw error;
+  }
+};
+
+export const getOrderImportJob = async (jobId: string): Promise<OrderImportJob> => {
+  try {
+    const response = await api.get(`/api/orders/imports/${jobId}`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching import job:', error);
+    throw error;
+  }
+};
+
+export const getOrder = async (orderId: string) => {
+  try {
+    const response = await api.get(`/api/orders/${orderId}`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching order:', error);
+    throw error;
+  }
+};
+
+// Fetches up to 500 orders in one request; results keep the order of orderIds
+export const getOrdersBatch = async (orderIds: number[]): Promise<{ orders: any[]; missing: number[] }> => {
+  try {
+    const response = await api.post('/api/orders:batch', { ids: orderIds });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching orders:', error);
+    throw error;
+  }
+};
+
+export interface OrderStatusEvent {
+  type: 'order_status';
+  order_id: number;
+  user_id?: number | null;
+  status?: string | null;
+  event: string;
+  timestamp: string;
+}
+
+// Pushes order status changes instead of polling; call the returned function to stop
+export const subscribeToOrderEvents = (
+  params: { user_id?: number; order_id?: number },
+  onEvent: (event: OrderStatusEvent) => void
+) => {
+  const query = new URLSearchParams();
+  if (params.user_id !== undefined) query.set('user_id', String(params.user_id));
+  if (params.order_id !== undefined) query.set('order_id', String(params.order_id));
+  const source = new EventSource(`${API_BASE_URL}/api/orders/events?${query.toString()}`);
+
+  source.addEventListener('order_status', (event) => {
+    try {
+      onEvent(JSON.parse((event as MessageEvent).data));
+    } catch (error) {
+      console.error('Error parsing order event:', error);
+    }
+  });
+
+  return () => source.close();
+};
+
+export interface TrackingEvent {
+  timestamp: string;
+  event: string;
+  status: string;
+  item_ids: number[];
+}
+
+// Typical and late arrival from historical delivery times; null once cancelled or returned
+export interface DeliveryEstimate {
+  status: 'processing' | 'in_transit' | 'delivered';
+  delivered_at?: string;
+  estimated_delivery?: string;
+  latest_delivery?: string;
+  overdue?: boolean;
+  distribution_center?: string;
+  distance_km?: number | null;
+}
+
+export interface OrderTracking {
+  order_id: number;
+  status: string;
+  tracking_events: TrackingEvent[];
+  delivery_estimate: DeliveryEstimate | null;
+}
+
+export const getOrderTracking = async (orderId: string): Promise<OrderTracking> => {
+  try {
+    const response = await api.get(`/api/orders/${orderId}/tracking`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching order tracking:', error);
+    throw error;
+  }
+};
+
+// Health check
+export const healthCheck = async () => {
+  try {
+    const response = await api.get('/api/health');
+    return response.data;
+  } catch (error) {
+    console.error('Error checking health:', error);
+    throw error;
+  }
+};
+
+// Training API
+// Knowledge, analytics and scenarios carry an ETag, so the browser revalidates instead of refetching;
+// pass fields (sections or dotted paths) to fetch only part of a payload
+export const getTrainingStatus = async () => {
+  try {
+    const response = await api.get('/api/training/status');
+    return response.data;
+  } catch (error) {
+    console.error('Error getting training status:', error);
+    throw error;
+  }
+};
+
+export const retrainChatbot = async () => {
+  try {
+    const response = await api.post('/api/training/retrain');
+    return response.data;
+  } catch (error) {
+    console.error('Error retraining chatbot:', error);
+    throw error;
+  }
+};
+
+export const getTrainingAnalytics = async (fields?: string[]) => {
+  try {
+    const response = await api.get('/api/training/analytics', {
+      params: fields?.length ? { fields: fields.join(',') } : undefined,
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error getting training analytics:', error);
+    throw error;
+  }
+};
+
+export const getTrainingKnowledge = async (fields?: string[]) => {
+  try {
+    const response = await api.get('/api/training/knowledge', {
+      params: fields?.length ? { fields: fields.join(',') } : undefined,
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error getting training knowledge:', error);
+    throw error;
+  }
+};
+
+export const getTrainingScenarios = async (fields?: string[]) => {
+  try {
+    const response = await api.get('/api/training/scenarios', {
+      params: fields?.length ? { fields: fields.join(',') } : undefined,
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error getting training scenarios:', error);
+    throw error;
+  }
+};
+
+export const testTrainingResponse = async (message: string) => {
+  try {
+    const response = await api.post('/api/training/test', { message });
+    return response.data;
+  } catch (error) {
+    console.error('Error testing training response:', error);
+    throw error;
+  }
 }; 
\ No newline at end of file